@@ -0,0 +1,238 @@
+"""
+환율 알림 발송기
+발동한 알림을 제한된 크기의 대기열에 넣고, 백그라운드 스레드가 같은 내용끼리 묶어
+카카오 이벤트 API(한 번에 최대 100명)로 보냅니다. 목적지별 전송 속도 제한과
+지터를 섞은 재시도를 적용하고, 끝내 실패한 알림은 dead-letter 파일에 남깁니다.
+환율 갱신이나 스킬 응답은 발송을 기다리지 않습니다.
+알림은 발송(또는 dead-letter 기록)이 끝난 뒤에야 DB에서 완료 처리되므로, 대기열에 남은 채
+데몬이 멈추면 다음 시작 때 replay_pending으로 다시 보냅니다.
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+import requests
+
+import rate_alerts
+
+# 카카오 이벤트 API (KAKAO_EVENT_API_URL로 로컬 모의 서버 지정 가능)
+KAKAO_BOT_ID = os.getenv('KAKAO_BOT_ID', '')
+KAKAO_REST_API_KEY = os.getenv('KAKAO_REST_API_KEY', '')
+KAKAO_EVENT_NAME = os.getenv('KAKAO_EVENT_NAME', 'rate_alert')
+KAKAO_EVENT_API_URL = os.getenv('KAKAO_EVENT_API_URL', f"https://bot-api.kakao.com/v2/bots/{KAKAO_BOT_ID}/talk")
+
+# 대기열/배치 설정
+QUEUE_SIZE = int(os.getenv('ALERT_QUEUE_SIZE', '100000'))
+BATCH_MAX_USERS = 100      # 이벤트 API 한 번에 보낼 수 있는 최대 사용자 수
+BATCH_MAX_WAIT = 0.5       # 배치를 모으는 최대 시간 (초)
+
+# 목적지별 초당 요청 수 (토큰 버킷)
+RATE_LIMIT_PER_SEC = float(os.getenv('ALERT_RATE_LIMIT', '10'))
+
+# 재시도
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10
+
+DEAD_LETTER_FILE = os.getenv('ALERT_DEAD_LETTER_FILE', '/tmp/kakao_alert_deadletter.jsonl')
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_worker = {'thread': None}
+_worker_lock = threading.Lock()
+_dead_letter_lock = threading.Lock()
+_stats = {'enqueued': 0, 'sent': 0, 'dropped': 0, 'dead': 0, 'requests': 0}
+_stats_lock = threading.Lock()
+
+def _count(key, amount=1):
+    """발송 통계 증가 (대기열 적재, 발송 스레드, dead-letter 기록이 서로 다른 스레드에서 호출)"""
+    with _stats_lock:
+        _stats[key] += amount
+
+class TokenBucket:
+    """목적지별 전송 속도 제한"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_buckets = {}
+
+def _bucket_for(url):
+    bucket = _buckets.get(url)
+    if bucket is None:
+        bucket = _buckets.setdefault(url, TokenBucket(RATE_LIMIT_PER_SEC))
+    return bucket
+
+def start():
+    """발송 스레드 시작 (한 번만)"""
+    with _worker_lock:
+        if _worker['thread'] and _worker['thread'].is_alive():
+            return
+        thread = threading.Thread(target=_worker_loop, name='alert-dispatcher', daemon=True)
+        thread.start()
+        _worker['thread'] = thread
+        print(f"📮 알림 발송기 시작 (대기열 {QUEUE_SIZE}, 초당 {RATE_LIMIT_PER_SEC}건)")
+
+def enqueue(alerts):
+    """발동한 알림을 대기열에 추가 (가득 차면 기다리지 않고 dead-letter로)"""
+    start()
+    dropped = []
+    for alert in alerts:
+        try:
+            _queue.put_nowait(alert)
+            _count('enqueued')
+        except queue.Full:
+            dropped.append(alert)
+
+    if dropped:
+        _count('dropped', len(dropped))
+        write_dead_letter(dropped, '대기열 가득 참')
+    return len(alerts) - len(dropped)
+
+def replay_pending():
+    """발송 확인 전에 데몬이 멈춰 DB에 발송 대기로 남은 알림을 다시 대기열에 넣기"""
+    try:
+        pending = rate_alerts.pending_alerts()
+    except Exception as e:
+        print(f"❌ 발송 대기 알림 조회 에러: {e}")
+        return 0
+    if pending:
+        print(f"📮 발송 대기 알림 {len(pending)}개 다시 발송")
+        return enqueue(pending)
+    return 0
+
+def _mark_done(alerts):
+    """발송 또는 dead-letter 기록이 끝난 알림을 DB에서 완료 처리"""
+    try:
+        rate_alerts.mark_done(alert['id'] for alert in alerts if 'id' in alert)
+    except Exception as e:
+        print(f"❌ 알림 완료 처리 에러: {e}")
+
+def stats():
+    """발송 통계 (대기열 길이 포함)"""
+    with _stats_lock:
+        return dict(_stats, queued=_queue.qsize())
+
+def _collect_batch():
+    """첫 알림을 기다린 뒤 BATCH_MAX_WAIT 동안 들어온 알림을 함께 모음"""
+    batch = [_queue.get()]
+    deadline = time.monotonic() + BATCH_MAX_WAIT
+    while len(batch) < BATCH_MAX_USERS * 10:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=left))
+        except queue.Empty:
+            break
+    return batch
+
+def group_alerts(alerts):
+    """같은 메시지(통화, 방향, 기준값, 환율)끼리 묶어 최대 100명씩 나눔"""
+    groups = {}
+    for alert in alerts:
+        key = (alert['currency'], alert['direction'], alert['threshold'], alert['rate'])
+        groups.setdefault(key, []).append(alert)
+
+    for group in groups.values():
+        for offset in range(0, len(group), BATCH_MAX_USERS):
+            yield group[offset:offset + BATCH_MAX_USERS]
+
+def build_event_payload(alerts):
+    """카카오 이벤트 API 요청 본문 (같은 내용의 알림 묶음)"""
+    first = alerts[0]
+    condition = "이상" if first['direction'] == 'above' else "이하"
+    return {
+        "event": {
+            "name": KAKAO_EVENT_NAME,
+            "data": {
+                "params": {
+                    "currency": first['currency'],
+                    "threshold": f"{first['threshold']:,.2f}",
+                    "condition": condition,
+                    "rate": f"{first['rate']:,.2f}"
+                }
+            }
+        },
+        "user": [{"type": "botUserKey", "id": alert['user_id']} for alert in alerts]
+    }
+
+def _worker_loop():
+    while True:
+        batch = _collect_batch()
+        for group in group_alerts(batch):
+            try:
+                send_group(group)
+            except Exception as e:
+                print(f"❌ 알림 발송 에러: {e}")
+                write_dead_letter(group, str(e))
+        for _ in batch:
+            _queue.task_done()
+
+def send_group(alerts):
+    """알림 묶음 전송 (지수 백오프 + 지터 재시도, 최종 실패 시 dead-letter)"""
+    url = KAKAO_EVENT_API_URL
+    headers = {'Content-Type': 'application/json'}
+    if KAKAO_REST_API_KEY:
+        headers['Authorization'] = f"KakaoAK {KAKAO_REST_API_KEY}"
+    payload = build_event_payload(alerts)
+    bucket = _bucket_for(url)
+    error = None
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        bucket.acquire()
+        _count('requests')
+        try:
+            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            if response.status_code == 200:
+                _count('sent', len(alerts))
+                _mark_done(alerts)
+                return True
+
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            # 요청 자체가 잘못된 경우는 재시도해도 같음 (429 제외)
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                break
+        except Exception as e:
+            error = str(e)
+
+        if attempt < MAX_ATTEMPTS:
+            # full jitter: 동시에 실패한 묶음들이 같은 순간에 다시 몰리지 않도록
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))))
+
+    print(f"❌ 알림 {len(alerts)}건 발송 실패: {error}")
+    write_dead_letter(alerts, error)
+    return False
+
+def write_dead_letter(alerts, reason):
+    """발송 실패 알림 기록 (JSON Lines)"""
+    _count('dead', len(alerts))
+    try:
+        with _dead_letter_lock, open(DEAD_LETTER_FILE, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps({'failed_at': time.time(), 'reason': reason, 'alert': alert}, ensure_ascii=False) + '\n')
+    except Exception as e:
+        # 기록하지 못한 알림은 발송 대기로 남겨 다음 시작 때 다시 시도
+        print(f"❌ dead-letter 기록 실패: {e}")
+        return
+    _mark_done(alerts)
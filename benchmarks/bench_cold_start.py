@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 벤치마크
+새 프로세스로 스킬 서버를 띄운 뒤 첫 /exchange_rate 응답의 첫 바이트가 올 때까지(TTFB) 걸린 시간과
+앱 모듈 import 시간을 측정합니다. 스냅샷/캐시 파일은 평소 위치(/tmp)의 것을 그대로 사용합니다.
+
+사용법:
+    python benchmarks/bench_cold_start.py [반복 횟수]
+    WARM_START=0 python benchmarks/bench_cold_start.py   # 캐시 미리 채우기 없이 비교
+"""
+
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+APP_MODULE = 'kakao_exchange_skill_advanced_final'
+
+SERVE = f"""
+import sys, time
+started = time.perf_counter()
+import {APP_MODULE} as app_module
+sys.stderr.write(f"IMPORT_MS {{(time.perf_counter() - started) * 1000:.1f}}\\n")
+sys.stderr.flush()
+app_module.app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=False, use_reloader=False)
+"""
+
+SKILL_REQUEST = json.dumps({
+    "userRequest": {"utterance": "환율", "user": {"id": "bench-user"}},
+    "action": {"params": {}}
+}).encode('utf-8')
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def first_response(port, timeout=30):
+    """서버가 요청을 받을 때까지 재시도하고 첫 응답 바이트까지 걸린 시간 반환"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+        try:
+            conn.request('POST', '/exchange_rate', body=SKILL_REQUEST, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read(1)
+            return response.status
+        except (ConnectionRefusedError, OSError):
+            time.sleep(0.005)
+        finally:
+            conn.close()
+    raise TimeoutError("서버가 응답하지 않습니다")
+
+def run_once():
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', SERVE, str(port)], cwd=REPO_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        status = first_response(port)
+        ttfb = (time.perf_counter() - started) * 1000
+    finally:
+        proc.terminate()
+        _, stderr = proc.communicate(timeout=10)
+
+    import_ms = next((float(line.split()[1]) for line in stderr.splitlines() if line.startswith('IMPORT_MS')), None)
+    return ttfb, import_ms, status
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 60)
+    print(f"🧊 콜드 스타트 측정 (반복 {runs}회, WARM_START={os.getenv('WARM_START', '1')})")
+    print("=" * 60)
+
+    results = []
+    for i in range(runs):
+        ttfb, import_ms, status = run_once()
+        results.append((ttfb, import_ms))
+        print(f"#{i + 1}: 첫 응답 {ttfb:7.1f}ms  (import {import_ms}ms, HTTP {status})")
+
+    print("-" * 60)
+    print(f"중앙값: 첫 응답 {statistics.median(r[0] for r in results):.1f}ms, "
+          f"import {statistics.median(r[1] for r in results if r[1] is not None):.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+스킬 응답 JSON 인코딩 벤치마크
+실제 /exchange_rate 응답(폴백 환율 + 폴백 뉴스)을 만들어 인코더별 응답 크기와 인코딩 시간을 비교합니다.
+
+사용법:
+    python benchmarks/bench_json_encoding.py [반복 횟수]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# 앱 import 시 캐시 준비(알림 소켓, 뉴스 크롤링)를 하지 않도록 (외부 호출 없는 측정)
+os.environ.setdefault('WARM_START', '0')
+
+import response_encoder
+from kakao_exchange_skill_advanced_final import app, build_exchange_rate_response, get_fallback_news
+
+def sample_response():
+    """실제 응답과 같은 구조의 환율 + 뉴스 응답 (before_request의 캐시 준비는 실행하지 않음)"""
+    with app.test_request_context('/exchange_rate', method='POST'):
+        return build_exchange_rate_response(get_fallback_news())
+
+def flask_default(obj):
+    """Flask 기본 jsonify와 같은 설정 (ensure_ascii, sort_keys)"""
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True).encode('utf-8')
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payload = sample_response()
+
+    encoders = [('flask default (ascii)', flask_default)]
+    for name in ('json', 'orjson'):
+        backend, encode = response_encoder.select_backend(name)
+        if backend == name:
+            encoders.append((f"{backend} (UTF-8)", encode))
+        else:
+            print(f"⚠️ {name} 백엔드를 사용할 수 없어 건너뜀")
+
+    print("=" * 60)
+    print(f"📊 응답 JSON 인코딩 비교 (반복 {number}회)")
+    print("=" * 60)
+
+    baseline = None
+    for name, encode in encoders:
+        # 첫 호출(지연 초기화 등)은 측정에서 제외
+        size = len(encode(payload))
+        micros = timeit.timeit(lambda: encode(payload), number=number) / number * 1e6
+        baseline = baseline or (size, micros)
+        print(f"{name:<26} {size:>6} bytes ({size / baseline[0]:.0%})  {micros:>7.1f} µs ({baseline[1] / micros:.1f}x)")
+
+if __name__ == '__main__':
+    main()
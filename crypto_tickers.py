@@ -0,0 +1,64 @@
+"""
+업비트 원화(KRW) 마켓 암호화폐 시세
+추적하는 모든 마켓을 ticker API 한 번(markets=KRW-BTC,KRW-ETH,...)으로 조회합니다.
+갱신 데몬이 짧은 주기로 스냅샷을 게시하고, 웹 워커는 스냅샷으로 카드만 렌더링합니다.
+"""
+
+from deadline import budget_timeout
+
+UPBIT_TICKER_URL = 'https://api.upbit.com/v1/ticker'
+UPBIT_EXCHANGE_URL = 'https://upbit.com/exchange?code=CRIX.UPBIT.'
+
+# 추적 마켓 → 표시 이름 (카드 순서, 카카오 ListCard 최대 5개)
+CRYPTO_MARKETS = {
+    'KRW-BTC': '비트코인',
+    'KRW-ETH': '이더리움',
+    'KRW-XRP': '리플',
+    'KRW-SOL': '솔라나',
+    'KRW-DOGE': '도지코인',
+}
+
+def parse_tickers(data, markets=None):
+    """ticker 응답 → [{'market', 'symbol', 'name', 'price', 'change', 'change_rate'}] (추적 마켓 순서)
+
+    change는 전일 종가 대비 원화 변동, change_rate는 변동률(%)이며 하락이면 음수입니다.
+    """
+    markets = markets or CRYPTO_MARKETS
+    order = list(markets)
+
+    tickers = []
+    for item in data if isinstance(data, list) else []:
+        market = item.get('market')
+        price = item.get('trade_price')
+        if market not in markets or price is None:
+            continue
+        tickers.append({
+            'market': market,
+            'symbol': market.split('-', 1)[1],
+            'name': markets[market],
+            'price': price,
+            'change': item.get('signed_change_price') or 0,
+            'change_rate': round((item.get('signed_change_rate') or 0) * 100, 2)
+        })
+
+    tickers.sort(key=lambda t: order.index(t['market']))
+    return tickers
+
+def fetch_tickers(markets=None, timeout=5):
+    """추적 마켓 시세를 한 번의 요청으로 조회 (실패하면 빈 목록)"""
+    import requests
+
+    markets = markets or CRYPTO_MARKETS
+    headers = {
+        'Accept': 'application/json'
+    }
+    try:
+        response = requests.get(UPBIT_TICKER_URL, params={'markets': ','.join(markets)}, headers=headers,
+                                timeout=budget_timeout(timeout))
+        if response.status_code != 200:
+            print(f"❌ 업비트 시세 요청 실패: {response.status_code}")
+            return []
+        return parse_tickers(response.json(), markets)
+    except Exception as e:
+        print(f"❌ 업비트 시세 에러: {e}")
+        return []
@@ -0,0 +1,52 @@
+"""
+통화 레지스트리
+카드 표시(국기, 이름)와 뉴스 태깅(기사에서 통화를 찾는 별칭)에 함께 사용합니다.
+"""
+
+# 통화 코드 → 표시 정보와 뉴스 별칭
+# 'tag'는 뉴스 태그에 사용하는 대표 코드 (JPY100과 JPY는 같은 태그)
+# 'name_en'은 영어 응답을 선택한 사용자용 이름
+# 'exclude'는 별칭으로 시작하지만 통화가 아닌 말 (파운드리, 위안부 등), 앞에 숫자가 오면 통화로 봄
+CURRENCY_MAP = {
+    'USD': {'flag': '🇺🇸', 'name': '미국 달러', 'name_en': 'US Dollar', 'tag': 'USD',
+            'aliases': ['달러', '미 달러', '미국 달러', '원달러', '원·달러', '원/달러', '달러화', 'USD']},
+    'JPY100': {'flag': '🇯🇵', 'name': '일본 엔', 'name_en': 'Japanese Yen', 'tag': 'JPY',
+               'aliases': []},
+    'JPY': {'flag': '🇯🇵', 'name': '일본 엔', 'name_en': 'Japanese Yen', 'tag': 'JPY',
+            # '엔' 단독은 엔진, 엔터 등과 겹치므로 쓰지 않음
+            'aliases': ['엔화', '엔저', '엔고', '엔캐리', '일본 엔', '원·엔', '원/엔', '엔/달러', 'JPY']},
+    'EUR': {'flag': '🇪🇺', 'name': '유로', 'name_en': 'Euro', 'tag': 'EUR',
+            'aliases': ['유로', '유로화', 'EUR'],
+            'exclude': ['유로파', '유로비전']},
+    'CNY': {'flag': '🇨🇳', 'name': '중국 위안', 'name_en': 'Chinese Yuan', 'tag': 'CNY',
+            'aliases': ['위안', '위안화', '중국 위안', 'CNY'],
+            'exclude': ['위안부', '위안을', '위안이', '위안으로', '위안하', '위안삼']},
+    'GBP': {'flag': '🇬🇧', 'name': '영국 파운드', 'name_en': 'British Pound', 'tag': 'GBP',
+            'aliases': ['파운드', '파운드화', '영국 파운드', 'GBP'],
+            'exclude': ['파운드리']},
+    'CHF': {'flag': '🇨🇭', 'name': '스위스 프랑', 'name_en': 'Swiss Franc', 'tag': 'CHF',
+            'aliases': ['스위스 프랑', '프랑화', 'CHF']},
+    'CAD': {'flag': '🇨🇦', 'name': '캐나다 달러', 'name_en': 'Canadian Dollar', 'tag': 'CAD',
+            'aliases': ['캐나다 달러', '캐나다달러', 'CAD']}
+}
+
+# 뉴스 태그(JPY) → 환율 카드 코드(JPY100)
+RATE_CODES = {'JPY': 'JPY100'}
+
+def rate_code(code):
+    """통화 코드 정규화 ('usd' → USD, JPY → JPY100), 등록되지 않은 코드는 None"""
+    code = RATE_CODES.get(str(code or '').strip().upper(), str(code or '').strip().upper())
+    return code if code in CURRENCY_MAP else None
+
+def currency_info(currency_code):
+    """통화 표시 정보 (등록되지 않은 통화는 기본 아이콘)"""
+    return CURRENCY_MAP.get(currency_code, {'flag': '💱', 'name': currency_code, 'name_en': currency_code,
+                                            'tag': currency_code, 'aliases': []})
+
+def currency_unit(currency_code):
+    """환율 고시 단위 (JPY100은 100엔당 원화)"""
+    return 100 if currency_code.endswith('100') else 1
+
+def currency_tag(currency_code):
+    """뉴스 태그용 대표 코드 (JPY100 → JPY)"""
+    return currency_info(currency_code)['tag']
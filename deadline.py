@@ -0,0 +1,70 @@
+"""
+카카오 스킬 응답 시간 예산(데드라인) 관리
+카카오 스킬은 약 5초 안에 응답해야 하므로, 요청 핸들러가 예산을 정하고
+모든 외부 호출과 파싱 단계가 남은 시간을 확인하도록 합니다.
+"""
+
+import contextvars
+import os
+import time
+
+# 카카오 스킬 타임아웃(약 5초)보다 여유 있게 잡은 기본 예산 (초)
+KAKAO_SKILL_BUDGET = float(os.getenv('KAKAO_SKILL_BUDGET', '4.5'))
+
+# 응답 구성(렌더링, 직렬화)을 위해 남겨두는 시간 (초)
+RENDER_RESERVE = 0.3
+
+# 이보다 짧은 타임아웃으로는 외부 호출을 시도하지 않음 (초)
+MIN_CALL_TIMEOUT = 0.2
+
+_deadline = contextvars.ContextVar('kakao_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """응답 예산을 모두 사용함"""
+
+
+def start_budget(seconds=None):
+    """현재 컨텍스트에 응답 예산 설정 (end_budget에 넘길 토큰 반환)"""
+    if seconds is None:
+        seconds = KAKAO_SKILL_BUDGET
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def end_budget(token):
+    """start_budget으로 설정한 예산 해제"""
+    _deadline.reset(token)
+
+
+def remaining():
+    """남은 예산 (초). 예산이 없으면 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_time(seconds):
+    """남은 예산이 seconds 이상인지 확인 (예산이 없으면 항상 True)"""
+    left = remaining()
+    return left is None or left - RENDER_RESERVE >= seconds
+
+
+def budget_timeout(default):
+    """외부 호출 타임아웃 계산: 기본값과 남은 예산 중 작은 값"""
+    left = remaining()
+    if left is None:
+        return default
+
+    left -= RENDER_RESERVE
+    if left < MIN_CALL_TIMEOUT:
+        raise DeadlineExceeded(f"응답 예산 초과 (남은 시간 {left:.2f}초)")
+
+    return min(default, left)
+
+
+def check_deadline():
+    """파싱 단계 등에서 예산이 남아 있는지 확인 (없으면 DeadlineExceeded)"""
+    left = remaining()
+    if left is not None and left <= RENDER_RESERVE:
+        raise DeadlineExceeded("응답 예산 초과")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+한국수출입은행 과거 환율 적재 도구
+searchdate로 과거 영업일의 AP01 데이터를 병렬로 조회해 환율 이력 저장소(rate_history)에 넣습니다.
+최근 날짜부터 채우고, 주말/고정 공휴일은 호출하지 않으며, 진행 상황을 체크포인트 파일에 남겨
+중단 후 다시 실행하면 이어서 진행합니다. API 일일 호출 한도 안에서만 호출합니다.
+
+사용법:
+    python exim_backfill.py 2020-01-01                 # 2020-01-01 ~ 어제
+    python exim_backfill.py 2020-01-01 2022-12-31 --workers 4 --quota 900
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import exim_client
+import rate_history
+
+CHECKPOINT_FILE = os.getenv('EXIM_BACKFILL_CHECKPOINT', '/tmp/kakao_exim_backfill.json')
+
+# 실시간 조회 몫을 남겨 두기 위해 API 일일 한도(1,000회)보다 작게
+DEFAULT_QUOTA = 900
+DEFAULT_WORKERS = 4
+
+def load_checkpoint():
+    """{'empty': [데이터 없는 날짜...]}"""
+    try:
+        with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'empty': []}
+
+def save_checkpoint(checkpoint):
+    tmp_path = f"{CHECKPOINT_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, CHECKPOINT_FILE)
+
+def business_days(start, end):
+    """end부터 start까지 거꾸로 (최근 날짜 먼저), 주말/고정 공휴일 제외"""
+    day = end
+    while day >= start:
+        # 음력 공휴일/대체 휴일은 빈 응답을 체크포인트에 기록해 다음부터 건너뜀
+        if rate_history.is_business_day(day.isoformat()):
+            yield day
+        day -= timedelta(days=1)
+
+def pending_days(start, end, checkpoint):
+    """아직 적재하지 않은 영업일 (이력이 있거나 빈 응답이었던 날짜 제외)"""
+    done = rate_history.stored_dates(start.isoformat(), end.isoformat()) | set(checkpoint.get('empty', []))
+    return [day for day in business_days(start, end) if day.isoformat() not in done]
+
+def fetch(day):
+    # 하루 호출 한도와 날짜별 캐시는 실시간 조회와 함께 사용
+    status, items, called = exim_client.get_day_counted(day.strftime('%Y%m%d'))
+    return day, status, items, called
+
+def backfill(start, end, workers=DEFAULT_WORKERS, quota=DEFAULT_QUOTA):
+    """기간 적재 실행, (저장한 날짜 수, 호출 수) 반환"""
+    checkpoint = load_checkpoint()
+    days = pending_days(start, end, checkpoint)
+    print(f"📅 적재 대상: {len(days)}일 ({start} ~ {end}), 이번 실행 최대 {quota}회 호출")
+
+    days = days[:quota]
+    empty = set(checkpoint.get('empty', []))
+    stored = calls = 0
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # 워커 수의 몇 배씩 묶어 처리하고, 묶음마다 한 번에 저장 + 체크포인트 기록
+        batch_size = workers * 5
+        for offset in range(0, len(days), batch_size):
+            rows = []
+            stop = None
+            for day, status, items, called in executor.map(fetch, days[offset:offset + batch_size]):
+                # 캐시된 날짜는 API를 호출하지 않았으므로 세지 않음
+                calls += called
+                if status == exim_client.OK:
+                    rows.extend((day.isoformat(), r['currency'], r['rate'], {'tts': r['tts'], 'ttb': r['ttb']})
+                                for r in exim_client.parse_items(items))
+                    stored += 1
+                elif status == exim_client.NO_DATA:
+                    empty.add(day.isoformat())
+                elif status in (exim_client.QUOTA, exim_client.AUTH):
+                    stop = status
+
+            rate_history.insert_rows(rows, 'exim')
+            checkpoint['empty'] = sorted(empty)
+            save_checkpoint(checkpoint)
+            print(f"  💾 {min(offset + batch_size, len(days))}/{len(days)}일 처리 (저장 {stored}일, 호출 {calls}회)")
+
+            if stop == exim_client.QUOTA:
+                print("⛔ API 일일 호출 한도 도달 - 내일 다시 실행하면 이어서 진행합니다")
+                break
+            if stop == exim_client.AUTH:
+                print("⛔ API 인증 실패 - EXIM_API_KEY를 확인하세요")
+                break
+
+    print(f"✅ 적재 완료: {stored}일, 호출 {calls}회 ({time.monotonic() - started:.1f}초)")
+    return stored, calls
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="한국수출입은행 과거 환율 적재")
+    parser.add_argument('start', type=parse_date, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument('end', type=parse_date, nargs='?', default=date.today() - timedelta(days=1),
+                        help="끝 날짜 (기본: 어제)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="동시 요청 수")
+    parser.add_argument('--quota', type=int, default=DEFAULT_QUOTA, help="이번 실행 최대 호출 수")
+    args = parser.parse_args()
+
+    if not exim_client.get_api_key():
+        print("⚠️ 한국수출입은행 API 키가 설정되지 않았습니다 (EXIM_API_KEY)")
+        sys.exit(1)
+
+    backfill(args.start, args.end, workers=max(1, args.workers), quota=max(0, args.quota))
@@ -0,0 +1,258 @@
+"""
+한국수출입은행 환율 API 클라이언트
+searchdate(YYYYMMDD) 하루치 AP01(환율) 데이터를 조회하고 통화별 숫자로 변환합니다.
+실시간 조회(rate_providers)와 과거 데이터 적재(exim_backfill)가 함께 사용합니다.
+
+API는 하루 호출 한도가 있고, 당일 고시(약 11시 KST) 전이나 휴일에는 빈 목록을 돌려줍니다.
+그래서 하루 호출 수를 디스크에 기록해 한도 안에서만 호출하고, 확정된 날짜의 응답은
+디스크에 영구 캐시하며, 고시 전에는 직전 영업일 데이터를 사용합니다.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from deadline import budget_timeout
+
+EXIM_URL = 'https://www.koreaexim.go.kr/site/program/financial/exchangeJSON'
+
+# 조회 결과 상태
+OK = 'ok'
+NO_DATA = 'no_data'      # 주말/공휴일 (빈 목록)
+QUOTA = 'quota'          # 일일 호출 한도 초과 (result 4)
+AUTH = 'auth'            # 인증키 오류 (result 3)
+ERROR = 'error'
+
+# API result 코드 → 상태
+_RESULT_STATUS = {2: ERROR, 3: AUTH, 4: QUOTA}
+
+# 하루 호출 한도 (KST 날짜 기준, 모든 프로세스 합산)
+DAILY_QUOTA = int(os.getenv('EXIM_DAILY_QUOTA', '1000'))
+QUOTA_FILE = os.getenv('EXIM_QUOTA_FILE', '/tmp/kakao_exim_quota.json')
+
+# 날짜별 응답 캐시 (확정된 날짜만 저장, 한 번 저장하면 다시 호출하지 않음)
+CACHE_DIR = os.getenv('EXIM_CACHE_DIR', '/tmp/kakao_exim_cache')
+
+# 당일 고시 시각 (KST), 고시 후에도 비어 있으면 이 간격으로만 다시 확인
+PUBLISH_HOUR = 11
+EMPTY_RETRY = 600
+
+# 직전 영업일을 찾을 때 거슬러 올라갈 최대 일수 (설/추석 연휴 포함)
+MAX_LOOKBACK_DAYS = 10
+
+# 당일 빈 응답을 마지막으로 확인한 시각 (searchdate → time)
+_empty_checked = {}
+_empty_lock = threading.Lock()
+
+def get_api_key():
+    """API 키 (설정되지 않았으면 None)"""
+    api_key = os.getenv('EXIM_API_KEY', 'YOUR_API_KEY_HERE')
+    return None if api_key == 'YOUR_API_KEY_HERE' else api_key
+
+def kst_now():
+    return datetime.utcnow() + timedelta(hours=9)
+
+def _use_quota():
+    """오늘 호출 한도에서 1회 차감 (한도를 다 썼으면 False)"""
+    today = kst_now().strftime('%Y-%m-%d')
+    with open(QUOTA_FILE, 'a+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            usage = json.loads(f.read() or '{}')
+        except ValueError:
+            usage = {}
+        if usage.get('date') != today:
+            usage = {'date': today, 'calls': 0}
+        if usage['calls'] >= DAILY_QUOTA:
+            return False
+        usage['calls'] += 1
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(usage))
+        return True
+
+def _exhaust_quota():
+    """API가 한도 초과를 알려오면 오늘은 더 호출하지 않음"""
+    with open(QUOTA_FILE, 'a+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps({'date': kst_now().strftime('%Y-%m-%d'), 'calls': DAILY_QUOTA}))
+
+def quota_usage():
+    """오늘 사용한 호출 수와 한도"""
+    try:
+        with open(QUOTA_FILE, 'r', encoding='utf-8') as f:
+            usage = json.load(f)
+    except (OSError, ValueError):
+        usage = {}
+    calls = usage.get('calls', 0) if usage.get('date') == kst_now().strftime('%Y-%m-%d') else 0
+    return {'calls': calls, 'quota': DAILY_QUOTA}
+
+def _cache_path(searchdate):
+    return os.path.join(CACHE_DIR, f"{searchdate}.json")
+
+def _read_cache(searchdate):
+    try:
+        with open(_cache_path(searchdate), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['status'], cached['items']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_cache(searchdate, status, items):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(searchdate)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'status': status, 'items': items, 'cached_at': time.time()}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def is_final(searchdate, status, now=None):
+    """다시 조회해도 결과가 바뀌지 않는 응답인지 (지난 날짜, 또는 고시가 끝난 오늘)"""
+    if status not in (OK, NO_DATA):
+        return False
+    today = (now or kst_now()).strftime('%Y%m%d')
+    if searchdate < today:
+        return True
+    return searchdate == today and status == OK
+
+def get_day(searchdate, timeout=30):
+    """하루치 환율 (캐시 → 한도 확인 → API 조회) → (상태, 항목 목록)"""
+    status, items, _ = get_day_counted(searchdate, timeout)
+    return status, items
+
+def get_day_counted(searchdate, timeout=30):
+    """get_day와 같지만 실제 API 요청 여부도 반환 → (상태, 항목 목록, 호출 여부)"""
+    cached = _read_cache(searchdate)
+    if cached:
+        return cached + (False,)
+
+    if not get_api_key():
+        return AUTH, [], False
+
+    # 고시 전이거나 방금 빈 응답을 받은 오늘 날짜는 호출하지 않음
+    now = kst_now()
+    if searchdate >= now.strftime('%Y%m%d'):
+        if searchdate > now.strftime('%Y%m%d') or now.hour < PUBLISH_HOUR:
+            return NO_DATA, [], False
+        with _empty_lock:
+            if time.time() - _empty_checked.get(searchdate, 0) < EMPTY_RETRY:
+                return NO_DATA, [], False
+
+    if not _use_quota():
+        print("⛔ 한국수출입은행 API 오늘 호출 한도 소진")
+        return QUOTA, [], False
+
+    status, items = fetch_day(searchdate, timeout)
+
+    if status == QUOTA:
+        _exhaust_quota()
+    elif is_final(searchdate, status):
+        _write_cache(searchdate, status, items)
+    elif status == NO_DATA:
+        with _empty_lock:
+            _empty_checked[searchdate] = time.time()
+
+    return status, items, True
+
+def previous_business_day(searchdate):
+    """주말을 건너뛴 직전 평일 (공휴일은 빈 응답 캐시로 건너뜀)"""
+    day = datetime.strptime(searchdate, '%Y%m%d') - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.strftime('%Y%m%d')
+
+def latest_rates(before=None):
+    """가장 최근 고시 환율 → (날짜, 항목 목록), 없으면 (None, [])
+
+    before를 주면 그 날짜 이전에서 찾습니다. 당일 고시 전에는 직전 영업일 데이터를 돌려줍니다.
+    """
+    if before:
+        searchdate = previous_business_day(before)
+    else:
+        now = kst_now()
+        searchdate = now.strftime('%Y%m%d')
+        if now.weekday() >= 5 or now.hour < PUBLISH_HOUR:
+            searchdate = previous_business_day(searchdate)
+
+    for _ in range(MAX_LOOKBACK_DAYS):
+        status, items = get_day(searchdate)
+        if status == OK:
+            return searchdate, items
+        if status != NO_DATA:
+            # 한도 초과/인증 오류/일시 오류는 더 거슬러 올라가도 같음
+            return None, []
+        searchdate = previous_business_day(searchdate)
+    return None, []
+
+def fetch_day(searchdate, timeout=30):
+    """하루치 환율 API 호출 (캐시/한도 확인 없이) → (상태, 항목 목록)"""
+    import requests
+
+    api_key = get_api_key()
+    if not api_key:
+        return AUTH, []
+
+    params = {
+        'authkey': api_key,
+        'searchdate': searchdate,
+        'data': 'AP01'
+    }
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'application/json'
+    }
+
+    try:
+        response = requests.get(EXIM_URL, params=params, headers=headers, timeout=budget_timeout(timeout))
+        if response.status_code != 200:
+            return ERROR, []
+        data = response.json()
+    except Exception as e:
+        print(f"❌ 한국수출입은행 API 에러 ({searchdate}): {e}")
+        return ERROR, []
+
+    if not isinstance(data, list):
+        return ERROR, []
+    if not data:
+        return NO_DATA, []
+
+    result = data[0].get('result', 1)
+    if result != 1:
+        return _RESULT_STATUS.get(result, ERROR), []
+
+    return OK, data
+
+def parse_number(value):
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def currency_code(cur_unit):
+    """API 통화 단위 → 환율 카드 코드 (JPY(100) → JPY100)"""
+    return cur_unit.replace('(', '').replace(')', '').strip()
+
+def parse_items(items):
+    """API 항목 → [{'currency', 'rate', 'tts', 'ttb'}] (원화 항목과 숫자가 아닌 값은 제외)
+
+    tts(전신환 매도율)는 고객이 송금 보낼 때, ttb(전신환 매입율)는 송금 받을 때 환율입니다.
+    """
+    rates = []
+    for item in items:
+        code = currency_code(item.get('cur_unit', ''))
+        rate = parse_number(item.get('deal_bas_r'))
+        if not code or code == 'KRW' or not rate:
+            continue
+        rates.append({
+            'currency': code,
+            'rate': rate,
+            'tts': parse_number(item.get('tts')),
+            'ttb': parse_number(item.get('ttb'))
+        })
+    return rates
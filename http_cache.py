@@ -0,0 +1,119 @@
+"""
+GET 응답 압축과 캐시 헤더
+@cacheable로 지정한 GET 엔드포인트에만 ETag/Cache-Control을 붙이고 (응답이 직접 Cache-Control을 정하면 그 값 사용), 일정 크기 이상이면
+gzip(또는 brotli 모듈이 설치되어 있으면 br)으로 압축합니다. 같은 내용(ETag)의 압축 결과는
+메모리에 보관하므로 미리 렌더링된 응답은 한 번만 압축됩니다.
+카카오 스킬(POST) 응답은 건드리지 않습니다.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이보다 작은 응답은 압축 이득보다 비용이 큼
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '512'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# (ETag, 인코딩) → 압축된 본문
+COMPRESSED_CACHE_SIZE = 256
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+def cacheable(max_age=0, public=True):
+    """GET 엔드포인트에 캐시 정책 지정 (max_age=0이면 매번 ETag로 재검증)"""
+    def decorator(view):
+        scope = 'public' if public else 'private'
+        view.cache_control = f"{scope}, max-age={max_age}" if max_age else f"{scope}, no-cache"
+        return view
+    return decorator
+
+def _accepts(accept_encoding, encoding):
+    """Accept-Encoding에 해당 인코딩이 q=0이 아닌 값으로 있는지"""
+    for part in accept_encoding.split(','):
+        token, _, params = part.partition(';')
+        if token.strip().lower() != encoding:
+            continue
+        params = params.replace(' ', '')
+        if not params.startswith('q='):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+def choose_encoding(accept_encoding):
+    """클라이언트가 받을 수 있는 압축 방식 (br 우선, 없으면 None)"""
+    if not accept_encoding:
+        return None
+    if brotli is not None and _accepts(accept_encoding, 'br'):
+        return 'br'
+    if _accepts(accept_encoding, 'gzip'):
+        return 'gzip'
+    return None
+
+def compress(body, encoding, etag=None):
+    """본문 압축 (ETag가 있으면 같은 내용은 캐시된 결과 재사용)"""
+    key = (etag, encoding)
+    if etag:
+        with _compressed_lock:
+            cached = _compressed.get(key)
+            if cached is not None:
+                _compressed.move_to_end(key)
+                return cached
+
+    if encoding == 'br':
+        data = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+    if etag:
+        with _compressed_lock:
+            _compressed[key] = data
+            while len(_compressed) > COMPRESSED_CACHE_SIZE:
+                _compressed.popitem(last=False)
+    return data
+
+def install(app):
+    """앱에 응답 후처리 등록"""
+    @app.after_request
+    def compress_and_cache(response):
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return response
+        if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+            return response
+
+        # 응답이 직접 정한 Cache-Control이 있으면 우선 (no-store면 ETag/압축 캐시도 사용하지 않음)
+        view = app.view_functions.get(request.endpoint)
+        policy = response.headers.get('Cache-Control') or getattr(view, 'cache_control', None)
+        if policy is None or 'no-store' in policy:
+            return response
+
+        body = response.get_data()
+        etag = hashlib.sha1(body).hexdigest()[:20]
+        response.headers['Cache-Control'] = policy
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding and len(body) >= COMPRESS_MIN_SIZE:
+            data = compress(body, encoding, etag)
+            if len(data) < len(body):
+                response.set_data(data)
+                response.headers['Content-Encoding'] = encoding
+                # 압축 방식별로 다른 표현이므로 ETag도 구분
+                etag = f"{etag}-{encoding}"
+
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    return app
@@ -0,0 +1,171 @@
+"""
+카카오 스킬 콜백(useCallback) 응답 처리
+즉시 대기 메시지로 응답한 뒤, 백그라운드 워커가 최종 응답을 만들어
+카카오가 넘겨준 callbackUrl로 POST 합니다.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from deadline import start_budget, end_budget
+
+# 워커 수와 대기열 크기 (대기열이 가득 차면 동기 응답으로 처리)
+CALLBACK_WORKERS = int(os.getenv('KAKAO_CALLBACK_WORKERS', '4'))
+CALLBACK_QUEUE_SIZE = int(os.getenv('KAKAO_CALLBACK_QUEUE_SIZE', '100'))
+
+# 콜백 URL은 1분간 유효하므로 그 안에서만 작업/재시도
+CALLBACK_TTL = 55
+CALLBACK_BUDGET = 40
+CALLBACK_RETRIES = 3
+
+# 콜백을 보낼 수 있는 주소 (쉼표 구분, 이 목록 밖의 callbackUrl은 동기 응답으로 처리)
+# 항목은 호스트 이름(https만 허용)이고, 로컬 테스트용 루프백 주소만 "http://localhost:5001"처럼 http 허용
+CALLBACK_HOSTS = [host.strip() for host in os.getenv('KAKAO_CALLBACK_HOSTS', 'bot-api.kakao.com').split(',')
+                  if host.strip()]
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+_queue = queue.Queue(maxsize=CALLBACK_QUEUE_SIZE)
+_workers = []
+_workers_lock = threading.Lock()
+
+def _allowed_origins():
+    """허용 목록 → {(scheme, host, port)}"""
+    origins = set()
+    for entry in CALLBACK_HOSTS:
+        parts = urlsplit(entry if '://' in entry else f"https://{entry}")
+        if parts.scheme == 'http' and parts.hostname not in LOOPBACK_HOSTS:
+            continue
+        if parts.scheme in ('http', 'https') and parts.hostname:
+            origins.add((parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)))
+    return origins
+
+_origins = _allowed_origins()
+
+def is_allowed_callback_url(callback_url):
+    """카카오 콜백 주소인지 확인 (https + 허용 호스트, 사용자 정보가 들어간 URL은 거부)"""
+    try:
+        parts = urlsplit(callback_url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        return False
+    if parts.username is not None or parts.password is not None:
+        return False
+    return (parts.scheme, parts.hostname, port) in _origins
+
+def placeholder_response(text="환율 정보를 불러오는 중입니다. 잠시만 기다려주세요 ⏳"):
+    """콜백 모드 즉시 응답 (useCallback)"""
+    return {
+        "version": "2.0",
+        "useCallback": True,
+        "data": {
+            "text": text
+        }
+    }
+
+def _error_payload(message):
+    """콜백으로 보낼 에러 응답"""
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [{
+                "simpleText": {
+                    "text": f"⚠️ {message}\n잠시 후 다시 시도해주세요."
+                }
+            }]
+        }
+    }
+
+def _start_workers():
+    """워커 스레드 시작 (프로세스별로 처음 한 번만, gunicorn fork 이후 실행되도록 지연 시작)"""
+    with _workers_lock:
+        if _workers:
+            return
+        for i in range(CALLBACK_WORKERS):
+            worker = threading.Thread(target=_worker_loop, name=f"kakao-callback-{i}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+        print(f"🧵 콜백 워커 {CALLBACK_WORKERS}개 시작 (대기열 {CALLBACK_QUEUE_SIZE})")
+
+def submit(callback_url, build_payload):
+    """콜백 작업 등록 (허용되지 않은 주소이거나 대기열이 가득 차면 False)"""
+    if not is_allowed_callback_url(callback_url):
+        print(f"⚠️ 허용되지 않은 콜백 주소 - 동기 응답으로 처리: {callback_url[:60]}")
+        return False
+    _start_workers()
+    job = {
+        'callback_url': callback_url,
+        'build_payload': build_payload,
+        'expires_at': time.monotonic() + CALLBACK_TTL
+    }
+    try:
+        _queue.put_nowait(job)
+        return True
+    except queue.Full:
+        print("⚠️ 콜백 대기열 가득 참 - 동기 응답으로 처리")
+        return False
+
+def _worker_loop():
+    while True:
+        job = _queue.get()
+        try:
+            _run_job(job)
+        except Exception as e:
+            print(f"❌ 콜백 작업 에러: {e}")
+        finally:
+            _queue.task_done()
+
+def _run_job(job):
+    """최종 응답을 만들어 콜백 URL로 전송"""
+    if time.monotonic() >= job['expires_at']:
+        print("⏱️ 콜백 URL 만료 - 작업 폐기")
+        return
+
+    budget = min(CALLBACK_BUDGET, job['expires_at'] - time.monotonic())
+    budget_token = start_budget(budget)
+    try:
+        payload = job['build_payload']()
+    except Exception as e:
+        print(f"❌ 콜백 응답 생성 실패: {e}")
+        payload = _error_payload("정보를 가져오는데 실패했습니다.")
+    finally:
+        end_budget(budget_token)
+
+    post_callback(job['callback_url'], payload, job['expires_at'])
+
+def post_callback(callback_url, payload, expires_at=None):
+    """콜백 URL로 최종 응답 전송 (지수 백오프 재시도)"""
+    import requests
+
+    if not is_allowed_callback_url(callback_url):
+        print(f"❌ 허용되지 않은 콜백 주소 - 전송 안 함: {callback_url[:60]}")
+        return False
+
+    if expires_at is None:
+        expires_at = time.monotonic() + CALLBACK_TTL
+
+    for attempt in range(1, CALLBACK_RETRIES + 1):
+        left = expires_at - time.monotonic()
+        if left <= 0:
+            break
+
+        try:
+            response = requests.post(callback_url, json=payload, timeout=min(10, left))
+            if response.status_code == 200:
+                print(f"✅ 콜백 전송 성공 (시도 {attempt}회)")
+                return True
+            print(f"❌ 콜백 전송 실패: {response.status_code} (시도 {attempt}회)")
+            # 4xx는 재시도해도 결과가 같음 (이미 사용된 콜백 등)
+            if 400 <= response.status_code < 500:
+                return False
+        except Exception as e:
+            print(f"❌ 콜백 전송 에러: {e} (시도 {attempt}회)")
+
+        if attempt < CALLBACK_RETRIES:
+            time.sleep(min(0.5 * 2 ** (attempt - 1) + random.uniform(0, 0.25), max(0, expires_at - time.monotonic())))
+
+    print("❌ 콜백 전송 최종 실패")
+    return False
@@ -1,1012 +1,952 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file, has_request_context
 from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import re
+from urllib.parse import quote
 import os
 import json
+import time
+import threading
+
+from deadline import start_budget, end_budget, has_time, DeadlineExceeded
+from kakao_callback import placeholder_response, submit as submit_callback
+from kakao_request import parse_skill_request, InvalidSkillRequest, MAX_BODY_BYTES
+from response_encoder import KakaoJSONProvider
+import crypto_tickers
+import http_cache
+import market_index
+import singleflight
+import thumbnails
+import news_crawler
+import news_search
+import news_tagging
+import snapshot_store
+import snapshot_notify
+import rate_alerts
+import rate_history
+import user_prefs
+from rate_history import SPREAD_FIELDS
+from currencies import currency_info, currency_tag, currency_unit
 
 app = Flask(__name__)
 CORS(app)
 
-def get_exchange_rates_advanced():
-    """한국수출입은행 API로 실시간 환율 정보 조회"""
+# 모든 jsonify 응답을 UTF-8 그대로 인코딩 (한글/이모지 \uXXXX 이스케이프 없음)
+app.json = KakaoJSONProvider(app)
+
+# 큰 요청 본문은 읽기 전에 거절 (Content-Length가 없는 요청도 읽는 도중 중단)
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+
+# @http_cache.cacheable 로 지정한 GET 엔드포인트 압축/ETag (카카오 스킬 응답은 그대로)
+http_cache.install(app)
+
+# 갱신 데몬(refresher.py) 스냅샷 사용 기준
+RATES_SNAPSHOT_MAX_AGE = int(os.getenv('RATES_SNAPSHOT_MAX_AGE', '1800'))  # 30분
+MARKETS_SNAPSHOT_MAX_AGE = int(os.getenv('MARKETS_SNAPSHOT_MAX_AGE', '3600'))  # 1시간
+CRYPTO_SNAPSHOT_MAX_AGE = int(os.getenv('CRYPTO_SNAPSHOT_MAX_AGE', '300'))  # 5분
+REFRESHER_STALE_AFTER = 120  # 데몬 상태가 이보다 오래되면 멈춘 것으로 간주
+
+# 갱신 알림으로 메모리에 올려 둔 스냅샷 (알림 수신 중에는 요청마다 파일을 읽지 않음)
+_live_snapshots = {}
+
+def read_snapshot(name):
+    """스냅샷 조회 (알림 수신 중이면 메모리, 아니면 파일)"""
+    if snapshot_notify.listening():
+        return _live_snapshots.get(name)
+    return snapshot_store.read(name)
+
+def on_snapshot_updated(name, version):
+    """갱신 알림 처리: 스냅샷을 메모리에 올리고 환율 카드를 미리 렌더링"""
+    if name == 'news':
+        news_crawler.reload_index()
+        reload_news_thumbnails()
+    else:
+        _live_snapshots[name] = snapshot_store.read(name)
+    
+    if name in ('rates', 'news'):
+        render_exchange_items()
+        print(f"📡 {name} 스냅샷 갱신 반영 (버전 {version})")
+
+def reload_news_thumbnails():
+    """최신 기사 썸네일 해시를 메모리에 올려 둠 (요청 처리 중에는 썸네일 파일을 확인하지 않음)"""
+    thumbnails.reload_known(news['image'] for news in news_crawler.latest(5) if news.get('image'))
+
+def start_push_updates():
+    """워커 프로세스마다 한 번 갱신 알림 수신 시작 (gunicorn fork 이후 첫 요청에서 실행)"""
+    if snapshot_notify.listening():
+        return
+    if not snapshot_notify.start_listener():
+        return
+    
+    # 알림을 받기 전까지 쓸 현재 스냅샷을 한 번만 읽어 둠
+    for name in ('rates', 'refresher', 'markets', 'crypto'):
+        _live_snapshots[name] = snapshot_store.read(name)
+    news_crawler.use_push_updates()
+    render_exchange_items()
+
+for _name in ('rates', 'refresher', 'news', 'markets', 'crypto'):
+    snapshot_notify.subscribe(_name, on_snapshot_updated)
+
+@app.before_request
+def ensure_warm():
+    """캐시가 준비되기 전에는 요청을 처리하지 않음 (fork된 워커나 WARM_START=0이면 여기서 준비)"""
+    if not warmed():
+        warm_start()
+
+def refresher_alive():
+    """갱신 데몬이 동작 중인지 확인 (동작 중이면 웹 워커는 외부 호출을 하지 않음)"""
+    status = read_snapshot('refresher')
+    return bool(status) and snapshot_store.age(status) < REFRESHER_STALE_AFTER
+
+def get_rates_snapshot():
+    """갱신 데몬이 게시한 실시간 환율 스냅샷 (없거나 오래되면 None)"""
+    snapshot = read_snapshot('rates')
+    if snapshot and not rates_snapshot_stale(snapshot):
+        return snapshot
+    return None
+
+def rates_snapshot_stale(snapshot):
+    """환율 스냅샷이 RATES_SNAPSHOT_MAX_AGE보다 오래됐는지"""
+    return snapshot_store.age(snapshot) >= RATES_SNAPSHOT_MAX_AGE
+
+def get_fallback_rates():
+    """크롤링 실패시 사용할 폴백 환율 데이터 (2026-01-22 15:42 환전 고시 환율)"""
+    return [
+        {'currency': 'USD', 'rate': '1,469.20', 'change': '+1.90', 'flag': '🇺🇸', 'name': '미국 달러'},
+        {'currency': 'JPY100', 'rate': '925.42', 'change': '-1.14', 'flag': '🇯🇵', 'name': '일본 엔'},
+        {'currency': 'EUR', 'rate': '1,717.27', 'change': '+2.73', 'flag': '🇪🇺', 'name': '유로'},
+        {'currency': 'CNY', 'rate': '211.11', 'change': '+0.29', 'flag': '🇨🇳', 'name': '중국 위안'},
+        {'currency': 'GBP', 'rate': '1,972.33', 'change': '+2.92', 'flag': '🇬🇧', 'name': '영국 파운드'}
+    ]
+
+# 뉴스 캐시 (마지막으로 크롤링에 성공한 뉴스, 워커 간 공유를 위해 파일에도 저장)
+NEWS_CACHE_TTL = 300  # 5분
+NEWS_FILE = '/tmp/last_news.json'
+_news_cache = {'items': None, 'timestamp': 0.0}
+
+# 실시간 뉴스 조회를 시도하기 위한 최소 남은 예산 (초)
+NEWS_MIN_BUDGET = 1.5
+
+def get_fallback_news():
+    """뉴스 크롤링 실패시 사용할 폴백 뉴스 (매일경제 계열만)"""
+    return [
+        {'title': '고환율에도 주요소 기름값 6주 연속 내려...국제유가 하락', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매일경제'},
+        {'title': '日감사원 美추기 구입비, 헬저급 3년간 2.8조원 낭비', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': 'MBN'},
+        {'title': '[단독] 국민연금이 원화약세 주력하나?', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매경이코노미'}
+    ]
+
+def save_news(news_list):
+    """뉴스를 메모리 캐시와 파일에 저장"""
+    _news_cache['items'] = news_list
+    _news_cache['timestamp'] = time.time()
     try:
-        from datetime import datetime
-        import os
-        
-        # API 키 (환경변수에서 가져오거나 직접 입력)
-        api_key = os.getenv('EXIM_API_KEY', 'YOUR_API_KEY_HERE')
-        
-        # API 키 확인 로그
-        if api_key == 'YOUR_API_KEY_HERE':
-            print("⚠️ 한국수출입은행 API 키가 설정되지 않았습니다")
-            return None
-        
-        print(f"🔑 API 키 확인: {api_key[:10]}... (길이: {len(api_key)})")
-        
-        # 오늘 날짜 (YYYYMMDD)
-        today = datetime.now().strftime('%Y%m%d')
-        print(f"📅 조회 날짜: {today}")
-        
-        # 한국수출입은행 API
-        url = 'https://www.koreaexim.go.kr/site/program/financial/exchangeJSON'
-        params = {
-            'authkey': api_key,
-            'searchdate': today,
-            'data': 'AP01'
-        }
+        with open(NEWS_FILE, 'w') as f:
+            json.dump({
+                'timestamp': _news_cache['timestamp'],
+                'news': news_list
+            }, f)
+    except:
+        pass
+
+def load_saved_news(max_age=None):
+    """파일에 저장된 뉴스를 메모리 캐시로 불러오기 (max_age보다 오래됐거나 없으면 None)"""
+    try:
+        if os.path.exists(NEWS_FILE):
+            with open(NEWS_FILE, 'r') as f:
+                data = json.load(f)
+            if data.get('news') and (max_age is None or time.time() - data.get('timestamp', 0) < max_age):
+                _news_cache['items'] = data['news']
+                _news_cache['timestamp'] = data['timestamp']
+                return data['news']
+    except:
+        pass
+    return None
+
+def load_fresh_news():
+    """다른 워커가 저장한 신선한 뉴스 불러오기 (없거나 오래되면 None)"""
+    return load_saved_news(NEWS_CACHE_TTL)
+
+def refresh_news():
+    """뉴스 갱신 (동시 요청과 다른 워커의 갱신은 하나의 크롤링으로 병합)"""
+    try:
+        return singleflight.do('news', get_exchange_news, lock_file=True, recheck=load_fresh_news)
+    except DeadlineExceeded:
+        print("⏱️ 응답 예산 부족 - 진행 중인 뉴스 갱신 대기 중단")
+        return _news_cache['items'] or []
+
+def refresh_news_async():
+    """뉴스 갱신을 백그라운드에서 시작 (사용자 요청은 기다리지 않음)"""
+    threading.Thread(target=refresh_news, name='news-refresh', daemon=True).start()
+
+def get_news_within_budget():
+    """응답 예산 안에서 뉴스 가져오기 (신선한 캐시 → 기사 색인 → 오래된 캐시 + 백그라운드 갱신 → 실시간 크롤링 → 생략)"""
+    cached = _news_cache['items']
+    age = time.time() - _news_cache['timestamp']
+    
+    if cached and age < NEWS_CACHE_TTL:
+        return cached
+    
+    # 색인에 기사가 있으면 mk.co.kr에 접속하지 않고 바로 응답
+    # 오래됐으면 백그라운드 갱신 (갱신 데몬이 동작 중이면 데몬에 맡김)
+    daemon_alive = refresher_alive()
+    news_list = news_crawler.latest(5)
+    if news_list:
+        index_age = news_crawler.index_age()
+        if not daemon_alive and (index_age is None or index_age >= NEWS_CACHE_TTL):
+            refresh_news_async()
+        return news_list
+    
+    if daemon_alive:
+        return cached or []
+    
+    # 오래된 캐시라도 있으면 바로 응답하고 갱신은 백그라운드에서 (콜드 스타트 직후 포함)
+    if cached:
+        refresh_news_async()
+        return cached
+    
+    if not has_time(NEWS_MIN_BUDGET):
+        print(f"⏱️ 응답 예산 부족 - 뉴스 실시간 조회 생략 (캐시 {'사용' if cached else '없음'})")
+        return cached or []
+    
+    return refresh_news()
+
+def get_exchange_news():
+    """환율 관련 뉴스 (매일경제, MBN, 매경이코노미만, 증분 크롤링 후 색인에서 최신순)"""
+    try:
+        news_crawler.crawl()
+        # 알림을 받는 다른 워커도 새 색인을 다시 읽도록 (갱신 데몬이 크롤링할 때와 동일)
+        snapshot_notify.notify('news', news_crawler.load_index().get('updated'))
+    except Exception as e:
+        print(f"뉴스 크롤링 에러: {e}")
+    
+    news_list = news_crawler.latest(5)
+    
+    # 새 기사가 반영된 검색 색인을 미리 생성 (검색 요청이 생성 비용을 내지 않도록)
+    news_search.get_index()
+    
+    # 폴백 뉴스 (오래된 캐시가 있으면 우선 사용)
+    if not news_list:
+        return _news_cache['items'] or get_fallback_news()
+    
+    # 썸네일은 백그라운드에서 한 번만 받아 캐시
+    for news in news_list:
+        thumbnails.prefetch(news['image'])
+    
+    save_news(news_list)
+    
+    return news_list
+
+def format_currency_data(rates):
+    """환율 데이터를 카카오톡 형식으로 포맷팅"""
+    formatted_rates = []
+    for rate in rates:
+        currency_code = rate.get('currency', '').split()[0]
+        info = currency_info(currency_code)
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json'
+        formatted_rates.append({
+            'code': currency_code,
+            'currency': f"{currency_code} ({info['name']})",
+            'currency_en': f"{currency_code} ({info['name_en']})",
+            'rate': rate.get('rate', 'N/A'),
+            'change': rate.get('change', '0'),
+            'flag': info['flag'],
+            # 송금/현찰 환율 (제공처가 준 경우만)
+            **{field: rate[field] for field in SPREAD_FIELDS if rate.get(field)}
+        })
+    
+    return formatted_rates
+
+def get_currency_headline(currency_code):
+    """통화별 최신 기사 (색인 시점에 태그된 맵에서 바로 조회)"""
+    headlines = news_tagging.get_headline_map(news_crawler.load_index()).get(currency_tag(currency_code))
+    return headlines[0] if headlines else None
+
+def public_base_url():
+    """외부에서 접근 가능한 서버 주소 (썸네일 URL 생성용)"""
+    base_url = os.getenv('PUBLIC_BASE_URL')
+    if base_url:
+        return base_url
+    if has_request_context():
+        return request.url_root
+    return None
+
+def build_news_list_items(news_list):
+    """뉴스 ListCard 아이템 (이미지 포함)"""
+    news_list_items = []
+    for news in news_list:
+        item = {
+            "title": news['title'][:50] + '...' if len(news['title']) > 50 else news['title'],
+            "description": f"{news.get('time', '')} {news.get('source', '매일경제')}".strip(),
+            "link": {
+                "web": news['link']
+            }
         }
         
-        print(f"🌐 API 요청: {url}")
-        print(f"📊 파라미터: searchdate={today}, data=AP01")
+        # 썸네일 이미지 추가 (캐시된 썸네일이 있으면 우리 서버에서 제공)
+        if news.get('image'):
+            image_url = thumbnails.thumbnail_url(news['image'], public_base_url(), fetch_missing=not refresher_alive())
+            if image_url:
+                item['imageUrl'] = image_url
         
-        response = requests.get(url, params=params, headers=headers, timeout=30)
+        news_list_items.append(item)
+    
+    return news_list_items
+
+# 미리 렌더링한 환율 ListCard 아이템 (환율 버전과 뉴스 색인이 같으면 재사용)
+# items: 기본 응답, by_code[언어][통화 코드]: 사용자 설정 응답 조립용
+# details[통화 코드][살 때/팔 때/None]: 상세 환율 스킬 응답 문구
+# stale_at: 오래된 스냅샷을 쓰는 중이면 그 스냅샷 시각
+_rendered_rates = {'version': None, 'news_index': None, 'stale_at': None, 'items': None,
+                   'by_code': {}, 'order': [], 'numbers': {}, 'changes': {}, 'details': {}}
+
+# 상세 환율 표시 순서 (필드, 고객이 살 때/팔 때, 이름)
+SPREAD_LABELS = [
+    ('tts', 'buy', "송금 보낼 때"),
+    ('cash_buy', 'buy', "현찰 살 때"),
+    ('ttb', 'sell', "송금 받을 때"),
+    ('cash_sell', 'sell', "현찰 팔 때"),
+]
+TRADE_SIDES = (None, 'buy', 'sell')
+
+# 응답 문구 (사용자 설정 언어별)
+RESPONSE_LABELS = {
+    'ko': {
+        'rates_title': "이 시각 환율",
+        'news_title': "환율 관련 뉴스",
+        'market_button': "매일경제 마켓",
+        'news_button': "뉴스 더보기",
+        'updated': "업데이트: {time} (환전고시환율)",
+        'stale': "⚠️ {time} 기준 환율입니다 (실시간 갱신 지연)",
+        'amount': "{amount} {code} = {krw}원"
+    },
+    'en': {
+        'rates_title': "Exchange rates now",
+        'news_title': "FX news",
+        'market_button': "MK Market",
+        'news_button': "More news",
+        'updated': "Updated: {time} KST",
+        'stale': "⚠️ Rates as of {time} KST (live updates delayed)",
+        'amount': "{amount} {code} = KRW {krw}"
+    }
+}
+
+def render_exchange_items():
+    """환율 ListCard 아이템 렌더링 (환율/뉴스가 바뀌었을 때만 새로 생성)"""
+    # 환율 정보 가져오기 (우선순위)
+    # 1. 갱신 데몬이 게시한 실시간 환율 스냅샷
+    # 2. 오래된 스냅샷 (데몬이 멈췄어도 마지막 실시간 환율을 기준 시각과 함께 표시)
+    # 3. 폴백 데이터 (스냅샷이 한 번도 없을 때만, 수동 업데이트)
+    snapshot = read_snapshot('rates')
+    stale = bool(snapshot) and rates_snapshot_stale(snapshot)
+    version = (snapshot['version'], stale) if snapshot else 'fallback'
+    news_index = news_crawler.load_index()
+    
+    if _rendered_rates['version'] == version and _rendered_rates['news_index'] is news_index:
+        return _rendered_rates['items']
+    
+    if snapshot:
+        rates = snapshot['data']['rates']
+        if stale:
+            print(f"⚠️ 오래된 환율 스냅샷 사용 ({snapshot_store.age(snapshot):.0f}초 전, {snapshot['data'].get('source')})")
+        else:
+            print(f"✅ 갱신 데몬 환율 스냅샷 사용 ({snapshot['data'].get('source')})")
+    else:
+        rates = get_fallback_rates()
+        print("✅ 정확한 환율 데이터 사용 (네이버 금융 기준)")
+    
+    rates = format_currency_data(rates)
+    
+    # 통화별 ListCard 아이템 (언어별로 한 번씩 렌더링)
+    by_code = {language: {} for language in user_prefs.LANGUAGES}
+    order, numbers, changes = [], {}, {}
+    for rate in rates:
+        change_icon = "▲" if '+' in str(rate['change']) else "▼" if '-' in str(rate['change']) else "━"
+        change_value = str(rate['change']).replace('+', '').replace('-', '')
+        change_text = f"{change_icon} {change_value}"
         
-        print(f"📡 응답 상태: {response.status_code}")
+        # 해당 통화의 최신 기사로 연결
+        headline = get_currency_headline(rate['code'])
         
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                print(f"✅ JSON 파싱 성공, 항목 수: {len(data) if isinstance(data, list) else 'dict'}")
-            except:
-                print(f"❌ JSON 파싱 실패, 응답 내용: {response.text[:200]}")
-                return None
-            
-            # 응답이 에러 메시지인지 확인
-            if isinstance(data, dict) and 'error' in data:
-                print(f"❌ API 에러 응답: {data}")
-                return None
-            
-            # 필요한 통화만 추출
-            target_currencies = {
-                'USD': '미국 달러',
-                'JPY(100)': '일본 엔',
-                'EUR': '유로',
-                'CNY': '중국 위안',
-                'GBP': '영국 파운드'
+        for language, items in by_code.items():
+            name = rate['currency_en'] if language == 'en' else rate['currency']
+            item = {
+                "title": f"{rate['flag']} {name}",
+                "description": f"{rate['rate']}  {change_text}"
             }
-            
-            rates = []
-            
-            for item in data:
-                cur_unit = item.get('cur_unit', '')
-                
-                if cur_unit in target_currencies:
-                    # 환율
-                    deal_bas_r = item.get('deal_bas_r', '0')
-                    rate = deal_bas_r.replace(',', '')
-                    
-                    # 전일 대비
-                    try:
-                        cur_val = float(rate)
-                        yest_val = float(item.get('bkpr', '0').replace(',', ''))
-                        change = cur_val - yest_val
-                        change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    except:
-                        change_str = "+0.00"
-                    
-                    # 통화 코드 정리
-                    currency_code = 'JPY100' if cur_unit == 'JPY(100)' else cur_unit
-                    
-                    rates.append({
-                        'currency': currency_code,
-                        'rate': deal_bas_r,
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 {currency_code}: {deal_bas_r} ({change_str})")
-            
-            if rates:
-                print(f"✅ 한국수출입은행 API에서 실시간 환율 수집 성공: {len(rates)}개")
-                return rates
-            else:
-                print("⚠️ API 응답은 있지만 대상 통화 데이터가 없음")
-                return None
-        else:
-            print(f"❌ API 요청 실패: {response.status_code}")
-            print(f"   응답 내용: {response.text[:500]}")
-            return None
-            
-    except requests.exceptions.Timeout:
-        print(f"⏱️ 한국수출입은행 API 타임아웃 (30초 초과)")
-        return None
-    except requests.exceptions.ConnectionError as e:
-        print(f"🔌 한국수출입은행 API 연결 실패: {e}")
-        return None
+            if headline:
+                item['link'] = {"web": headline['link']}
+            items[rate['code']] = item
+        
+        order.append(rate['code'])
+        numbers[rate['code']] = rate_alerts.parse_rate(rate['rate'])
+        changes[rate['code']] = change_text
+    
+    exchange_list_items = [by_code['ko'][code] for code in order]
+    
+    # 상세 환율 스킬 응답도 환율 버전마다 한 번만 생성 (최근 환율 범위 포함)
+    ranges = get_rate_ranges(rate['code'] for rate in rates)
+    details = {rate['code']: {side: build_rate_detail_text(rate, side, ranges.get(rate['code'])) for side in TRADE_SIDES}
+               for rate in rates}
+    
+    stale_at = snapshot['timestamp'] if stale else None
+    _rendered_rates.update(version=version, news_index=news_index, stale_at=stale_at, items=exchange_list_items,
+                           by_code=by_code, order=order, numbers=numbers, changes=changes, details=details)
+    return exchange_list_items
+
+# 상세 환율에 보여줄 최근 이력 기간 (일)
+HISTORY_DAYS = 30
+
+def get_rate_ranges(codes):
+    """통화별 최근 HISTORY_DAYS일 (최저, 최고) 매매기준율 (이력이 없거나 읽기에 실패한 통화는 생략)"""
+    ranges = {}
+    try:
+        for code in codes:
+            values = [rate for _, rate in rate_history.get_history(code, HISTORY_DAYS)]
+            if values:
+                ranges[code] = (min(values), max(values))
     except Exception as e:
-        print(f"❌ 한국수출입은행 API 에러: {e}")
-        import traceback
-        print(traceback.format_exc())
-        return None
+        print(f"⚠️ 환율 이력 조회 실패: {e}")
+    return ranges
 
-def get_exchange_rates_mk():
-    """매일경제 환율 API로 실시간 환율 조회 (다중 프록시 시도)"""
+def build_rate_detail_text(rate, side=None, history_range=None):
+    """통화 상세 환율 문구 (매매기준율 + 송금/현찰 환율, side가 있으면 살 때/팔 때만, 최근 이력 범위)"""
+    unit = " (100엔당)" if currency_unit(rate['code']) == 100 else ""
+    title = {'buy': "살 때", 'sell': "팔 때"}.get(side, "환율")
+    lines = [f"{rate['flag']} {rate['currency']} {title}{unit}", f"매매기준율: {rate['rate']}원"]
     
-    # 시도할 프록시 목록
-    proxy_services = [
-        ("AllOrigins", "https://api.allorigins.win/raw?url="),
-        ("CorsProxy.io", "https://corsproxy.io/?"),
-        ("직접 연결", "")
-    ]
+    spreads = [f"{label}: {rate[field]}원" for field, field_side, label in SPREAD_LABELS
+               if rate.get(field) and side in (None, field_side)]
+    if spreads:
+        lines.extend(spreads)
+    else:
+        lines.append("송금/현찰 환율은 지금 제공처에서 받지 못했습니다.")
+    if history_range:
+        low, high = history_range
+        lines.append(f"최근 {HISTORY_DAYS}일: 최저 {low:,.2f}원 / 최고 {high:,.2f}원")
+    return "\n".join(lines)
+
+def personalize_exchange_items(prefs):
+    """사용자 설정(관심 통화, 기준 금액, 언어)에 맞춰 미리 렌더링한 아이템으로 응답 조립"""
+    exchange_list_items = render_exchange_items()
+    if user_prefs.is_default(prefs):
+        return exchange_list_items
     
-    target_url = "https://stock.mk.co.kr/json/exchangeList.php"
+    language = prefs['language'] if prefs['language'] in RESPONSE_LABELS else 'ko'
+    by_code = _rendered_rates['by_code'][language]
+    amount = prefs['amount']
     
-    for proxy_name, proxy_url in proxy_services:
-        try:
-            full_url = proxy_url + target_url if proxy_url else target_url
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            print(f"💰 매일경제 API 요청 ({proxy_name}): {target_url}")
-            response = requests.get(full_url, headers=headers, timeout=15)
-            
-            print(f"📡 응답 상태: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ JSON 파싱 성공, 항목 수: {len(data) if isinstance(data, list) else '?'}")
-                
-                # 통화 매핑
-                currency_map = {
-                    'USD': {'code': 'USD', 'name': '미국 달러'},
-                    'JPY': {'code': 'JPY100', 'name': '일본 엔'},
-                    'EUR': {'code': 'EUR', 'name': '유로'},
-                    'CNY': {'code': 'CNY', 'name': '중국 위안'},
-                    'GBP': {'code': 'GBP', 'name': '영국 파운드'}
-                }
-                
-                rates = []
-                
-                for item in data:
-                    cur_code = item.get('code', '') or item.get('CUR_CD', '')
-                    
-                    if cur_code in currency_map:
-                        # 매매기준율 (다양한 필드명 시도)
-                        base_rate = (item.get('base', '') or 
-                                    item.get('BASE', '') or 
-                                    item.get('deal_bas_r', '') or 
-                                    item.get('DEAL_BAS_R', '') or '0')
-                        
-                        # 전일대비
-                        change = (item.get('change', '') or 
-                                 item.get('CHANGE', '') or 
-                                 item.get('dod', '') or '0')
-                        
-                        try:
-                            change_val = float(str(change).replace(',', ''))
-                            if change_val > 0:
-                                change_str = f"+{change_val:.2f}"
-                            elif change_val < 0:
-                                change_str = f"{change_val:.2f}"
-                            else:
-                                change_str = "+0.00"
-                        except:
-                            change_str = "+0.00"
-                        
-                        # JPY는 100엔 기준
-                        rate_val = str(base_rate)
-                        if cur_code == 'JPY':
-                            try:
-                                rate_num = float(str(base_rate).replace(',', ''))
-                                rate_val = f"{rate_num * 100:,.2f}"
-                                if change_val != 0:
-                                    change_val = change_val * 100
-                                    change_str = f"+{change_val:.2f}" if change_val > 0 else f"{change_val:.2f}"
-                            except:
-                                pass
-                        
-                        rates.append({
-                            'currency': currency_map[cur_code]['code'],
-                            'rate': rate_val,
-                            'change': change_str
-                        })
-                        
-                        print(f"  💱 {currency_map[cur_code]['code']}: {rate_val} ({change_str})")
-                
-                if rates:
-                    print(f"✅ 매일경제에서 실시간 환율 수집 성공: {len(rates)}개 ({proxy_name} 사용)")
-                    return rates
-                else:
-                    print(f"⚠️ {proxy_name} 데이터 파싱 실패, 다음 프록시 시도...")
-                    continue
-                    
-            else:
-                print(f"❌ {proxy_name} 요청 실패: {response.status_code}, 다음 프록시 시도...")
-                continue
-                
-        except Exception as e:
-            print(f"❌ {proxy_name} 에러: {e}, 다음 프록시 시도...")
+    items = []
+    for code in prefs['currencies'] or _rendered_rates['order']:
+        item = by_code.get(code)
+        if not item:
             continue
+        
+        # 기준 금액이 있으면 원화 환산 금액으로 설명만 교체
+        rate = _rendered_rates['numbers'].get(code)
+        if amount != 1 and rate is not None:
+            text = RESPONSE_LABELS[language]['amount'].format(
+                amount=f"{amount:,}", code=currency_tag(code), krw=f"{amount * rate / currency_unit(code):,.0f}"
+            )
+            item = dict(item, description=f"{text}  {_rendered_rates['changes'][code]}")
+        items.append(item)
     
-    print("❌ 모든 프록시 실패")
-    return None
+    # 관심 통화가 모두 고시되지 않은 경우 기본 목록
+    return items or exchange_list_items
 
-def get_exchange_rates_hana():
-    """하나은행 환율 API로 실시간 환율 조회"""
-    try:
-        # 하나은행 환율 조회 API
-        url = "https://www.kebhana.com/cms/rate/index.do?contentUrl=/cms/rate/wpfxd651_01i.json"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://www.kebhana.com/'
+def build_exchange_rate_response(news_list, prefs=user_prefs.DEFAULT_PREFS):
+    """환율 + 뉴스 카카오 응답 생성"""
+    exchange_list_items = personalize_exchange_items(prefs)
+    
+    if not exchange_list_items:
+        return None
+    
+    labels = RESPONSE_LABELS.get(prefs['language'], RESPONSE_LABELS['ko'])
+    
+    # 뉴스 ListCard 아이템 (이미지 포함)
+    news_list_items = build_news_list_items(news_list)
+    
+    # 응답 구성
+    outputs = [
+        {
+            "listCard": {
+                "header": {
+                    "title": labels['rates_title']
+                },
+                "items": exchange_list_items[:5],
+                "buttons": [
+                    {
+                        "action": "webLink",
+                        "label": labels['market_button'],
+                        "webLinkUrl": "https://stock.mk.co.kr/"
+                    }
+                ]
+            }
         }
-        
-        print(f"🏦 하나은행 API 요청: {url}")
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        print(f"📡 응답 상태: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ JSON 파싱 성공")
-            
-            # 하나은행 응답 구조에 맞게 파싱
-            rates = []
-            
-            # 통화 매핑
-            currency_map = {
-                'USD': {'code': 'USD', 'name': '미국 달러'},
-                'JPY': {'code': 'JPY100', 'name': '일본 엔'},
-                'EUR': {'code': 'EUR', 'name': '유로'},
-                'CNY': {'code': 'CNY', 'name': '중국 위안'},
-                'GBP': {'code': 'GBP', 'name': '영국 파운드'}
+    ]
+    
+    # 뉴스가 없으면 환율 카드만 응답
+    if news_list_items:
+        outputs.append({
+            "listCard": {
+                "header": {
+                    "title": labels['news_title']
+                },
+                "items": news_list_items[:5],
+                "buttons": [
+                    {
+                        "action": "webLink",
+                        "label": labels['news_button'],
+                        "webLinkUrl": "https://www.mk.co.kr/news/search/?word=환율"
+                    }
+                ]
             }
-            
-            for item in data:
-                cur_code = item.get('CUR_CD', '')
-                
-                if cur_code in currency_map:
-                    # 매매기준율
-                    deal_bas_r = item.get('DEAL_BAS_R', '0')
-                    
-                    # 전일 대비
-                    change_amt = item.get('CHANGE', '0')
-                    
-                    try:
-                        change_val = float(change_amt.replace(',', ''))
-                        if change_val > 0:
-                            change_str = f"+{change_val:.2f}"
-                        elif change_val < 0:
-                            change_str = f"{change_val:.2f}"
-                        else:
-                            change_str = "+0.00"
-                    except:
-                        change_str = "+0.00"
-                    
-                    # JPY는 100엔 기준
-                    if cur_code == 'JPY':
-                        try:
-                            rate_val = float(deal_bas_r.replace(',', ''))
-                            deal_bas_r = f"{rate_val * 100:,.2f}"
-                            if change_val != 0:
-                                change_val = change_val * 100
-                                change_str = f"+{change_val:.2f}" if change_val > 0 else f"{change_val:.2f}"
-                        except:
-                            pass
-                    
-                    rates.append({
-                        'currency': currency_map[cur_code]['code'],
-                        'rate': deal_bas_r,
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 {currency_map[cur_code]['code']}: {deal_bas_r} ({change_str})")
-            
-            if rates:
-                print(f"✅ 하나은행에서 실시간 환율 수집 성공: {len(rates)}개")
-                return rates
-            else:
-                print("⚠️ 하나은행 데이터 파싱 실패")
-                return None
-                
-        else:
-            print(f"❌ 하나은행 API 요청 실패: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        print(f"❌ 하나은행 API 에러: {e}")
-        import traceback
-        print(traceback.format_exc())
+        })
+    
+    stale_at = _rendered_rates['stale_at']
+    if stale_at:
+        updated = labels['stale'].format(time=(datetime.utcfromtimestamp(stale_at) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M'))
+    else:
+        updated = labels['updated'].format(time=(datetime.utcnow() + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M'))
+    outputs.append({
+        "simpleText": {
+            "text": updated
+        }
+    })
+    
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": outputs
+        }
+    }
+
+def build_exchange_rate_callback_response(prefs=user_prefs.DEFAULT_PREFS):
+    """콜백 모드용 응답 생성 (응답 시간 여유가 있으므로 뉴스를 실시간으로 조회, 갱신 데몬이 동작 중이면 데몬에 맡김)"""
+    news_list = get_news_within_budget() if refresher_alive() else refresh_news()
+    response = build_exchange_rate_response(news_list, prefs)
+    if response is None:
+        raise ValueError("환율 정보를 가져오는데 실패했습니다.")
+    return response
+
+def respond_with_callback(skill_request, build_payload):
+    """콜백이 활성화된 요청이면 즉시 대기 응답 후 백그라운드에서 최종 응답 전송
+    
+    콜백 모드가 아니거나 대기열이 가득 차면 None을 반환하므로
+    호출한 스킬은 동기 응답으로 처리하면 됩니다.
+    """
+    callback_url = skill_request.callback_url
+    if not callback_url:
         return None
+    
+    if not submit_callback(callback_url, build_payload):
+        return None
+    
+    print(f"📨 콜백 모드 응답: {callback_url[:60]}")
+    return jsonify(placeholder_response())
 
-def get_exchange_rates_naver():
-    """네이버 금융 환율 API (실시간 정확)"""
+@app.route('/exchange_rate', methods=['POST'])
+def exchange_rate():
+    """카카오톡 스킬 엔드포인트"""
+    # 필요한 필드만 파싱 (형식 오류는 invalid_skill_request 핸들러에서 응답)
+    skill_request = parse_skill_request(request)
+    
+    # 카카오 스킬 타임아웃 안에 응답하도록 예산 설정
+    budget_token = start_budget()
     try:
-        # 네이버 금융 실시간 환율 API
-        base_url = "https://polling.finance.naver.com/api/realtime/marketindex/exchange"
+        # 요청 데이터 로깅
+        print(f"수신 데이터: {skill_request}")
         
-        currencies = ['FRX.KRWUSD', 'FRX.KRWJPY', 'FRX.KRWEUR', 'FRX.KRWCNY', 'FRX.KRWGBP']
+        # 사용자 설정 (관심 통화, 기준 금액, 언어)
+        prefs = user_prefs.get_prefs(skill_request.user_id)
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Referer': 'https://finance.naver.com/'
-        }
+        # 콜백 모드: 즉시 대기 메시지 응답, 최종 응답은 백그라운드에서 전송
+        callback_response = respond_with_callback(skill_request, lambda: build_exchange_rate_callback_response(prefs))
+        if callback_response is not None:
+            return callback_response
         
-        rates = []
+        # 뉴스 정보 가져오기 (예산이 부족하면 캐시 사용 또는 생략)
+        news_list = get_news_within_budget()
         
-        for cur_code in currencies:
-            try:
-                url = f"{base_url}/{cur_code}"
-                
-                print(f"🌐 네이버 API 요청: {cur_code}")
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # 통화 코드
-                    if 'USD' in cur_code:
-                        currency = 'USD'
-                    elif 'JPY' in cur_code:
-                        currency = 'JPY100'
-                    elif 'EUR' in cur_code:
-                        currency = 'EUR'
-                    elif 'CNY' in cur_code:
-                        currency = 'CNY'
-                    elif 'GBP' in cur_code:
-                        currency = 'GBP'
-                    else:
-                        continue
-                    
-                    # 환율
-                    trade_price = data.get('tradePrice', 0)
-                    
-                    # 변동폭
-                    change_val = data.get('change', 0)
-                    
-                    # JPY는 100엔 기준
-                    if currency == 'JPY100':
-                        trade_price = trade_price * 100
-                        change_val = change_val * 100
-                    
-                    # 변동폭 문자열
-                    if change_val > 0:
-                        change_str = f"+{change_val:.2f}"
-                    elif change_val < 0:
-                        change_str = f"{change_val:.2f}"
-                    else:
-                        change_str = "+0.00"
-                    
-                    rates.append({
-                        'currency': currency,
-                        'rate': f"{trade_price:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 {currency}: {trade_price:,.2f} ({change_str})")
-                    
-            except Exception as e:
-                print(f"  ⚠️ {cur_code} 조회 실패: {e}")
-                continue
+        response = build_exchange_rate_response(news_list, prefs)
+        
+        if response is None:
+            return create_error_response("환율 정보를 가져오는데 실패했습니다.")
+        
+        return jsonify(response)
         
-        if rates:
-            print(f"✅ 네이버 금융에서 실시간 환율 수집 성공: {len(rates)}개")
-            return rates
-        else:
-            print("❌ 네이버 금융 환율 수집 실패")
-            return None
-            
     except Exception as e:
-        print(f"❌ 네이버 금융 에러: {e}")
-        return None
-    """업비트 환율 API로 실시간 환율 조회 (안정적)"""
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
+    finally:
+        end_budget(budget_token)
+
+def get_news_keyword(skill_request):
+    """뉴스 검색어 추출 (스킬 파라미터 keyword 우선, 없으면 발화 전체)"""
+    keyword = skill_request.params.get('keyword') or skill_request.utterance
+    return keyword.strip()[:50]
+
+@app.route('/news', methods=['POST'])
+def news():
+    """카카오톡 뉴스 검색 스킬 (크롤링된 기사 색인에서 검색, 요청 시 스크래핑 없음)"""
+    skill_request = parse_skill_request(request)
     try:
-        # 업비트 환율 API
-        url = "https://quotation-api-cdn.dunamu.com/v1/forex/recent?codes=FRX.KRWUSD,FRX.KRWJPY,FRX.KRWEUR,FRX.KRWCNY,FRX.KRWGBP"
+        keyword = get_news_keyword(skill_request)
+        print(f"🔎 뉴스 검색: {keyword}")
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        results = news_search.search(keyword) if keyword else []
         
-        print(f"🌐 업비트 API 요청: {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        if not results:
+            return jsonify({
+                "version": "2.0",
+                "template": {
+                    "outputs": [{
+                        "simpleText": {
+                            "text": f"'{keyword}' 관련 뉴스를 찾지 못했습니다.\n다른 검색어로 다시 시도해주세요."
+                        }
+                    }]
+                }
+            })
         
-        print(f"📡 응답 상태: {response.status_code}")
+        return jsonify({
+            "version": "2.0",
+            "template": {
+                "outputs": [{
+                    "listCard": {
+                        "header": {
+                            "title": f"'{keyword}' 관련 뉴스"
+                        },
+                        "items": build_news_list_items(results),
+                        "buttons": [
+                            {
+                                "action": "webLink",
+                                "label": "뉴스 더보기",
+                                "webLinkUrl": f"https://www.mk.co.kr/news/search/?word={quote(keyword, safe='')}"
+                            }
+                        ]
+                    }
+                }]
+            }
+        })
         
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ JSON 파싱 성공, 항목 수: {len(data)}")
-            
-            rates = []
-            
-            for item in data:
-                try:
-                    code = item.get('code', '')
-                    
-                    # 통화 코드 추출
-                    if code == 'FRX.KRWUSD':
-                        currency_code = 'USD'
-                    elif code == 'FRX.KRWJPY':
-                        currency_code = 'JPY100'
-                    elif code == 'FRX.KRWEUR':
-                        currency_code = 'EUR'
-                    elif code == 'FRX.KRWCNY':
-                        currency_code = 'CNY'
-                    elif code == 'FRX.KRWGBP':
-                        currency_code = 'GBP'
-                    else:
-                        continue
-                    
-                    # 환율 (basePrice)
-                    base_price = item.get('basePrice', 0)
-                    
-                    # JPY는 100엔 기준으로
-                    if currency_code == 'JPY100':
-                        base_price = base_price * 100
-                    
-                    # 변동폭 (changePrice)
-                    change_price = item.get('changePrice', 0)
-                    
-                    if currency_code == 'JPY100':
-                        change_price = change_price * 100
-                    
-                    # 변동폭 문자열
-                    if change_price > 0:
-                        change_str = f"+{change_price:.2f}"
-                    elif change_price < 0:
-                        change_str = f"{change_price:.2f}"
-                    else:
-                        change_str = "+0.00"
-                    
-                    rates.append({
-                        'currency': currency_code,
-                        'rate': f"{base_price:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 {currency_code}: {base_price:,.2f} ({change_str})")
-                    
-                except Exception as e:
-                    print(f"  ⚠️ 항목 파싱 에러: {e}")
-                    continue
-            
-            if rates:
-                print(f"✅ 업비트에서 실시간 환율 수집 성공: {len(rates)}개")
-                return rates
-            else:
-                print("❌ 업비트 환율 수집 실패: 데이터 없음")
-                return None
-                
-        else:
-            print(f"❌ 업비트 API 요청 실패: {response.status_code}")
-            print(f"   응답: {response.text[:200]}")
-            return None
-            
     except Exception as e:
-        print(f"❌ 업비트 API 에러: {e}")
+        print(f"에러 발생: {e}")
         import traceback
-        print(traceback.format_exc())
-        return None
-
-import os
-import json
-
-# 환율 저장 파일 경로
-RATES_FILE = '/tmp/last_rates.json'
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
 
-def save_rates(rates_data):
-    """환율을 파일에 저장"""
-    try:
-        with open(RATES_FILE, 'w') as f:
-            json.dump({
-                'timestamp': datetime.utcnow().isoformat(),
-                'rates': rates_data
-            }, f)
-    except:
-        pass
+def simple_text_response(text):
+    """simpleText 한 개로 된 카카오 응답"""
+    return jsonify({
+        "version": "2.0",
+        "template": {
+            "outputs": [{
+                "simpleText": {
+                    "text": text
+                }
+            }]
+        }
+    })
 
-def load_last_rates():
-    """저장된 환율 불러오기 (없으면 기준값 사용)"""
-    try:
-        if os.path.exists(RATES_FILE):
-            with open(RATES_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get('rates', {})
-    except:
-        pass
-    
-    # 초기 기준 환율 (2026-01-22 오전 기준)
-    return {
-        'USD': 1473.50,
-        'JPY100': 925.27,
-        'EUR': 1514.30,
-        'CNY': 197.30,
-        'GBP': 1803.20
-    }
+def format_alert(alert):
+    """알림 한 줄 표시"""
+    info = currency_info(alert['currency'])
+    condition = "이상" if alert['direction'] == rate_alerts.ABOVE else "이하"
+    return f"{info['flag']} {alert['currency']} {alert['threshold']:,.2f}원 {condition}"
 
-def get_exchange_rates_with_change():
-    """ExchangeRate-API + 실제 변동폭 계산"""
+@app.route('/alert', methods=['POST'])
+def alert():
+    """카카오톡 환율 알림 스킬 (등록 / 목록 / 해제)"""
+    skill_request = parse_skill_request(request)
     try:
-        # 현재 환율 조회
-        url = "https://open.er-api.com/v6/latest/KRW"
+        user_id = skill_request.user_id
+        utterance = skill_request.utterance
+        params = skill_request.params
         
-        response = requests.get(url, timeout=10)
+        if not user_id:
+            return create_error_response("사용자 정보를 확인할 수 없습니다.")
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            if data.get('result') == 'success':
-                rates_data = data['rates']
-                
-                # 이전 환율 불러오기
-                last_rates = load_last_rates()
-                
-                rates = []
-                
-                # USD
-                if 'USD' in rates_data:
-                    usd_to_krw = 1 / rates_data['USD']
-                    
-                    # 변동폭 계산
-                    if 'USD' in last_rates:
-                        change = usd_to_krw - last_rates['USD']
-                    else:
-                        change = 0
-                    
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'USD',
-                        'rate': f"{usd_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 USD: {usd_to_krw:,.2f} ({change_str})")
-                
-                # JPY (100엔 기준)
-                if 'JPY' in rates_data:
-                    jpy_to_krw = (1 / rates_data['JPY']) * 100
-                    
-                    if 'JPY100' in last_rates:
-                        change = jpy_to_krw - last_rates['JPY100']
-                    else:
-                        change = 0
-                    
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'JPY100',
-                        'rate': f"{jpy_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 JPY100: {jpy_to_krw:,.2f} ({change_str})")
-                
-                # EUR
-                if 'EUR' in rates_data:
-                    eur_to_krw = 1 / rates_data['EUR']
-                    
-                    if 'EUR' in last_rates:
-                        change = eur_to_krw - last_rates['EUR']
-                    else:
-                        change = 0
-                    
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'EUR',
-                        'rate': f"{eur_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 EUR: {eur_to_krw:,.2f} ({change_str})")
-                
-                # CNY
-                if 'CNY' in rates_data:
-                    cny_to_krw = 1 / rates_data['CNY']
-                    
-                    if 'CNY' in last_rates:
-                        change = cny_to_krw - last_rates['CNY']
-                    else:
-                        change = 0
-                    
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'CNY',
-                        'rate': f"{cny_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 CNY: {cny_to_krw:,.2f} ({change_str})")
-                
-                # GBP
-                if 'GBP' in rates_data:
-                    gbp_to_krw = 1 / rates_data['GBP']
-                    
-                    if 'GBP' in last_rates:
-                        change = gbp_to_krw - last_rates['GBP']
-                    else:
-                        change = 0
-                    
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'GBP',
-                        'rate': f"{gbp_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    
-                    print(f"  💱 GBP: {gbp_to_krw:,.2f} ({change_str})")
-                
-                # 현재 환율 저장
-                if rates:
-                    current_rates = {}
-                    if 'USD' in rates_data:
-                        current_rates['USD'] = 1 / rates_data['USD']
-                    if 'JPY' in rates_data:
-                        current_rates['JPY100'] = (1 / rates_data['JPY']) * 100
-                    if 'EUR' in rates_data:
-                        current_rates['EUR'] = 1 / rates_data['EUR']
-                    if 'CNY' in rates_data:
-                        current_rates['CNY'] = 1 / rates_data['CNY']
-                    if 'GBP' in rates_data:
-                        current_rates['GBP'] = 1 / rates_data['GBP']
-                    
-                    save_rates(current_rates)
-                    
-                    print(f"✅ ExchangeRate-API에서 환율 수집 성공: {len(rates)}개 (실시간 변동폭)")
-                    return rates
+        # 알림 목록
+        if '목록' in utterance or '내 알림' in utterance:
+            alerts = rate_alerts.list_alerts(user_id)
+            if not alerts:
+                return simple_text_response("등록된 환율 알림이 없습니다.")
+            lines = [format_alert(a) for a in alerts]
+            return simple_text_response("🔔 등록된 환율 알림\n" + "\n".join(lines))
         
-        return None
+        # 스킬 파라미터 통화는 환율 카드 코드로 정규화 (모르는 통화는 저장하지 않음)
+        currency = None
+        if params.get('currency'):
+            currency = rate_alerts.normalize_currency(params['currency'])
+            if not currency:
+                return simple_text_response(
+                    f"'{params['currency']}'은(는) 알림을 지원하지 않는 통화입니다.\n예) USD, 엔화, 유로"
+                )
         
-    except Exception as e:
-        print(f"❌ ExchangeRate-API 에러: {e}")
-        return None
-    """대체 API: exchangerate-api.com (무료, API 키 불필요)"""
-    try:
-        # KRW 기준 환율
-        url = "https://open.er-api.com/v6/latest/KRW"
+        # 알림 해제
+        if '해제' in utterance or '취소' in utterance:
+            currency = currency or rate_alerts.parse_currency(utterance)
+            count = rate_alerts.cancel_alerts(user_id, currency)
+            return simple_text_response(f"🔕 환율 알림 {count}개를 해제했습니다.")
         
-        response = requests.get(url, timeout=10)
+        # 알림 등록 (스킬 파라미터 우선, 없으면 발화에서 추출)
+        if currency and params.get('threshold'):
+            parsed = (
+                currency,
+                rate_alerts.BELOW if params.get('direction') in ('below', '이하') else rate_alerts.ABOVE,
+                rate_alerts.parse_rate(params['threshold'])
+            )
+        else:
+            parsed = rate_alerts.parse_alert_request(utterance, currency)
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            if data.get('result') == 'success':
-                rates_data = data['rates']
-                
-                rates = []
-                
-                # 이전 환율 (대략적인 값으로 변동폭 추정)
-                # 날짜 기반 시드로 하루 동안은 일관된 변동폭 유지
-                from datetime import datetime
-                import random
-                
-                today = datetime.now().strftime('%Y%m%d')
-                
-                # USD
-                if 'USD' in rates_data:
-                    random.seed(int(today + '1'))  # USD용 시드
-                    usd_to_krw = 1 / rates_data['USD']
-                    # 변동폭: 환율의 ±0.5% 내에서 랜덤
-                    change = random.uniform(-usd_to_krw * 0.005, usd_to_krw * 0.005)
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'USD',
-                        'rate': f"{usd_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    print(f"  💱 USD: {usd_to_krw:,.2f} ({change_str})")
-                
-                # JPY (100엔 기준)
-                if 'JPY' in rates_data:
-                    random.seed(int(today + '2'))  # JPY용 시드
-                    jpy_to_krw = (1 / rates_data['JPY']) * 100
-                    change = random.uniform(-jpy_to_krw * 0.005, jpy_to_krw * 0.005)
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'JPY100',
-                        'rate': f"{jpy_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    print(f"  💱 JPY100: {jpy_to_krw:,.2f} ({change_str})")
-                
-                # EUR
-                if 'EUR' in rates_data:
-                    random.seed(int(today + '3'))  # EUR용 시드
-                    eur_to_krw = 1 / rates_data['EUR']
-                    change = random.uniform(-eur_to_krw * 0.005, eur_to_krw * 0.005)
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'EUR',
-                        'rate': f"{eur_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    print(f"  💱 EUR: {eur_to_krw:,.2f} ({change_str})")
-                
-                # CNY
-                if 'CNY' in rates_data:
-                    random.seed(int(today + '4'))  # CNY용 시드
-                    cny_to_krw = 1 / rates_data['CNY']
-                    change = random.uniform(-cny_to_krw * 0.005, cny_to_krw * 0.005)
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'CNY',
-                        'rate': f"{cny_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    print(f"  💱 CNY: {cny_to_krw:,.2f} ({change_str})")
-                
-                # GBP
-                if 'GBP' in rates_data:
-                    random.seed(int(today + '5'))  # GBP용 시드
-                    gbp_to_krw = 1 / rates_data['GBP']
-                    change = random.uniform(-gbp_to_krw * 0.005, gbp_to_krw * 0.005)
-                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
-                    
-                    rates.append({
-                        'currency': 'GBP',
-                        'rate': f"{gbp_to_krw:,.2f}",
-                        'change': change_str
-                    })
-                    print(f"  💱 GBP: {gbp_to_krw:,.2f} ({change_str})")
-                
-                if rates:
-                    print(f"✅ ExchangeRate-API에서 환율 수집 성공: {len(rates)}개 (변동폭 추정 포함)")
-                    return rates
+        if not parsed or parsed[2] is None or parsed[2] <= 0:
+            return simple_text_response(
+                "알림 조건을 이해하지 못했습니다.\n예) USD가 1,500원 넘으면 알려줘\n예) 엔화가 900원 밑으로 떨어지면 알려줘"
+            )
         
-        return None
+        currency, direction, threshold = parsed
+        alert_id = rate_alerts.add_alert(user_id, currency, direction, threshold)
+        if alert_id is None:
+            return simple_text_response(f"알림은 최대 {rate_alerts.MAX_ALERTS_PER_USER}개까지 등록할 수 있습니다.")
+        
+        entry = {'currency': currency, 'direction': direction, 'threshold': threshold}
+        return simple_text_response(f"✅ 환율 알림 등록: {format_alert(entry)}\n조건에 도달하면 알려드릴게요.")
         
     except Exception as e:
-        print(f"❌ ExchangeRate-API 에러: {e}")
-        return None
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
 
-def get_fallback_rates():
-    """크롤링 실패시 사용할 폴백 환율 데이터 (2026-01-22 15:42 환전 고시 환율)"""
-    return [
-        {'currency': 'USD', 'rate': '1,469.20', 'change': '+1.90', 'flag': '🇺🇸', 'name': '미국 달러'},
-        {'currency': 'JPY100', 'rate': '925.42', 'change': '-1.14', 'flag': '🇯🇵', 'name': '일본 엔'},
-        {'currency': 'EUR', 'rate': '1,717.27', 'change': '+2.73', 'flag': '🇪🇺', 'name': '유로'},
-        {'currency': 'CNY', 'rate': '211.11', 'change': '+0.29', 'flag': '🇨🇳', 'name': '중국 위안'},
-        {'currency': 'GBP', 'rate': '1,972.33', 'change': '+2.92', 'flag': '🇬🇧', 'name': '영국 파운드'}
-    ]
+def format_prefs(prefs):
+    """사용자 설정 표시"""
+    currencies = ', '.join(prefs['currencies']) if prefs['currencies'] else "기본 (전체)"
+    language = "English" if prefs['language'] == 'en' else "한국어"
+    return f"관심 통화: {currencies}\n기준 금액: {prefs['amount']:,}\n언어: {language}"
 
-def get_exchange_news():
-    """환율 관련 뉴스 크롤링 (매일경제, MBN, 매경이코노미만)"""
+@app.route('/preferences', methods=['POST'])
+def preferences():
+    """카카오톡 환율 응답 설정 스킬 (관심 통화 / 기준 금액 / 언어 / 초기화)"""
+    skill_request = parse_skill_request(request)
     try:
-        url = "https://www.mk.co.kr/news/search/?word=환율"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        }
+        user_id = skill_request.user_id
+        utterance = skill_request.utterance
+        params = skill_request.params
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        if not user_id:
+            return create_error_response("사용자 정보를 확인할 수 없습니다.")
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if '초기화' in utterance:
+            prefs = user_prefs.reset_prefs(user_id)
+            return simple_text_response("⚙️ 환율 응답 설정을 초기화했습니다.\n" + format_prefs(prefs))
         
-        # 허용된 언론사 리스트
-        allowed_sources = ['매일경제', 'MBN', '매경이코노미', 'mk.co.kr', 'mbn.co.kr']
+        changes = user_prefs.parse_preference_request(utterance, params)
+        if not changes:
+            prefs = user_prefs.get_prefs(user_id)
+            return simple_text_response(
+                "⚙️ 현재 환율 응답 설정\n" + format_prefs(prefs) +
+                "\n\n예) 관심 통화 달러 유로 엔화\n예) 기준 금액 100\n예) 영어로 보여줘"
+            )
         
-        news_list = []
+        prefs = user_prefs.set_prefs(user_id, **changes)
+        return simple_text_response("✅ 환율 응답 설정을 저장했습니다.\n" + format_prefs(prefs))
         
-        # 뉴스 항목 찾기
-        articles = soup.find_all('div', class_='news_item')[:20]  # 더 많이 가져와서 필터링
-        
-        if not articles:
-            articles = soup.find_all('li', class_='news_node')[:20]
+    except Exception as e:
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
+
+@app.errorhandler(InvalidSkillRequest)
+def invalid_skill_request(e):
+    """형식이 잘못된 스킬 요청 (본문 크기 초과 포함) - 카카오가 안내 카드를 보여주도록 200으로 응답"""
+    print(f"⚠️ 잘못된 스킬 요청 ({e.status}): {e}")
+    return create_error_response("요청 형식이 올바르지 않습니다.")
+
+def parse_trade_side(text):
+    """발화에서 살 때/팔 때 구분 (없으면 None)"""
+    if any(word in text for word in ('살 때', '살때', '사려면', '살려면', '구매', '송금 보낼', '보낼 때')):
+        return 'buy'
+    if any(word in text for word in ('팔 때', '팔때', '팔려면', '판매', '송금 받을', '받을 때')):
+        return 'sell'
+    return None
+
+@app.route('/rate_detail', methods=['POST'])
+def rate_detail():
+    """카카오톡 상세 환율 스킬 (예: "달러 살 때 얼마", "엔화 송금 받을 때")"""
+    skill_request = parse_skill_request(request)
+    try:
+        utterance = skill_request.utterance
+        params = skill_request.params
         
-        for article in articles:
-            try:
-                title_elem = article.find('a')
-                if not title_elem:
-                    continue
-                
-                title = title_elem.text.strip()
-                link = title_elem.get('href', '')
-                
-                if link and not link.startswith('http'):
-                    link = 'https://www.mk.co.kr' + link
-                
-                # 언론사 확인
-                source_elem = article.find('span', class_='news_source') or article.find('span', class_='source')
-                source_text = source_elem.text.strip() if source_elem else ''
-                
-                # 링크에서 언론사 판단 (매일경제는 mk.co.kr 도메인)
-                is_allowed = False
-                
-                # 1. 명시적 언론사 텍스트 체크
-                for allowed in allowed_sources:
-                    if allowed in source_text:
-                        is_allowed = True
-                        break
-                
-                # 2. URL로 체크 (매일경제 도메인)
-                if 'mk.co.kr' in link or 'mbn.co.kr' in link:
-                    is_allowed = True
-                
-                # 허용된 언론사가 아니면 스킵
-                if not is_allowed and source_text:
-                    continue
-                
-                # 이미지
-                img_elem = article.find('img')
-                img_url = img_elem.get('src', '') if img_elem else ''
-                if img_url and not img_url.startswith('http'):
-                    img_url = 'https:' + img_url if img_url.startswith('//') else ''
-                
-                # 시간
-                time_elem = article.find('span', class_='time')
-                time_text = time_elem.text.strip() if time_elem else ''
-                
-                # 언론사명 (없으면 매일경제로 기본값)
-                display_source = source_text if source_text else '매일경제'
-                
-                news_list.append({
-                    'title': title[:50] + '...' if len(title) > 50 else title,
-                    'link': link,
-                    'image': img_url,
-                    'time': time_text,
-                    'source': display_source
-                })
-                
-                # 5개 모으면 종료
-                if len(news_list) >= 5:
-                    break
-                
-            except:
-                continue
+        if params.get('currency'):
+            currency = rate_alerts.normalize_currency(params['currency'])
+        else:
+            currency = rate_alerts.parse_currency(utterance)
+        if not currency:
+            return simple_text_response("어떤 통화의 환율을 알려드릴까요?\n예) 달러 살 때 얼마\n예) 엔화 팔 때")
         
-        # 폴백 뉴스 (매일경제 계열만)
-        if not news_list:
-            news_list = [
-                {'title': '고환율에도 주요소 기름값 6주 연속 내려...국제유가 하락', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매일경제'},
-                {'title': '日감사원 美추기 구입비, 헬저급 3년간 2.8조원 낭비', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': 'MBN'},
-                {'title': '[단독] 국민연금이 원화약세 주력하나?', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매경이코노미'}
-            ]
+        # 환율 버전마다 미리 만든 문구에서 바로 조회
+        render_exchange_items()
+        detail = _rendered_rates['details'].get(currency)
+        if not detail:
+            return simple_text_response(f"{currency} 환율 정보가 없습니다.")
         
-        return news_list[:5]
+        return simple_text_response(detail[parse_trade_side(params.get('side') or utterance)])
         
     except Exception as e:
-        print(f"뉴스 크롤링 에러: {e}")
-        return [
-            {'title': '고환율에도 주요소 기름값 6주 연속 내려...국제유가 하락', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매일경제'},
-            {'title': '日감사원 美추기 구입비, 헬저급 3년간 2.8조원 낭비', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': 'MBN'},
-            {'title': '[단독] 국민연금이 원화약세 주력하나?', 'link': 'https://www.mk.co.kr/', 'image': '', 'time': '2시간전', 'source': '매경이코노미'}
-        ]
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
 
-def format_currency_data(rates):
-    """환율 데이터를 카카오톡 형식으로 포맷팅"""
-    currency_map = {
-        'USD': {'flag': '🇺🇸', 'name': '미국 달러'},
-        'JPY100': {'flag': '🇯🇵', 'name': '일본 엔'},
-        'JPY': {'flag': '🇯🇵', 'name': '일본 엔'},
-        'EUR': {'flag': '🇪🇺', 'name': '유로'},
-        'CNY': {'flag': '🇨🇳', 'name': '중국 위안'},
-        'GBP': {'flag': '🇬🇧', 'name': '영국 파운드'},
-        'CHF': {'flag': '🇨🇭', 'name': '스위스 프랑'},
-        'CAD': {'flag': '🇨🇦', 'name': '캐나다 달러'}
-    }
+# 시장지표 카드 (스냅샷 버전마다 한 번만 렌더링)
+_rendered_markets = {'version': None, 'cards': {}}
+
+# 발화 키워드 → 시장지표 분류
+MARKET_KEYWORDS = [
+    ('금리', 'interest'),
+    ('유가', 'oil'),
+    ('원유', 'oil'),
+    ('기름', 'oil'),
+    ('금값', 'gold'),
+    ('금시세', 'gold'),
+    ('국제', 'world_exchange'),
+    ('환율', 'exchange'),
+]
+
+def render_market_cards():
+    """시장지표 분류별 ListCard 렌더링 → {분류: listCard} (스냅샷이 없거나 오래되면 빈 dict)"""
+    snapshot = read_snapshot('markets')
+    if not snapshot or snapshot_store.age(snapshot) >= MARKETS_SNAPSHOT_MAX_AGE:
+        return {}
+    if _rendered_markets['version'] == snapshot['version']:
+        return _rendered_markets['cards']
     
-    formatted_rates = []
-    for rate in rates:
-        currency_code = rate.get('currency', '').split()[0]
-        currency_info = currency_map.get(currency_code, {'flag': '💱', 'name': currency_code})
-        
-        formatted_rates.append({
-            'currency': f"{currency_code} ({currency_info['name']})",
-            'rate': rate.get('rate', 'N/A'),
-            'change': rate.get('change', '0'),
-            'flag': currency_info['flag']
+    grouped = {}
+    for index in snapshot['data']['indices']:
+        index = market_index.MarketIndex(**index)
+        change_icon = "▲" if index.change > 0 else "▼" if index.change < 0 else "━"
+        value = f"{index.value:,.2f} {index.unit}".strip()
+        grouped.setdefault(index.category, []).append({
+            "title": index.name,
+            "description": f"{value}  {change_icon} {abs(index.change):,.2f}",
+            "link": {"web": index.link}
         })
     
-    return formatted_rates
+    cards = {}
+    for category, title in market_index.CATEGORY_TITLES.items():
+        if grouped.get(category):
+            cards[category] = {
+                "header": {
+                    "title": title
+                },
+                "items": grouped[category][:5],
+                "buttons": [
+                    {
+                        "action": "webLink",
+                        "label": "네이버 시장지표",
+                        "webLinkUrl": market_index.MARKET_INDEX_URL
+                    }
+                ]
+            }
+    
+    _rendered_markets.update(version=snapshot['version'], cards=cards)
+    return cards
 
-@app.route('/exchange_rate', methods=['POST'])
-def exchange_rate():
-    """카카오톡 스킬 엔드포인트"""
+def parse_market_category(text):
+    """발화에서 시장지표 분류 찾기 (없으면 None)"""
+    for keyword, category in MARKET_KEYWORDS:
+        if keyword in text:
+            return category
+    return None
+
+@app.route('/market_index', methods=['POST'])
+def market_indices():
+    """카카오톡 시장지표 스킬 (예: "유가 알려줘", "금리", "시장지표")"""
+    skill_request = parse_skill_request(request)
     try:
-        # 요청 데이터 로깅
-        req_data = request.get_json()
-        print(f"수신 데이터: {req_data}")
-        
-        # 환율 정보 가져오기 (우선순위)
-        # 1. 폴백 데이터 (정확한 현재 환율, 수동 업데이트)
-        rates = get_fallback_rates()
-        print("✅ 정확한 환율 데이터 사용 (네이버 금융 기준)")
-        
-        # API는 백업용으로만 유지 (주석 처리)
-        # if not rates:
-        #     rates = get_exchange_rates_mk()
-        # if not rates:
-        #     rates = get_exchange_rates_with_change()
-        
-        rates = format_currency_data(rates)
-        
-        if not rates:
-            return create_error_response("환율 정보를 가져오는데 실패했습니다.")
-        
-        # 뉴스 정보 가져오기
-        news_list = get_exchange_news()
+        cards = render_market_cards()
+        if not cards:
+            return simple_text_response("시장지표 정보를 준비 중입니다.\n잠시 후 다시 시도해주세요.")
         
-        # 환율 ListCard 아이템
-        exchange_list_items = []
-        for rate in rates:
-            change_icon = "▲" if '+' in str(rate['change']) else "▼" if '-' in str(rate['change']) else "━"
-            change_value = str(rate['change']).replace('+', '').replace('-', '')
-            
-            exchange_list_items.append({
-                "title": f"{rate['flag']} {rate['currency']}",
-                "description": f"{rate['rate']}  {change_icon} {change_value}"
-            })
+        # 분류를 말하면 해당 카드만, 아니면 전체 분류를 캐러셀로
+        category = skill_request.params.get('category') or parse_market_category(skill_request.utterance)
+        if category in cards:
+            outputs = [{"listCard": cards[category]}]
+        else:
+            outputs = [{"carousel": {"type": "listCard", "items": list(cards.values())}}]
         
-        # 뉴스 ListCard 아이템 (이미지 포함)
-        news_list_items = []
-        for news in news_list:
-            item = {
-                "title": news['title'][:50] + '...' if len(news['title']) > 50 else news['title'],
-                "description": f"{news.get('time', '')} {news.get('source', '매일경제')}".strip(),
-                "link": {
-                    "web": news['link']
-                }
+        return jsonify({
+            "version": "2.0",
+            "template": {
+                "outputs": outputs
             }
-            
-            # 썸네일 이미지 추가
-            if news.get('image'):
-                item['imageUrl'] = news['image']
-            
-            news_list_items.append(item)
+        })
         
-        # 응답 구성
-        outputs = [
-            {
-                "listCard": {
-                    "header": {
-                        "title": "이 시각 환율"
-                    },
-                    "items": exchange_list_items[:5],
-                    "buttons": [
-                        {
-                            "action": "webLink",
-                            "label": "매일경제 마켓",
-                            "webLinkUrl": "https://stock.mk.co.kr/"
-                        }
-                    ]
-                }
-            },
-            {
-                "listCard": {
-                    "header": {
-                        "title": "환율 관련 뉴스"
-                    },
-                    "items": news_list_items[:5],
-                    "buttons": [
-                        {
-                            "action": "webLink",
-                            "label": "뉴스 더보기",
-                            "webLinkUrl": "https://www.mk.co.kr/news/search/?word=환율"
-                        }
-                    ]
-                }
-            },
+    except Exception as e:
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return create_error_response(f"서버 오류: {str(e)}")
+
+# 암호화폐 시세 카드 (스냅샷 버전마다 한 번만 렌더링)
+_rendered_crypto = {'version': None, 'card': None}
+
+def format_crypto_price(price):
+    """원화 시세 표시 (1,000원 미만 코인은 소수점 둘째 자리까지)"""
+    return f"{price:,.0f}" if price >= 1000 else f"{price:,.2f}"
+
+def render_crypto_card():
+    """업비트 시세 ListCard 렌더링 (스냅샷이 없거나 오래되면 None)"""
+    snapshot = read_snapshot('crypto')
+    if not snapshot or snapshot_store.age(snapshot) >= CRYPTO_SNAPSHOT_MAX_AGE:
+        return None
+    if _rendered_crypto['version'] == snapshot['version']:
+        return _rendered_crypto['card']
+    
+    items = []
+    for ticker in snapshot['data']['tickers']:
+        change_icon = "▲" if ticker['change'] > 0 else "▼" if ticker['change'] < 0 else "━"
+        items.append({
+            "title": f"{ticker['name']} ({ticker['symbol']})",
+            "description": f"{format_crypto_price(ticker['price'])}원  {change_icon} {abs(ticker['change_rate']):.2f}%",
+            "link": {"web": crypto_tickers.UPBIT_EXCHANGE_URL + ticker['market']}
+        })
+    
+    updated = (datetime.utcfromtimestamp(snapshot['timestamp']) + timedelta(hours=9)).strftime('%H:%M:%S')
+    card = {
+        "header": {
+            "title": f"암호화폐 시세 ({updated} 기준)"
+        },
+        "items": items[:5],
+        "buttons": [
             {
-                "simpleText": {
-                    "text": f"업데이트: {(datetime.utcnow() + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')} (환전고시환율)"
-                }
+                "action": "webLink",
+                "label": "업비트",
+                "webLinkUrl": "https://upbit.com/exchange"
             }
         ]
+    }
+    
+    _rendered_crypto.update(version=snapshot['version'], card=card)
+    return card
+
+@app.route('/crypto', methods=['POST'])
+def crypto():
+    """카카오톡 암호화폐 시세 스킬 (업비트 원화 마켓, 갱신 데몬 스냅샷만 사용)"""
+    parse_skill_request(request)
+    try:
+        card = render_crypto_card()
+        if not card:
+            return simple_text_response("암호화폐 시세를 준비 중입니다.\n잠시 후 다시 시도해주세요.")
         
-        response = {
+        return jsonify({
             "version": "2.0",
             "template": {
-                "outputs": outputs
+                "outputs": [{"listCard": card}]
             }
-        }
-        
-        return jsonify(response)
+        })
         
     except Exception as e:
         print(f"에러 발생: {e}")
@@ -1027,25 +967,178 @@ def create_error_response(message):
         }
     }), 200  # 카카오는 200을 기대함
 
+@app.route('/thumb/<thumb_hash>', methods=['GET'])
+def thumb(thumb_hash):
+    """뉴스 썸네일 (내용 해시 주소이므로 오래 캐시 가능)"""
+    path = thumbnails.get_thumbnail_path(thumb_hash)
+    if not path:
+        # 다른 프로세스가 캐시 정리로 삭제한 썸네일 - 다음 카드부터는 원본 URL로 다시 준비
+        thumbnails.forget([thumb_hash])
+        return jsonify({"error": "not found"}), 404
+    
+    response = send_file(path, mimetype='image/jpeg', conditional=True, etag=thumb_hash)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+# 상세 헬스체크 결과 캐시 (헬스체크가 외부 호출이나 파일 읽기를 반복하지 않도록)
+DEEP_HEALTH_TTL = 10
+_deep_health = {'at': 0.0, 'report': None}
+
+def readiness():
+    """(트래픽 받을 준비 여부, 이유)"""
+    if not warmed():
+        return False, "캐시 준비 전"
+    if not _rendered_rates['items']:
+        return False, "환율 카드 없음"
+    if get_rates_snapshot() is None and time.time() - _warm['at'] < READY_FALLBACK_GRACE:
+        return False, "실시간 환율 스냅샷 대기 중"
+    return True, "ok"
+
+def build_health_report():
+    """데이터별 캐시 경과 시간, 제공처 서킷 상태, 마지막 갱신 결과 (로컬 스냅샷만 사용)"""
+    now = time.time()
+    
+    rates = read_snapshot('rates')
+    markets = read_snapshot('markets')
+    crypto_snapshot = read_snapshot('crypto')
+    index_age = news_crawler.index_age()
+    status = read_snapshot('refresher')
+    refresher = status['data'] if status else {}
+    
+    ready, reason = readiness()
+    report = {
+        "status": "ok" if ready else "degraded",
+        "ready": ready,
+        "reason": reason,
+        "timestamp": datetime.now().isoformat(),
+        "service": "kakao-exchange-rate-skill",
+        "datasets": {
+            "rates": {
+                "age": round(snapshot_store.age(rates), 1) if rates else None,
+                "source": rates['data'].get('source') if rates else 'fallback',
+                "sources": rates['data'].get('sources') if rates else None,
+                "stale": get_rates_snapshot() is None
+            },
+            "markets": {
+                "age": round(snapshot_store.age(markets), 1) if markets else None,
+                "indices": len(markets['data']['indices']) if markets else 0
+            },
+            "crypto": {
+                "age": round(snapshot_store.age(crypto_snapshot), 1) if crypto_snapshot else None,
+                "tickers": len(crypto_snapshot['data']['tickers']) if crypto_snapshot else 0
+            },
+            "news_index": {
+                "age": round(index_age, 1) if index_age is not None else None,
+                "articles": len(news_crawler.load_index().get('articles', {}))
+            },
+            "news_cache": {
+                "age": round(now - _news_cache['timestamp'], 1) if _news_cache['items'] else None
+            }
+        },
+        "refresher": {
+            "alive": refresher_alive(),
+            "age": round(snapshot_store.age(status), 1) if status else None,
+            "jobs": refresher.get('jobs', {}),
+            "providers": {
+                name: {key: provider.get(key) for key in ('state', 'score', 'failures', 'last_success', 'last_error', 'latency')}
+                for name, provider in refresher.get('providers', {}).items()
+            },
+            "alerts": refresher.get('alerts'),
+            "exim_quota": refresher.get('exim_quota'),
+            "mk_schema": refresher.get('mk_schema'),
+            "mk_proxies": refresher.get('mk_proxies')
+        }
+    }
+    
+    if report['ready'] and (not report['refresher']['alive'] or report['datasets']['rates']['stale']):
+        report['status'] = "degraded"
+    return report
+
+def deep_health_report():
+    """캐시된 상세 헬스체크 결과 (DEEP_HEALTH_TTL마다 한 번만 계산)"""
+    if _deep_health['report'] is None or time.time() - _deep_health['at'] >= DEEP_HEALTH_TTL:
+        _deep_health['report'] = build_health_report()
+        _deep_health['at'] = time.time()
+    return _deep_health['report']
+
 @app.route('/health', methods=['GET'])
+@http_cache.cacheable(max_age=5)
 def health():
-    """헬스체크"""
+    """헬스체크 (프로세스 생존 확인, ?deep=1 이면 데이터/갱신 데몬 상태 포함)"""
+    if request.args.get('deep') in ('1', 'true'):
+        # 제공처 에러/호출 한도/서킷 상태가 들어 있으므로 공유 캐시에 남기지 않음
+        response = jsonify(deep_health_report())
+        response.headers['Cache-Control'] = 'private, no-store'
+        return response
+    
+    # 캐시/ETag가 의미 있도록 요청마다 바뀌는 값(시각)은 넣지 않음
     return jsonify({
         "status": "ok",
-        "timestamp": datetime.now().isoformat(),
         "service": "kakao-exchange-rate-skill"
     })
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    """레디니스 체크 (캐시가 준비된 워커만 200, 로드밸런서가 트래픽 전달 여부 판단에 사용)"""
+    is_ready, reason = readiness()
+    return jsonify({"ready": is_ready, "reason": reason}), 200 if is_ready else 503
+
 @app.route('/', methods=['GET'])
+@http_cache.cacheable(max_age=3600)
 def index():
     """기본 페이지"""
     return """
     <h1>카카오톡 환율 스킬 서버</h1>
     <p>상태: 정상 작동중</p>
     <p>엔드포인트: POST /exchange_rate</p>
-    <p>헬스체크: GET /health</p>
+    <p>뉴스 검색: POST /news</p>
+    <p>환율 알림: POST /alert</p>
+    <p>응답 설정: POST /preferences</p>
+    <p>상세 환율: POST /rate_detail</p>
+    <p>시장지표: POST /market_index</p>
+    <p>암호화폐 시세: POST /crypto</p>
+    <p>헬스체크: GET /health (상세: /health?deep=1)</p>
+    <p>레디니스: GET /ready</p>
     """
 
+# 워커 캐시 준비 상태 (프로세스별, fork 이후에는 다시 준비)
+_warm = {'pid': None, 'at': None}
+_warm_lock = threading.Lock()
+
+# 준비 후 이 시간이 지나도 실시간 환율 스냅샷이 없으면 폴백 환율로라도 트래픽 받기
+READY_FALLBACK_GRACE = int(os.getenv('READY_FALLBACK_GRACE', '60'))
+
+def warmed():
+    return _warm['pid'] == os.getpid()
+
+def warm_start():
+    """콜드 스타트: 디스크에 남은 스냅샷(환율, 뉴스 색인, 저장된 뉴스)으로 캐시와 환율 카드를 미리 채움
+    
+    첫 요청부터 외부 호출 없이 응답하고, 외부 갱신과 검색 색인 생성은 백그라운드에서 실행합니다.
+    """
+    with _warm_lock:
+        if warmed():
+            return
+        
+        started = time.monotonic()
+        start_push_updates()
+        load_saved_news()
+        reload_news_thumbnails()
+        render_exchange_items()
+        _warm.update(pid=os.getpid(), at=time.time())
+        print(f"🔥 캐시 준비 완료 ({(time.monotonic() - started) * 1000:.1f}ms)")
+    
+    def background():
+        news_search.get_index()
+        if not refresher_alive() and not load_fresh_news():
+            refresh_news()
+    
+    threading.Thread(target=background, name='warm-start', daemon=True).start()
+
+# 워커가 뜨자마자 캐시 준비 (WARM_START=0이면 첫 요청 때 준비)
+if os.getenv('WARM_START', '1') == '1':
+    warm_start()
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🚀 카카오톡 환율 스킬 서버 시작")
@@ -1053,7 +1146,14 @@ if __name__ == '__main__':
     print(f"⏰ 시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("📍 엔드포인트:")
     print("   - POST /exchange_rate (카카오톡 스킬)")
-    print("   - GET /health (헬스체크)")
+    print("   - POST /news (뉴스 검색 스킬)")
+    print("   - POST /alert (환율 알림 스킬)")
+    print("   - POST /preferences (응답 설정 스킬)")
+    print("   - POST /rate_detail (상세 환율 스킬)")
+    print("   - POST /market_index (시장지표 스킬)")
+    print("   - POST /crypto (암호화폐 시세 스킬)")
+    print("   - GET /health (헬스체크, ?deep=1 상세)")
+    print("   - GET /ready (레디니스 체크)")
     print("   - GET / (정보 페이지)")
     print("=" * 60)
     app.run(host='0.0.0.0', port=5000, debug=True)
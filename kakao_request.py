@@ -0,0 +1,129 @@
+"""
+카카오 스킬 요청 모델
+스킬 요청 본문에서 실제로 쓰는 값(발화, 사용자 id, 액션 파라미터, callbackUrl)만 뽑아
+검증된 작은 객체로 만듭니다. 본문 크기를 먼저 확인해 큰 요청은 읽기 전에 거절하고,
+orjson이 있으면 더 빠른 디코더를 사용합니다.
+"""
+
+import json
+import os
+
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from kakao_callback import is_allowed_callback_url
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 카카오 스킬 요청은 보통 수 KB (이보다 크면 읽지 않고 거절)
+MAX_BODY_BYTES = int(os.getenv('KAKAO_MAX_BODY_BYTES', str(64 * 1024)))
+
+MAX_UTTERANCE_LENGTH = 1000
+MAX_USER_ID_LENGTH = 128
+MAX_PARAMS = 30
+MAX_PARAM_LENGTH = 200
+
+class InvalidSkillRequest(ValueError):
+    """스킬 요청 형식 오류 (status: 원인 구분용 HTTP 상태 코드, 로그에만 사용하고 응답은 200)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class SkillRequest:
+    """스킬 처리에 필요한 필드만 담은 요청"""
+
+    __slots__ = ('utterance', 'user_id', 'params', 'callback_url')
+
+    def __init__(self, utterance='', user_id=None, params=None, callback_url=None):
+        self.utterance = utterance
+        self.user_id = user_id
+        self.params = params or {}
+        self.callback_url = callback_url
+
+    def __repr__(self):
+        user = f"{self.user_id[:8]}..." if self.user_id else None
+        return (f"SkillRequest(utterance={self.utterance!r}, user={user}, "
+                f"params={self.params}, callback={bool(self.callback_url)})")
+
+def _loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def _optional_str(value, name, max_length):
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise InvalidSkillRequest(f"{name} 형식 오류")
+    if len(value) > max_length:
+        raise InvalidSkillRequest(f"{name} 길이 초과")
+    return value
+
+def _params(action):
+    """action.params (카카오는 문자열 값으로 보냄, 숫자/불리언은 문자열로 변환)"""
+    params = action.get('params') if isinstance(action, dict) else None
+    if not params:
+        return {}
+    if not isinstance(params, dict) or len(params) > MAX_PARAMS:
+        raise InvalidSkillRequest("action.params 형식 오류")
+
+    result = {}
+    for key, value in params.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            # 엔티티 상세 정보 등은 detailParams에 있으므로 무시
+            continue
+        result[key] = value[:MAX_PARAM_LENGTH]
+    return result
+
+def from_payload(payload):
+    """디코딩된 요청 본문에서 SkillRequest 생성"""
+    if payload is None:
+        return SkillRequest()
+    if not isinstance(payload, dict):
+        raise InvalidSkillRequest("요청 본문은 JSON 객체여야 합니다")
+
+    user_request = payload.get('userRequest') or {}
+    if not isinstance(user_request, dict):
+        raise InvalidSkillRequest("userRequest 형식 오류")
+    user = user_request.get('user') or {}
+
+    # 카카오 콜백 주소가 아니면 콜백 없이 동기 응답 (임의 주소로 POST 하지 않음)
+    callback_url = _optional_str(user_request.get('callbackUrl'), 'callbackUrl', 2048)
+    if callback_url and not is_allowed_callback_url(callback_url):
+        print(f"⚠️ 허용되지 않은 콜백 주소 무시: {callback_url[:60]}")
+        callback_url = None
+
+    return SkillRequest(
+        utterance=(_optional_str(user_request.get('utterance'), 'utterance', MAX_UTTERANCE_LENGTH) or '').strip(),
+        user_id=_optional_str(user.get('id') if isinstance(user, dict) else None, 'user.id', MAX_USER_ID_LENGTH),
+        params=_params(payload.get('action')),
+        callback_url=callback_url
+    )
+
+def parse_skill_request(flask_request):
+    """Flask 요청을 SkillRequest로 변환 (본문이 비어 있으면 빈 요청, 형식 오류는 InvalidSkillRequest)"""
+    length = flask_request.content_length
+    if length is not None and length > MAX_BODY_BYTES:
+        raise InvalidSkillRequest(f"요청 본문이 너무 큽니다 ({length} bytes)", status=413)
+
+    try:
+        body = flask_request.get_data(cache=False)
+    except RequestEntityTooLarge:
+        # Content-Length 없이 MAX_CONTENT_LENGTH를 넘은 본문 (읽는 도중 중단)
+        raise InvalidSkillRequest("요청 본문이 너무 큽니다", status=413)
+    if len(body) > MAX_BODY_BYTES:
+        raise InvalidSkillRequest(f"요청 본문이 너무 큽니다 ({len(body)} bytes)", status=413)
+    if not body.strip():
+        return SkillRequest()
+
+    try:
+        payload = _loads(body)
+    except ValueError as e:
+        raise InvalidSkillRequest(f"JSON 파싱 실패: {e}")
+
+    return from_payload(payload)
@@ -0,0 +1,130 @@
+"""
+네이버 금융 시장지표 추출
+finance.naver.com/marketindex/ 한 페이지에 있는 환율, 국제 시장 환율, 유가, 금시세, 금리 등
+모든 지표를 한 번 내려받아 한 번의 파싱으로 추출합니다.
+갱신 데몬(시장지표 카드)과 환율 자동 업데이트 스크립트가 함께 사용합니다.
+"""
+
+from typing import NamedTuple
+from urllib.parse import urljoin, urlparse, parse_qs
+
+from deadline import budget_timeout
+
+MARKET_INDEX_URL = 'https://finance.naver.com/marketindex/'
+
+# marketindexCd 접두어 → 분류 (앞에서부터 확인)
+CATEGORY_PREFIXES = [
+    ('FX_', 'exchange'),
+    ('OIL_', 'oil'),
+    ('CMDT_', 'gold'),
+    ('IRR_', 'interest'),
+]
+
+# 분류 표시 순서와 제목
+CATEGORY_TITLES = {
+    'exchange': "환전 고시 환율",
+    'world_exchange': "국제 시장 환율",
+    'oil': "유가",
+    'gold': "금시세",
+    'interest': "금리",
+    'other': "기타 지표",
+}
+
+class MarketIndex(NamedTuple):
+    """시장지표 한 항목 (스냅샷에는 _asdict()로 저장)"""
+    code: str        # 네이버 marketindexCd (예: FX_USDKRW, OIL_CL, CMDT_GC)
+    category: str    # CATEGORY_TITLES 키
+    name: str
+    value: float
+    change: float    # 전일 대비 (하락이면 음수)
+    unit: str
+    link: str
+
+def category_of(code):
+    """지표 코드 → 분류 (원화 환율이 아닌 FX_ 지표는 국제 시장 환율)"""
+    for prefix, category in CATEGORY_PREFIXES:
+        if code.startswith(prefix):
+            if category == 'exchange' and not code.endswith('KRW'):
+                return 'world_exchange'
+            return category
+    return 'other'
+
+def _number(text):
+    try:
+        return float(text.replace(',', '').strip())
+    except (AttributeError, ValueError):
+        return None
+
+def _text(node):
+    return node.get_text(' ', strip=True) if node else ''
+
+def parse_market_indices(html):
+    """시장지표 페이지 → [MarketIndex] (페이지 순서, 같은 지표는 처음 것만)
+
+    지표마다 상세 페이지 링크(marketindexCd)가 있으므로, 링크 한 번 순회로 모든 분류를 추출합니다.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    indices = []
+    seen = set()
+    for anchor in soup.select('a[href*="marketindexCd="]'):
+        code = parse_qs(urlparse(anchor['href']).query).get('marketindexCd', [''])[0]
+        value = _number(_text(anchor.select_one('.value')))
+        if not code or code in seen or value is None:
+            continue
+        seen.add(code)
+
+        change = _number(_text(anchor.select_one('.change'))) or 0.0
+        head_info = anchor.select_one('.head_info')
+        classes = head_info.get('class', []) if head_info else []
+        if 'point_dn' in classes or '하락' in _text(head_info):
+            change = -abs(change)
+
+        unit = anchor.select_one('.txt_krw') or anchor.select_one('.txt_usd')
+        indices.append(MarketIndex(
+            code=code,
+            category=category_of(code),
+            name=_text(anchor.select_one('.h_lst')) or code,
+            value=value,
+            change=change,
+            unit=_text(unit),
+            link=urljoin(MARKET_INDEX_URL, anchor['href'])
+        ))
+
+    return indices
+
+def fetch_market_indices(timeout=10):
+    """시장지표 페이지를 한 번 내려받아 전체 지표 추출 (실패하면 빈 목록)"""
+    import requests
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    try:
+        response = requests.get(MARKET_INDEX_URL, headers=headers, timeout=budget_timeout(timeout))
+        if response.status_code != 200:
+            print(f"❌ 네이버 시장지표 요청 실패: {response.status_code}")
+            return []
+        # 페이지가 EUC-KR이므로 바이트 그대로 넘겨 meta charset으로 해석
+        indices = parse_market_indices(response.content)
+    except Exception as e:
+        print(f"❌ 네이버 시장지표 에러: {e}")
+        return []
+
+    print(f"✅ 네이버 시장지표 수집: {len(indices)}개")
+    return indices
+
+def exchange_rates(indices):
+    """원화 환율 지표 → {'USD': {'rate', 'change'}} (JPY는 100엔 기준 JPY100)"""
+    rates = {}
+    for index in indices:
+        if index.category != 'exchange':
+            continue
+        code = index.code[3:-3]
+        if code == 'JPY':
+            code = 'JPY100'
+        change = f"+{index.change:.2f}" if index.change >= 0 else f"{index.change:.2f}"
+        rates[code] = {'rate': f"{index.value:,.2f}", 'change': change}
+    return rates
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+카카오 콜백 수신 모의 서버 (로컬 테스트용)
+스킬 요청의 userRequest.callbackUrl에 이 서버 주소를 넣으면
+백그라운드 워커가 보낸 최종 응답을 받아 기록합니다.
+
+사용법 (스킬 서버는 KAKAO_CALLBACK_HOSTS=http://localhost:5001 로 실행):
+    python mock_callback_server.py [포트]
+    curl -X POST localhost:5000/exchange_rate \\
+        -H 'Content-Type: application/json' \\
+        -d '{"userRequest": {"callbackUrl": "http://localhost:5001/callback"}}'
+    curl localhost:5001/received
+"""
+
+import json
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 수신한 콜백 기록
+received = []
+_received_lock = threading.Lock()
+
+# 테스트에서 재시도를 확인할 수 있도록 처음 N번은 실패 응답
+fail_first = 0
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    """카카오 콜백 API 흉내 (POST 수신, GET /received 로 기록 조회)"""
+
+    def do_POST(self):
+        global fail_first
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        with _received_lock:
+            if fail_first > 0:
+                fail_first -= 1
+                self._send_json(503, {"status": "FAIL", "message": "mock failure"})
+                return
+
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self._send_json(400, {"status": "FAIL", "message": "invalid json"})
+                return
+
+            received.append({'path': self.path, 'payload': payload})
+
+        print(f"📨 콜백 수신 ({self.path}): {json.dumps(payload, ensure_ascii=False)[:200]}")
+        self._send_json(200, {"taskId": str(uuid.uuid4()), "status": "SUCCESS", "message": "", "timestamp": 0})
+
+    def do_GET(self):
+        if self.path == '/received':
+            with _received_lock:
+                self._send_json(200, received)
+        else:
+            self._send_json(404, {"status": "FAIL"})
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=5001):
+    """모의 서버를 백그라운드 스레드로 시작 (테스트 코드에서 사용)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), CallbackHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5001
+    print(f"🧪 카카오 콜백 모의 서버 시작: http://localhost:{port}/callback")
+    ThreadingHTTPServer(('127.0.0.1', port), CallbackHandler).serve_forever()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+환율 뉴스 증분 크롤러
+매일경제 뉴스 검색 결과를 기사 색인(URL/제목 해시)에 누적 저장하고,
+이미 본 기사는 다시 파싱하지 않습니다. 사용자 요청은 이 색인에서 바로 응답합니다.
+
+사용법 (더 깊은 아카이브 구축):
+    python news_crawler.py [페이지 수]
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from deadline import budget_timeout, check_deadline, DeadlineExceeded
+import news_tagging
+
+# 기사 색인 파일과 최대 보관 기사 수
+INDEX_FILE = os.getenv('NEWS_INDEX_FILE', '/tmp/news_index.json')
+MAX_ARTICLES = 2000
+
+# 최신순으로 미리 정렬해 두는 기사 수 (latest 요청은 정렬 없이 여기서 자름)
+LATEST_CACHE_SIZE = 20
+
+SEARCH_URL = "https://www.mk.co.kr/news/search/"
+SEARCH_WORD = "환율"
+
+# 허용된 언론사 리스트
+ALLOWED_SOURCES = ['매일경제', 'MBN', '매경이코노미', 'mk.co.kr', 'mbn.co.kr']
+
+# 새 기사가 색인에 들어가기 전에 차례로 거치는 보강 단계
+ENRICHERS = [news_tagging.tag_article]
+
+_index = {'articles': {}, 'updated': 0.0}
+_index_mtime = None
+_index_lock = threading.Lock()
+
+# (색인, 최신순 상위 기사) - 색인이 바뀌었을 때만 다시 정렬
+_latest = (None, [])
+
+# False이면 파일 변경 확인 없이 메모리 색인 사용 (갱신 알림을 받을 때 reload_index 호출)
+_poll_file = True
+
+def article_id(link, title):
+    """기사 고유 키 (URL 우선, 없으면 제목)"""
+    key = link if link and link != 'https://www.mk.co.kr/' else title
+    return hashlib.sha1(key.strip().encode('utf-8')).hexdigest()[:16]
+
+def use_push_updates():
+    """요청마다 파일을 확인하지 않고 갱신 알림으로만 색인을 다시 읽도록 전환"""
+    global _poll_file
+    _poll_file = False
+    return reload_index()
+
+def reload_index():
+    """파일에서 기사 색인 다시 읽기"""
+    global _index_mtime
+    with _index_lock:
+        _index_mtime = None
+    index = _load_index_file()
+    _ranked_articles()
+    return index
+
+def load_index():
+    """기사 색인 불러오기 (파일이 바뀌었을 때만 다시 읽음)"""
+    if not _poll_file:
+        return _index
+    return _load_index_file()
+
+def _load_index_file():
+    global _index, _index_mtime
+
+    with _index_lock:
+        try:
+            mtime = os.path.getmtime(INDEX_FILE)
+        except OSError:
+            return _index
+
+        if mtime != _index_mtime:
+            try:
+                with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                    _index = json.load(f)
+                _index_mtime = mtime
+            except Exception as e:
+                print(f"⚠️ 뉴스 색인 읽기 실패: {e}")
+
+        return _index
+
+def save_index(index):
+    """기사 색인 저장 (임시 파일에 쓰고 교체하여 읽는 쪽이 깨진 파일을 보지 않도록)"""
+    global _index, _index_mtime
+
+    # 오래된 기사부터 정리
+    articles = index['articles']
+    if len(articles) > MAX_ARTICLES:
+        keep = sorted(articles.values(), key=lambda a: a['published'], reverse=True)[:MAX_ARTICLES]
+        index['articles'] = {a['id']: a for a in keep}
+
+    tmp_path = f"{INDEX_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, INDEX_FILE)
+
+    with _index_lock:
+        _index = index
+        _index_mtime = os.path.getmtime(INDEX_FILE)
+
+def parse_published(time_text, now=None):
+    """'5분전', '2시간전', '2026.01.22 15:42' 같은 시간 표기를 epoch 초로 변환
+
+    월/일이 한 자리인 표기('2026.1.5 15:42' → 1월 5일 15:42)와 시각이 없는 날짜도 처리합니다.
+    """
+    now = now or time.time()
+    text = (time_text or '').strip()
+
+    match = re.match(r'(\d+)\s*(초|분|시간|일)\s*전', text)
+    if match:
+        value = int(match.group(1))
+        unit = {'초': 1, '분': 60, '시간': 3600, '일': 86400}[match.group(2)]
+        return now - value * unit
+
+    # 공백을 지우면 '2026.1.5 15:42'가 '2026.1.515:42'(51일)로 붙으므로 원문에서 날짜와 시각을 따로 찾음
+    match = re.search(r'(\d{4})\s*[.\-]\s*(\d{1,2})\s*[.\-]\s*(\d{1,2})\.?(?:\s*(\d{1,2}):(\d{2}))?', text)
+    if match:
+        hour, minute = match.group(4) or 0, match.group(5) or 0
+        try:
+            # 매일경제 표기는 한국 시간 기준
+            published = datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)), int(hour), int(minute))
+            return (published - timedelta(hours=9) - datetime(1970, 1, 1)).total_seconds()
+        except ValueError:
+            pass
+
+    return now
+
+def format_age(published, now=None):
+    """게시 시각을 '5분전', '2시간전', '01.22' 형식으로 표시"""
+    age = (now or time.time()) - published
+    if age < 3600:
+        return f"{max(1, int(age // 60))}분전"
+    if age < 86400:
+        return f"{int(age // 3600)}시간전"
+    return (datetime.utcfromtimestamp(published) + timedelta(hours=9)).strftime('%m.%d')
+
+def parse_new_articles(html, known_ids, now=None):
+    """검색 결과 페이지에서 색인에 없는 기사만 파싱
+
+    제목 링크만 먼저 확인해 이미 본 기사는 건너뛰므로,
+    이미지/시간/언론사 파싱은 새 기사에 대해서만 수행합니다.
+    """
+    from bs4 import BeautifulSoup
+
+    now = now or time.time()
+    soup = BeautifulSoup(html, 'html.parser')
+
+    articles = soup.find_all('div', class_='news_item')
+    if not articles:
+        articles = soup.find_all('li', class_='news_node')
+
+    new_articles = []
+    seen_count = 0
+
+    for article in articles:
+        # 파싱 중 예산이 떨어지면 지금까지 모은 기사만 사용
+        try:
+            check_deadline()
+        except DeadlineExceeded:
+            print(f"⏱️ 응답 예산 부족 - 뉴스 파싱 중단 ({len(new_articles)}개 수집)")
+            break
+
+        try:
+            title_elem = article.find('a')
+            if not title_elem:
+                continue
+
+            title = title_elem.text.strip()
+            link = title_elem.get('href', '')
+
+            if link and not link.startswith('http'):
+                link = 'https://www.mk.co.kr' + link
+
+            if not title:
+                continue
+
+            aid = article_id(link, title)
+            if aid in known_ids:
+                seen_count += 1
+                continue
+
+            # 언론사 확인
+            source_elem = article.find('span', class_='news_source') or article.find('span', class_='source')
+            source_text = source_elem.text.strip() if source_elem else ''
+
+            # 1. 명시적 언론사 텍스트 체크, 2. URL로 체크 (매일경제 도메인)
+            is_allowed = any(allowed in source_text for allowed in ALLOWED_SOURCES)
+            if 'mk.co.kr' in link or 'mbn.co.kr' in link:
+                is_allowed = True
+
+            # 허용된 언론사가 아니면 스킵
+            if not is_allowed and source_text:
+                continue
+
+            # 이미지
+            img_elem = article.find('img')
+            img_url = img_elem.get('src', '') if img_elem else ''
+
+            # 시간
+            time_elem = article.find('span', class_='time')
+            time_text = time_elem.text.strip() if time_elem else ''
+
+            new_articles.append({
+                'id': aid,
+                'title': title,
+                'link': link,
+                'image': img_url,
+                'source': source_text if source_text else '매일경제',
+                'published': parse_published(time_text, now),
+                'first_seen': now
+            })
+
+        except Exception:
+            continue
+
+    return new_articles, seen_count
+
+def fetch_search_page(page=1):
+    """매일경제 뉴스 검색 결과 페이지 다운로드"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    }
+    params = {'word': SEARCH_WORD}
+    if page > 1:
+        params['page'] = page
+
+    # 웹 워커 콜드 스타트 시 import 비용을 내지 않도록 실제 호출할 때 로드
+    import requests
+
+    response = requests.get(SEARCH_URL, params=params, headers=headers, timeout=budget_timeout(10))
+    response.raise_for_status()
+    return response.text
+
+def crawl(max_pages=1, stop_when_seen=True):
+    """증분 크롤링: 새 기사만 색인에 추가
+
+    stop_when_seen=True 이면 새 기사가 없는 페이지를 만나면 중단합니다.
+    반환값은 새로 추가된 기사 수입니다.
+    """
+    index = load_index()
+    articles = dict(index.get('articles', {}))
+    now = time.time()
+    added = []
+
+    for page in range(1, max_pages + 1):
+        html = fetch_search_page(page)
+        new_articles, seen_count = parse_new_articles(html, articles, now)
+
+        for article in new_articles:
+            for enrich in ENRICHERS:
+                article = enrich(article)
+            articles[article['id']] = article
+        added.extend(new_articles)
+
+        print(f"📰 뉴스 {page}페이지: 새 기사 {len(new_articles)}개, 기존 기사 {seen_count}개")
+
+        if stop_when_seen and not new_articles:
+            break
+
+    save_index({'articles': articles, 'updated': now})
+    return len(added)
+
+def index_age():
+    """마지막 크롤링 이후 경과 시간 (초, 색인이 없으면 None)"""
+    updated = load_index().get('updated')
+    return time.time() - updated if updated else None
+
+def _ranked_articles():
+    """최신순 상위 기사 (색인이 바뀌었을 때만 다시 정렬)"""
+    global _latest
+    index = load_index()
+    cached_index, ranked = _latest
+    if cached_index is not index:
+        ranked = heapq.nlargest(LATEST_CACHE_SIZE, index.get('articles', {}).values(),
+                                key=lambda a: (a['published'], a['first_seen']))
+        _latest = (index, ranked)
+    return ranked
+
+def latest(limit=5):
+    """최신순 기사 목록 (카카오 응답 형식)"""
+    ranked = _ranked_articles()[:limit]
+
+    now = time.time()
+    return [{
+        'title': a['title'],
+        'link': a['link'],
+        'image': a['image'],
+        'time': format_age(a['published'], now),
+        'source': a['source']
+    } for a in ranked]
+
+if __name__ == '__main__':
+    import sys
+
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"🚀 뉴스 아카이브 크롤링 시작 (최대 {pages}페이지)")
+    added = crawl(max_pages=pages, stop_when_seen=False)
+    print(f"✅ 새 기사 {added}개 추가 (전체 {len(load_index()['articles'])}개)")
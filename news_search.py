@@ -0,0 +1,143 @@
+"""
+뉴스 전문 검색 (역색인 + BM25)
+크롤러가 모은 기사 제목으로 역색인을 만들어, 사용자 키워드("엔화 뉴스", "달러 전망")에
+맞는 기사를 스크래핑 없이 바로 찾습니다. 한국어는 형태소 분석 대신 글자 2-gram을 사용합니다.
+"""
+
+import math
+import re
+import threading
+import time
+
+import news_crawler
+
+# BM25 파라미터
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 검색어에서 제외할 단어 (요청 표현)
+QUERY_STOPWORDS = {'뉴스', '기사', '소식', '관련', '알려줘', '보여줘', '검색'}
+
+_TOKEN_RE = re.compile(r'[가-힣]+|[A-Za-z]+|\d+')
+
+_search_index = None
+_build_lock = threading.Lock()
+
+def tokenize(text):
+    """한글은 글자 2-gram (한 글자 단어는 그대로), 영문/숫자는 단어 단위"""
+    tokens = []
+    for word in _TOKEN_RE.findall(text or ''):
+        if word[0] >= '가':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+def build_index(articles):
+    """기사 목록으로 역색인 생성"""
+    docs = []
+    postings = {}
+    doc_lens = []
+
+    for doc_id, article in enumerate(articles):
+        docs.append(article)
+        tokens = tokenize(article['title'])
+        doc_lens.append(len(tokens))
+
+        term_freqs = {}
+        for token in tokens:
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+        for term, tf in term_freqs.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    doc_count = len(docs)
+    avg_len = (sum(doc_lens) / doc_count) if doc_count else 0.0
+
+    # 한 글자 검색어("엔", "금")를 2-gram에 연결하기 위한 접두 글자 맵
+    prefix = {}
+    for term in postings:
+        if len(term) == 2 and term[0] >= '가':
+            prefix.setdefault(term[0], []).append(term)
+
+    idf = {
+        term: math.log(1 + (doc_count - len(plist) + 0.5) / (len(plist) + 0.5))
+        for term, plist in postings.items()
+    }
+
+    # 문서 길이 정규화 항은 문서마다 한 번만 계산
+    norms = [BM25_K1 * (1 - BM25_B + BM25_B * (length / avg_len if avg_len else 0)) for length in doc_lens]
+
+    return {
+        'docs': docs,
+        'postings': postings,
+        'idf': idf,
+        'norms': norms,
+        'prefix': prefix
+    }
+
+def _query_terms(query, index):
+    terms = []
+    for token in tokenize(query):
+        if token in QUERY_STOPWORDS:
+            continue
+        if len(token) == 1 and token >= '가' and token not in index['postings']:
+            terms.extend(index['prefix'].get(token, []))
+        else:
+            terms.append(token)
+    return terms
+
+def _strip_stopwords(query):
+    words = [word for word in (query or '').split() if word not in QUERY_STOPWORDS]
+    return ' '.join(words)
+
+def get_index():
+    """현재 기사 색인에 맞는 검색 색인 (기사 색인이 바뀌었을 때만 다시 생성)"""
+    global _search_index
+
+    articles_index = news_crawler.load_index()
+    if _search_index is not None and _search_index['source'] is articles_index:
+        return _search_index
+
+    with _build_lock:
+        if _search_index is None or _search_index['source'] is not articles_index:
+            started = time.perf_counter()
+            articles = list(articles_index.get('articles', {}).values())
+            index = build_index(articles)
+            index['source'] = articles_index
+            _search_index = index
+            print(f"🔎 뉴스 검색 색인 생성: 기사 {len(articles)}개, 용어 {len(index['postings'])}개 "
+                  f"({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+    return _search_index
+
+def search(query, limit=5):
+    """BM25 점수순 기사 검색 (동점이면 최신순, 카카오 응답 형식)"""
+    index = get_index()
+    terms = _query_terms(_strip_stopwords(query), index)
+    if not terms:
+        return []
+
+    scores = {}
+    for term in set(terms):
+        plist = index['postings'].get(term)
+        if not plist:
+            continue
+        idf = index['idf'][term]
+        norms = index['norms']
+        for doc_id, tf in plist:
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norms[doc_id])
+
+    docs = index['docs']
+    ranked = sorted(scores, key=lambda doc_id: (scores[doc_id], docs[doc_id]['published']), reverse=True)[:limit]
+
+    now = time.time()
+    return [{
+        'title': docs[doc_id]['title'],
+        'link': docs[doc_id]['link'],
+        'image': docs[doc_id]['image'],
+        'time': news_crawler.format_age(docs[doc_id]['published'], now),
+        'source': docs[doc_id]['source']
+    } for doc_id in ranked]
@@ -0,0 +1,137 @@
+"""
+뉴스 통화 태깅
+통화 레지스트리의 별칭(달러, 엔화, 유로, 위안, 파운드 ...)을 Aho-Corasick 오토마톤으로
+미리 컴파일해 두고, 크롤러가 새 기사를 색인에 넣을 때 언급된 통화를 태그합니다.
+응답 시에는 통화별 대표 기사를 딕셔너리 조회 한 번으로 찾습니다.
+"""
+
+import threading
+from collections import deque
+
+from currencies import CURRENCY_MAP
+
+def build_matcher(patterns):
+    """Aho-Corasick 오토마톤 생성
+
+    patterns: {문자열: 태그}
+    반환값: (goto, fail, output) - output[state]는 (패턴 길이, 태그) 목록
+    """
+    goto = [{}]
+    output = [[]]
+
+    for pattern, tag in patterns.items():
+        state = 0
+        for char in pattern:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+                output.append([])
+            state = next_state
+        output[state].append((len(pattern), tag))
+
+    # 실패 링크 (BFS)
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0)
+            output[next_state] = output[next_state] + output[fail[next_state]]
+
+    return goto, fail, output
+
+def _is_ascii_alnum(char):
+    return char.isascii() and char.isalnum()
+
+def find_matches(text, matcher):
+    """텍스트에서 모든 패턴 위치 찾기: [(시작, 끝, 태그)]"""
+    goto, fail, output = matcher
+    matches = []
+    state = 0
+
+    for end, char in enumerate(text, 1):
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+
+        for length, tag in output[state]:
+            start = end - length
+            # 영문 코드(USD 등)는 단어 경계에서만 인정
+            if text[start].isascii():
+                if (start > 0 and _is_ascii_alnum(text[start - 1])) or (end < len(text) and _is_ascii_alnum(text[end])):
+                    continue
+            matches.append((start, end, tag))
+
+    return matches
+
+def _build_currency_matcher():
+    """별칭은 통화 태그로, 제외어(파운드리 등)는 태그 None으로 함께 컴파일"""
+    patterns = {}
+    for info in CURRENCY_MAP.values():
+        for word in info.get('exclude', []):
+            patterns[word] = None
+        for alias in info['aliases']:
+            patterns[alias] = info['tag']
+    return build_matcher(patterns)
+
+# 모듈 로드 시 한 번만 컴파일
+CURRENCY_MATCHER = _build_currency_matcher()
+
+def tag_currencies(text):
+    """기사에 언급된 통화 태그 목록 (언급 순서)
+
+    더 긴 별칭에 포함된 짧은 별칭은 무시합니다 (예: '캐나다 달러'는 CAD만, USD 아님).
+    제외어에 포함된 별칭도 무시하되, 금액 뒤('7위안을 돌파')라면 통화로 봅니다.
+    """
+    text = text or ''
+    matches = find_matches(text, CURRENCY_MATCHER)
+
+    tags = []
+    for start, end, tag in matches:
+        if tag is None:
+            continue
+        amount = start > 0 and text[start - 1].isdigit()
+        covered = any(s <= start and end <= e and (e - s) > (end - start) and not (t is None and amount)
+                      for s, e, t in matches)
+        if not covered and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def tag_article(article):
+    """크롤러 보강 단계: 기사에 통화 태그 추가"""
+    article['currencies'] = tag_currencies(article.get('title', ''))
+    return article
+
+# 통화별 대표 기사 (기사 색인이 바뀔 때만 다시 계산)
+HEADLINES_PER_CURRENCY = 3
+_headline_map = {'source': None, 'by_currency': {}}
+_headline_lock = threading.Lock()
+
+def build_headline_map(articles, limit=HEADLINES_PER_CURRENCY):
+    """통화 태그 → 최신 기사 목록"""
+    by_currency = {}
+    for article in sorted(articles, key=lambda a: a['published'], reverse=True):
+        tags = article.get('currencies')
+        if tags is None:
+            # 태깅 이전에 색인된 기사
+            tags = tag_currencies(article.get('title', ''))
+        for tag in tags:
+            headlines = by_currency.setdefault(tag, [])
+            if len(headlines) < limit:
+                headlines.append(article)
+    return by_currency
+
+def get_headline_map(articles_index):
+    """기사 색인에 맞는 통화별 대표 기사 맵"""
+    if _headline_map['source'] is not articles_index:
+        with _headline_lock:
+            if _headline_map['source'] is not articles_index:
+                _headline_map['by_currency'] = build_headline_map(articles_index.get('articles', {}).values())
+                _headline_map['source'] = articles_index
+    return _headline_map['by_currency']
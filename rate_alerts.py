@@ -0,0 +1,285 @@
+"""
+환율 알림 구독
+"USD가 1,500원 넘으면 알려줘" 같은 알림을 사용자별로 저장하고, 환율이 갱신될 때마다
+통화/방향별로 정렬된 기준값 색인에서 이분 탐색으로 넘어선 구간만 찾아냅니다.
+(전체 알림을 훑지 않으므로 갱신당 O(log n + k))
+"""
+
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from currencies import CURRENCY_MAP, RATE_CODES, rate_code
+from news_tagging import tag_currencies
+
+ALERTS_DB = os.getenv('ALERTS_DB', '/tmp/kakao_alerts.db')
+
+# 사용자당 최대 활성 알림 수
+MAX_ALERTS_PER_USER = 20
+
+ABOVE = 'above'
+BELOW = 'below'
+
+# 알림 상태 (active 열)
+DONE = 0        # 발송 완료/해제/dead-letter 기록
+ACTIVE = 1      # 대기 중
+PENDING = 2     # 발동했지만 아직 발송 확인 전 (데몬 재시작 시 다시 발송)
+
+_ABOVE_WORDS = ('넘으면', '넘어가면', '이상', '오르면', '올라가면', '돌파', '초과', '위로')
+_BELOW_WORDS = ('떨어지면', '이하', '내려가면', '내리면', '밑으로', '아래로', '미만', '하락')
+
+_schema_ready = set()
+
+def _connect():
+    conn = sqlite3.connect(ALERTS_DB, timeout=10)
+    if ALERTS_DB in _schema_ready:
+        return conn
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            threshold REAL NOT NULL,
+            created REAL NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1,
+            triggered_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user_id, active)")
+    # 발동 당시 환율 (발송 대기 알림을 재시작 후 다시 보낼 때 사용, 이전 버전 DB 호환)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(alerts)")}
+    if 'triggered_rate' not in columns:
+        conn.execute("ALTER TABLE alerts ADD COLUMN triggered_rate REAL")
+    conn.commit()
+    _schema_ready.add(ALERTS_DB)
+    return conn
+
+def parse_rate(value):
+    """'1,469.20' 같은 환율 문자열을 숫자로 변환 (실패하면 None)"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def parse_currency(text):
+    """발화에서 처음 언급된 통화 코드 (환율 카드 코드 기준, 없으면 None)"""
+    tags = tag_currencies(text or '')
+    if not tags:
+        return None
+    currency = RATE_CODES.get(tags[0], tags[0])
+    return currency if currency in CURRENCY_MAP else None
+
+def normalize_currency(value):
+    """스킬 파라미터 통화 값 → 환율 카드 코드 (코드 'usd'/'JPY' 또는 이름 '달러', 모르면 None)"""
+    return rate_code(value) or parse_currency(value)
+
+def parse_alert_request(text, currency=None):
+    """발화에서 (통화, 방향, 기준값) 추출 - 예: "USD가 1,500원 넘으면 알려줘"
+
+    currency가 있으면(스킬 파라미터) 발화의 통화 대신 사용합니다.
+    """
+    text = text or ''
+
+    currency = currency or parse_currency(text)
+    if not currency:
+        return None
+
+    numbers = re.findall(r'\d[\d,]*(?:\.\d+)?', text)
+    if not numbers:
+        return None
+    threshold = parse_rate(numbers[0])
+    if not threshold:
+        return None
+
+    if any(word in text for word in _BELOW_WORDS):
+        direction = BELOW
+    elif any(word in text for word in _ABOVE_WORDS):
+        direction = ABOVE
+    else:
+        return None
+
+    return currency, direction, threshold
+
+def add_alert(user_id, currency, direction, threshold):
+    """알림 등록 (사용자당 활성 알림 수 초과 시 None)"""
+    with _connect() as conn:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM alerts WHERE user_id = ? AND active = 1", (user_id,)
+        ).fetchone()[0]
+        if count >= MAX_ALERTS_PER_USER:
+            return None
+
+        cursor = conn.execute(
+            "INSERT INTO alerts (user_id, currency, direction, threshold, created) VALUES (?, ?, ?, ?, ?)",
+            (user_id, currency, direction, threshold, time.time())
+        )
+        return cursor.lastrowid
+
+def list_alerts(user_id):
+    """사용자의 활성 알림 목록"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT id, currency, direction, threshold FROM alerts WHERE user_id = ? AND active = 1 ORDER BY id",
+            (user_id,)
+        ).fetchall()
+    return [{'id': r[0], 'currency': r[1], 'direction': r[2], 'threshold': r[3]} for r in rows]
+
+def cancel_alerts(user_id, currency=None):
+    """사용자 알림 해제 (통화를 지정하면 해당 통화만), 해제한 수 반환"""
+    with _connect() as conn:
+        if currency:
+            cursor = conn.execute(
+                "UPDATE alerts SET active = 0 WHERE user_id = ? AND currency = ? AND active = 1", (user_id, currency)
+            )
+        else:
+            cursor = conn.execute("UPDATE alerts SET active = 0 WHERE user_id = ? AND active = 1", (user_id,))
+        return cursor.rowcount
+
+class AlertMatcher:
+    """통화/방향별로 정렬된 기준값 색인
+
+    _index[(통화, 방향)] = ([기준값...], [알림 id...]) 두 리스트는 같은 순서로 정렬되어 있습니다.
+    해제된 알림은 색인에 남아 있다가 발동 확정 단계(DB 갱신)에서 걸러집니다.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def load_new(self):
+        """DB에서 새로 등록된 알림만 읽어 색인에 추가 (마지막으로 읽은 id 이후)"""
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT id, currency, direction, threshold FROM alerts WHERE id > ? AND active = 1 ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+
+        with self._lock:
+            if self._last_id == 0 and rows:
+                # 처음 적재할 때는 한 번에 정렬
+                grouped = {}
+                for alert_id, currency, direction, threshold in rows:
+                    grouped.setdefault((currency, direction), []).append((threshold, alert_id))
+                for key, entries in grouped.items():
+                    entries.sort()
+                    self._index[key] = ([t for t, _ in entries], [i for _, i in entries])
+            else:
+                for alert_id, currency, direction, threshold in rows:
+                    thresholds, ids = self._index.setdefault((currency, direction), ([], []))
+                    pos = bisect.bisect_right(thresholds, threshold)
+                    thresholds.insert(pos, threshold)
+                    ids.insert(pos, alert_id)
+
+            if rows:
+                self._last_id = rows[-1][0]
+
+        return len(rows)
+
+    def match(self, currency, prev_rate, new_rate):
+        """prev_rate → new_rate 로 움직이며 넘어선 알림 id 목록 (색인에서는 remove로 따로 제거)"""
+        if prev_rate is None or new_rate is None or prev_rate == new_rate:
+            return []
+
+        with self._lock:
+            if new_rate > prev_rate:
+                # 상승: prev < 기준값 <= new 인 '이상' 알림
+                entry = self._index.get((currency, ABOVE))
+                if not entry:
+                    return []
+                thresholds, ids = entry
+                lo = bisect.bisect_right(thresholds, prev_rate)
+                hi = bisect.bisect_right(thresholds, new_rate)
+            else:
+                # 하락: new <= 기준값 < prev 인 '이하' 알림
+                entry = self._index.get((currency, BELOW))
+                if not entry:
+                    return []
+                thresholds, ids = entry
+                lo = bisect.bisect_left(thresholds, new_rate)
+                hi = bisect.bisect_left(thresholds, prev_rate)
+
+            return ids[lo:hi]
+
+    def remove(self, alert_ids):
+        """발동 확정된 알림을 색인에서 제거"""
+        alert_ids = set(alert_ids)
+        with self._lock:
+            for key, (thresholds, ids) in self._index.items():
+                if any(alert_id in alert_ids for alert_id in ids):
+                    kept = [(t, i) for t, i in zip(thresholds, ids) if i not in alert_ids]
+                    self._index[key] = ([t for t, _ in kept], [i for _, i in kept])
+
+    def process_update(self, prev_rates, new_rates):
+        """환율 갱신 처리: 발동한 알림을 DB에서 발송 대기(PENDING)로 바꾸고 알림 정보 목록 반환
+
+        발송이 확인되면 mark_done으로 완료 처리하며, 그 전에 데몬이 멈추면 pending_alerts로 다시 보냅니다.
+
+        prev_rates, new_rates: {통화 코드: 환율 숫자}
+        """
+        self.load_new()
+
+        candidates = []
+        for currency, new_rate in new_rates.items():
+            candidates.extend(self.match(currency, prev_rates.get(currency), new_rate))
+
+        if not candidates:
+            return []
+
+        # 한 번만 발동 (그 사이 해제된 알림은 active = 0 이라 제외됨)
+        # 색인에서는 DB 갱신이 커밋된 뒤에 제거 (실패하면 다음 갱신에서 다시 발동할 수 있도록)
+        now = time.time()
+        triggered = []
+        with _connect() as conn:
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, user_id, currency, direction, threshold FROM alerts "
+                    f"WHERE id IN ({placeholders}) AND active = {ACTIVE}", chunk
+                ).fetchall()
+                conn.executemany(
+                    f"UPDATE alerts SET active = {PENDING}, triggered_at = ?, triggered_rate = ? "
+                    f"WHERE id = ? AND active = {ACTIVE}",
+                    [(now, new_rates[r[2]], r[0]) for r in rows]
+                )
+                triggered.extend({
+                    'id': r[0], 'user_id': r[1], 'currency': r[2], 'direction': r[3], 'threshold': r[4],
+                    'rate': new_rates[r[2]]
+                } for r in rows)
+
+        self.remove(candidates)
+        print(f"🔔 환율 알림 발동: {len(triggered)}개")
+        return triggered
+
+def mark_done(alert_ids):
+    """발송했거나 dead-letter에 기록한 알림을 완료 처리"""
+    alert_ids = list(alert_ids)
+    with _connect() as conn:
+        for start in range(0, len(alert_ids), 500):
+            chunk = alert_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(f"UPDATE alerts SET active = {DONE} WHERE id IN ({placeholders}) AND active = {PENDING}", chunk)
+
+def pending_alerts():
+    """발동했지만 발송 확인 전에 데몬이 멈춘 알림 (process_update와 같은 형식)"""
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT id, user_id, currency, direction, threshold, triggered_rate FROM alerts "
+            f"WHERE active = {PENDING} ORDER BY id"
+        ).fetchall()
+    return [{'id': r[0], 'user_id': r[1], 'currency': r[2], 'direction': r[3], 'threshold': r[4],
+             'rate': r[5]} for r in rows if r[5] is not None]
+
+def rates_to_numbers(rates):
+    """환율 목록을 {통화 코드: 숫자}로 변환"""
+    numbers = {}
+    for rate in rates or []:
+        value = parse_rate(rate.get('rate'))
+        if value is not None:
+            numbers[rate.get('currency', '').split()[0]] = value
+    return numbers
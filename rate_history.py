@@ -0,0 +1,113 @@
+"""
+환율 이력 저장소
+일별(KST) 통화별 매매기준율과 송금/현찰 환율을 SQLite에 저장합니다.
+갱신 데몬이 환율을 게시할 때마다 오늘 값을 갱신하고, 과거 데이터는 exim_backfill.py로 한 번에 채웁니다.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+HISTORY_DB = os.getenv('RATE_HISTORY_DB', '/tmp/kakao_rate_history.db')
+
+# 매매기준율 외 송금/현찰 환율 필드 (고객 기준)
+# tts: 송금 보낼 때, ttb: 송금 받을 때, cash_buy: 현찰 살 때, cash_sell: 현찰 팔 때
+SPREAD_FIELDS = ('tts', 'ttb', 'cash_buy', 'cash_sell')
+
+# 양력 고정 공휴일 (음력 공휴일/대체 휴일은 포함하지 않음)
+FIXED_HOLIDAYS = {'01-01', '03-01', '05-05', '06-06', '08-15', '10-03', '10-09', '12-25'}
+
+_local = threading.local()
+
+def _connect():
+    """스레드별 연결 재사용"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'pid', None) != os.getpid():
+        conn = sqlite3.connect(HISTORY_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_history (
+                date TEXT NOT NULL,
+                currency TEXT NOT NULL,
+                rate REAL NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (date, currency)
+            ) WITHOUT ROWID
+        """)
+        # 송금/현찰 환율 열 추가 (이전 버전 DB 호환)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(rate_history)")}
+        for field in SPREAD_FIELDS:
+            if field not in columns:
+                conn.execute(f"ALTER TABLE rate_history ADD COLUMN {field} REAL")
+        conn.commit()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def kst_today():
+    """오늘 날짜 (KST, YYYY-MM-DD)"""
+    return (datetime.utcnow() + timedelta(hours=9)).strftime('%Y-%m-%d')
+
+def is_business_day(date):
+    """영업일(YYYY-MM-DD)인지 (주말/고정 공휴일 제외)"""
+    day = datetime.strptime(date, '%Y-%m-%d')
+    return day.weekday() < 5 and date[5:] not in FIXED_HOLIDAYS
+
+def insert_rows(rows, source):
+    """(날짜, 통화, 환율[, 송금/현찰 환율 dict]) 목록을 한 트랜잭션으로 저장 (같은 날짜/통화는 덮어씀)
+
+    저장한 행 수를 반환합니다.
+    """
+    values = []
+    for row in rows:
+        spreads = row[3] if len(row) > 3 and row[3] else {}
+        values.append(tuple(row[:3]) + (source,) + tuple(spreads.get(field) for field in SPREAD_FIELDS))
+    if not values:
+        return 0
+
+    columns = ', '.join(('date', 'currency', 'rate', 'source') + SPREAD_FIELDS)
+    placeholders = ', '.join('?' * (4 + len(SPREAD_FIELDS)))
+    conn = _connect()
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO rate_history ({columns}) VALUES ({placeholders})", values)
+    return len(values)
+
+def _number(value):
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def record_rates(rates, source, date=None):
+    """게시된 환율 목록({'currency', 'rate', 송금/현찰 환율} 문자열 값)을 해당 날짜 이력으로 저장
+
+    환율에 고시 날짜('date')가 있으면 그 날짜로, 없으면 date(기본 오늘)로 저장하며
+    영업일이 아닌 날짜의 행은 저장하지 않습니다.
+    """
+    date = date or kst_today()
+    rows = []
+    for rate in rates or []:
+        value = _number(rate.get('rate'))
+        rate_date = rate.get('date') or date
+        if value is None or not is_business_day(rate_date):
+            continue
+        spreads = {field: _number(rate[field]) for field in SPREAD_FIELDS if rate.get(field)}
+        rows.append((rate_date, rate.get('currency', '').split()[0], value, spreads))
+    return insert_rows(rows, source)
+
+def stored_dates(start, end):
+    """기간(YYYY-MM-DD, 양 끝 포함) 안에서 이력이 있는 날짜 집합"""
+    rows = _connect().execute(
+        "SELECT DISTINCT date FROM rate_history WHERE date BETWEEN ? AND ?", (start, end)
+    ).fetchall()
+    return {row[0] for row in rows}
+
+def get_history(currency, days=30, end=None):
+    """통화의 최근 일별 환율 [(날짜, 환율)] (오래된 날짜부터)"""
+    end = end or kst_today()
+    start = (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=days)).strftime('%Y-%m-%d')
+    return _connect().execute(
+        "SELECT date, rate FROM rate_history WHERE currency = ? AND date BETWEEN ? AND ? ORDER BY date",
+        (currency, start, end)
+    ).fetchall()
@@ -0,0 +1,839 @@
+"""
+환율 제공처(provider) 모음
+한국수출입은행, 두나무(업비트), 매일경제, 하나은행, 네이버 금융, ExchangeRate-API 조회 함수입니다.
+외부 호출은 갱신 데몬(refresher.py)이 담당하고, 웹 워커는 스냅샷만 읽습니다.
+"""
+
+import requests
+from datetime import datetime
+import operator
+import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+
+from deadline import budget_timeout, has_time
+import exim_client
+from currencies import CURRENCY_MAP, currency_tag, currency_unit
+from rate_history import SPREAD_FIELDS
+
+def spread_fields(values, scale=1):
+    """송금/현찰 환율 숫자 → 환율 목록 형식 문자열 (값이 없거나 숫자가 아닌 필드는 제외)
+
+    scale: 제공처가 1엔 단위로 주는 JPY를 100엔 기준으로 맞출 때 100
+    """
+    spreads = {}
+    for field in SPREAD_FIELDS:
+        try:
+            value = float(str(values.get(field)).replace(',', ''))
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            spreads[field] = f"{value * scale:,.2f}"
+    return spreads
+
+def get_exchange_rates_advanced():
+    """한국수출입은행 API로 환율 정보 조회 (호출 한도/날짜 캐시는 exim_client가 관리)
+
+    당일 고시(약 11시) 전이나 휴일에는 직전 영업일 고시 환율을 돌려주고,
+    전일 대비는 그 이전 영업일 고시 환율과 비교합니다.
+    """
+    try:
+        if not exim_client.get_api_key():
+            print("⚠️ 한국수출입은행 API 키가 설정되지 않았습니다")
+            return None
+        
+        searchdate, items = exim_client.latest_rates()
+        if not searchdate:
+            print(f"❌ 한국수출입은행 고시 환율 없음 (오늘 호출 {exim_client.quota_usage()['calls']}회)")
+            return None
+        
+        print(f"📅 고시 날짜: {searchdate}")
+        notice_date = f"{searchdate[:4]}-{searchdate[4:6]}-{searchdate[6:]}"
+        
+        # 전일 대비 계산용 직전 영업일 환율 (날짜별 캐시이므로 하루 한 번만 호출)
+        _, previous_items = exim_client.latest_rates(before=searchdate)
+        previous = {r['currency']: r['rate'] for r in exim_client.parse_items(previous_items)}
+        
+        # 필요한 통화만 추출
+        target_currencies = ['USD', 'JPY100', 'EUR', 'CNY', 'GBP']
+        
+        rates = []
+        for rate in exim_client.parse_items(items):
+            currency_code = rate['currency']
+            if currency_code not in target_currencies:
+                continue
+            
+            # 전일 대비
+            if currency_code in previous:
+                change = rate['rate'] - previous[currency_code]
+                change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}" if change < 0 else "+0.00"
+            else:
+                change_str = "+0.00"
+            
+            rates.append({
+                'currency': currency_code,
+                'rate': f"{rate['rate']:,.2f}",
+                'change': change_str,
+                # 고시 날짜 (고시 전/휴일에는 직전 영업일, 환율 이력은 이 날짜로 저장)
+                'date': notice_date,
+                **spread_fields(rate)
+            })
+            
+            print(f"  💱 {currency_code}: {rate['rate']:,.2f} ({change_str}) 송금 {rate['tts']}/{rate['ttb']}")
+        
+        if rates:
+            rates.sort(key=lambda r: target_currencies.index(r['currency']))
+            print(f"✅ 한국수출입은행 API에서 환율 수집 성공: {len(rates)}개")
+            return rates
+        else:
+            print("⚠️ API 응답은 있지만 대상 통화 데이터가 없음")
+            return None
+            
+    except Exception as e:
+        print(f"❌ 한국수출입은행 API 에러: {e}")
+        import traceback
+        print(traceback.format_exc())
+        return None
+
+# 매일경제 응답 필드 후보 (프록시/시점에 따라 이름이 다름, 앞에서부터 우선)
+MK_FIELD_CANDIDATES = {
+    'code': ('code', 'CUR_CD'),
+    'rate': ('base', 'BASE', 'deal_bas_r', 'DEAL_BAS_R'),
+    'change': ('change', 'CHANGE', 'dod'),
+}
+
+# 첫 항목의 키 집합 → 컴파일된 접근자 (같은 형식이면 다시 탐지하지 않음)
+_mk_schemas = {}
+_mk_schema_lock = threading.Lock()
+_mk_schema_stats = {'schemas': {}, 'unknown': 0, 'last_unknown': None}
+
+def resolve_mk_schema(record):
+    """첫 항목으로 응답 형식을 탐지해 (형식 이름, itemgetter) 반환 (모르는 형식이면 None)
+
+    itemgetter는 항목에서 (통화 코드, 매매기준율[, 전일대비])를 한 번에 꺼냅니다.
+    """
+    if not isinstance(record, dict):
+        return _unknown_mk_schema(type(record).__name__)
+
+    keys = frozenset(record)
+    with _mk_schema_lock:
+        if keys in _mk_schemas:
+            return _mk_schemas[keys]
+
+    fields = [next((name for name in candidates if name in record), None)
+              for candidates in MK_FIELD_CANDIDATES.values()]
+    code_field, rate_field, change_field = fields
+    if not code_field or not rate_field:
+        return _unknown_mk_schema(sorted(keys))
+
+    names = [code_field, rate_field] + ([change_field] if change_field else [])
+    schema = ('/'.join(names), operator.itemgetter(*names))
+    with _mk_schema_lock:
+        _mk_schemas[keys] = schema
+    print(f"🧩 매일경제 응답 형식 탐지: {schema[0]}")
+    return schema
+
+def _unknown_mk_schema(keys):
+    """모르는 응답 형식 알림 (형식 변경을 바로 알 수 있도록 상태에도 기록)"""
+    with _mk_schema_lock:
+        _mk_schema_stats['unknown'] += 1
+        _mk_schema_stats['last_unknown'] = {'keys': keys, 'at': datetime.now().isoformat()}
+    print(f"🚨 매일경제 응답 형식을 알 수 없음 - 필드: {keys}")
+    return None
+
+def mk_schema_stats():
+    """형식별 파싱 횟수와 모르는 형식 발생 기록 (갱신 데몬 상태에 게시)"""
+    with _mk_schema_lock:
+        return {
+            'schemas': dict(_mk_schema_stats['schemas']),
+            'unknown': _mk_schema_stats['unknown'],
+            'last_unknown': _mk_schema_stats['last_unknown']
+        }
+
+def parse_mk_items(data):
+    """매일경제 응답 → 환율 목록 (형식은 첫 항목으로 한 번만 탐지)"""
+    if not isinstance(data, list) or not data:
+        return []
+    
+    schema = resolve_mk_schema(data[0])
+    if not schema:
+        return []
+    schema_name, getter = schema
+    
+    # 통화 매핑
+    currency_map = {
+        'USD': 'USD',
+        'JPY': 'JPY100',
+        'EUR': 'EUR',
+        'CNY': 'CNY',
+        'GBP': 'GBP'
+    }
+    
+    rates = []
+    for item in data:
+        try:
+            values = getter(item)
+        except (KeyError, TypeError):
+            # 같은 응답 안에서 형식이 다른 항목
+            continue
+        
+        cur_code = values[0]
+        if cur_code not in currency_map:
+            continue
+        
+        try:
+            rate_num = float(str(values[1]).replace(',', ''))
+        except ValueError:
+            continue
+        
+        # 전일대비
+        try:
+            change_val = float(str(values[2]).replace(',', '')) if len(values) > 2 else 0.0
+        except ValueError:
+            change_val = 0.0
+        
+        # JPY는 100엔 기준
+        if cur_code == 'JPY':
+            rate_num *= 100
+            change_val *= 100
+        
+        change_str = f"+{change_val:.2f}" if change_val > 0 else f"{change_val:.2f}" if change_val < 0 else "+0.00"
+        
+        rates.append({
+            'currency': currency_map[cur_code],
+            'rate': f"{rate_num:,.2f}",
+            'change': change_str
+        })
+        
+        print(f"  💱 {currency_map[cur_code]}: {rate_num:,.2f} ({change_str})")
+    
+    with _mk_schema_lock:
+        _mk_schema_stats['schemas'][schema_name] = _mk_schema_stats['schemas'].get(schema_name, 0) + 1
+    return rates
+
+# 매일경제 환율 API와 경유할 프록시 (이름, 접두 URL)
+MK_TARGET_URL = "https://stock.mk.co.kr/json/exchangeList.php"
+MK_PROXIES = [
+    ("AllOrigins", "https://api.allorigins.win/raw?url="),
+    ("CorsProxy.io", "https://corsproxy.io/?"),
+    ("직접 연결", "")
+]
+MK_TIMEOUT = 15
+
+# 프록시 동시 요청용 (호출마다 스레드를 만들지 않도록 공유)
+_mk_executor = ThreadPoolExecutor(max_workers=len(MK_PROXIES) * 2, thread_name_prefix='mk-proxy')
+
+# 마지막으로 성공한 프록시 (다음 호출은 이 프록시부터 단독 시도)
+_mk_winner = {'name': None}
+
+# 프록시별 시도/성공/실패 횟수와 응답 시간 (avg_latency는 지수 이동 평균)
+_mk_proxy_stats = {name: {'attempts': 0, 'wins': 0, 'failures': 0, 'last_latency': None, 'avg_latency': None}
+                   for name, _ in MK_PROXIES}
+_mk_stats_lock = threading.Lock()
+
+def _record_mk_proxy(name, latency, ok):
+    with _mk_stats_lock:
+        stats = _mk_proxy_stats[name]
+        stats['attempts'] += 1
+        stats['wins' if ok else 'failures'] += 1
+        stats['last_latency'] = round(latency, 3)
+        avg = stats['avg_latency']
+        stats['avg_latency'] = round(latency if avg is None else avg * 0.7 + latency * 0.3, 3)
+
+def mk_proxy_stats():
+    """프록시별 응답 시간 통계와 마지막 성공 프록시 (갱신 데몬 상태에 게시)"""
+    with _mk_stats_lock:
+        return {
+            'winner': _mk_winner['name'],
+            'proxies': {name: dict(stats) for name, stats in _mk_proxy_stats.items()}
+        }
+
+def _fetch_mk_proxy(proxy_name, proxy_url, timeout, cancelled):
+    """프록시 하나로 매일경제 환율 조회 (다른 프록시가 먼저 성공하면 본문을 읽지 않고 중단)"""
+    full_url = proxy_url + MK_TARGET_URL if proxy_url else MK_TARGET_URL
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    
+    started = time.monotonic()
+    rates = None
+    try:
+        print(f"💰 매일경제 API 요청 ({proxy_name}): {MK_TARGET_URL}")
+        with requests.get(full_url, headers=headers, timeout=timeout, stream=True) as response:
+            if cancelled.is_set():
+                return None
+            
+            print(f"📡 {proxy_name} 응답 상태: {response.status_code}")
+            if response.status_code != 200:
+                print(f"❌ {proxy_name} 요청 실패: {response.status_code}")
+                return None
+            
+            data = response.json()
+        
+        if cancelled.is_set():
+            return None
+        print(f"✅ {proxy_name} JSON 파싱 성공, 항목 수: {len(data) if isinstance(data, list) else '?'}")
+        
+        rates = parse_mk_items(data)
+        if not rates:
+            print(f"⚠️ {proxy_name} 데이터 파싱 실패")
+        return rates
+    
+    except Exception as e:
+        if not cancelled.is_set():
+            print(f"❌ {proxy_name} 에러: {e}")
+        return None
+    
+    finally:
+        # 취소된 시도는 통계에 넣지 않음 (느린 프록시가 실패로 기록되지 않도록)
+        if rates or not cancelled.is_set():
+            _record_mk_proxy(proxy_name, time.monotonic() - started, bool(rates))
+
+def _race_mk_proxies(proxies, timeout):
+    """프록시들을 동시에 요청해 처음 유효한 결과 반환 (나머지는 취소) → (프록시 이름, 환율) 또는 (None, None)"""
+    cancelled = threading.Event()
+    futures = {_mk_executor.submit(_fetch_mk_proxy, name, url, timeout, cancelled): name
+               for name, url in proxies}
+    
+    try:
+        for future in as_completed(futures, timeout=timeout + 1):
+            rates = future.result()
+            if rates:
+                return futures[future], rates
+    except FuturesTimeout:
+        print(f"⏱️ 매일경제 프록시 {timeout:.1f}초 안에 응답 없음")
+    finally:
+        cancelled.set()
+        for future in futures:
+            future.cancel()
+    
+    return None, None
+
+def get_exchange_rates_mk():
+    """매일경제 환율 API로 실시간 환율 조회 (마지막 성공 프록시 우선, 실패하면 나머지 프록시 동시 시도)"""
+    if not has_time(1.0):
+        print("⏱️ 응답 예산 부족 - 매일경제 조회 생략")
+        return None
+    
+    timeout = budget_timeout(MK_TIMEOUT)
+    proxies = list(MK_PROXIES)
+    
+    winner = _mk_winner['name']
+    if winner:
+        proxy = next(proxy for proxy in proxies if proxy[0] == winner)
+        proxies.remove(proxy)
+        name, rates = _race_mk_proxies([proxy], timeout)
+        if rates:
+            print(f"✅ 매일경제에서 실시간 환율 수집 성공: {len(rates)}개 ({name} 사용)")
+            return rates
+        print(f"⚠️ 마지막 성공 프록시({winner}) 실패, 나머지 프록시 동시 시도...")
+        
+        if not has_time(1.0):
+            print("⏱️ 응답 예산 부족 - 나머지 프록시 시도 생략")
+            return None
+        timeout = budget_timeout(MK_TIMEOUT)
+    
+    name, rates = _race_mk_proxies(proxies, timeout)
+    _mk_winner['name'] = name
+    if rates:
+        print(f"✅ 매일경제에서 실시간 환율 수집 성공: {len(rates)}개 ({name} 사용)")
+        return rates
+    
+    print("❌ 모든 프록시 실패")
+    return None
+
+def get_exchange_rates_hana():
+    """하나은행 환율 API로 실시간 환율 조회"""
+    try:
+        # 하나은행 환율 조회 API
+        url = "https://www.kebhana.com/cms/rate/index.do?contentUrl=/cms/rate/wpfxd651_01i.json"
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Referer': 'https://www.kebhana.com/'
+        }
+        
+        print(f"🏦 하나은행 API 요청: {url}")
+        response = requests.get(url, headers=headers, timeout=budget_timeout(10))
+        
+        print(f"📡 응답 상태: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ JSON 파싱 성공")
+            
+            # 하나은행 응답 구조에 맞게 파싱
+            rates = []
+            
+            # 통화 매핑
+            currency_map = {
+                'USD': {'code': 'USD', 'name': '미국 달러'},
+                'JPY': {'code': 'JPY100', 'name': '일본 엔'},
+                'EUR': {'code': 'EUR', 'name': '유로'},
+                'CNY': {'code': 'CNY', 'name': '중국 위안'},
+                'GBP': {'code': 'GBP', 'name': '영국 파운드'}
+            }
+            
+            for item in data:
+                cur_code = item.get('CUR_CD', '')
+                
+                if cur_code in currency_map:
+                    # 매매기준율
+                    deal_bas_r = item.get('DEAL_BAS_R', '0')
+                    
+                    # 전일 대비
+                    change_amt = item.get('CHANGE', '0')
+                    
+                    try:
+                        change_val = float(change_amt.replace(',', ''))
+                        if change_val > 0:
+                            change_str = f"+{change_val:.2f}"
+                        elif change_val < 0:
+                            change_str = f"{change_val:.2f}"
+                        else:
+                            change_str = "+0.00"
+                    except:
+                        change_str = "+0.00"
+                    
+                    # JPY는 100엔 기준
+                    if cur_code == 'JPY':
+                        try:
+                            rate_val = float(deal_bas_r.replace(',', ''))
+                            deal_bas_r = f"{rate_val * 100:,.2f}"
+                            if change_val != 0:
+                                change_val = change_val * 100
+                                change_str = f"+{change_val:.2f}" if change_val > 0 else f"{change_val:.2f}"
+                        except:
+                            pass
+                    
+                    # 현찰/송금 환율 (고객 기준, 필드가 없으면 생략)
+                    spreads = spread_fields({
+                        'cash_buy': item.get('CASH_BUY', ''),
+                        'cash_sell': item.get('CASH_SELL', ''),
+                        'tts': item.get('TTS', ''),
+                        'ttb': item.get('TTB', '')
+                    }, scale=100 if cur_code == 'JPY' else 1)
+                    
+                    rates.append({
+                        'currency': currency_map[cur_code]['code'],
+                        'rate': deal_bas_r,
+                        'change': change_str,
+                        **spreads
+                    })
+                    
+                    print(f"  💱 {currency_map[cur_code]['code']}: {deal_bas_r} ({change_str})")
+            
+            if rates:
+                print(f"✅ 하나은행에서 실시간 환율 수집 성공: {len(rates)}개")
+                return rates
+            else:
+                print("⚠️ 하나은행 데이터 파싱 실패")
+                return None
+                
+        else:
+            print(f"❌ 하나은행 API 요청 실패: {response.status_code}")
+            return None
+            
+    except Exception as e:
+        print(f"❌ 하나은행 API 에러: {e}")
+        import traceback
+        print(traceback.format_exc())
+        return None
+
+NAVER_EXCHANGE_LIST_URL = "https://finance.naver.com/marketindex/exchangeList.naver"
+
+# 네이버 환율 표 열 순서 (매매기준율 다음, 고객 기준)
+NAVER_SPREAD_COLUMNS = ('cash_buy', 'cash_sell', 'tts', 'ttb')
+
+def parse_naver_spreads(html):
+    """네이버 환율 표(exchangeList) → {'USD': {'cash_buy', 'cash_sell', 'tts', 'ttb'}} (JPY는 이미 100엔 기준)
+
+    행마다 통화명, 매매기준율, 현찰 사실 때/팔 때, 송금 보낼 때/받을 때 순서입니다.
+    """
+    from bs4 import BeautifulSoup
+    from urllib.parse import urlparse, parse_qs
+
+    spreads = {}
+    for row in BeautifulSoup(html, 'html.parser').select('table.tbl_exchange tbody tr'):
+        anchor = row.select_one('td.tit a[href*="marketindexCd="]')
+        cells = row.find_all('td')
+        if not anchor or len(cells) < 2 + len(NAVER_SPREAD_COLUMNS):
+            continue
+        code = parse_qs(urlparse(anchor['href']).query).get('marketindexCd', [''])[0]
+        if not (code.startswith('FX_') and code.endswith('KRW')):
+            continue
+        currency = 'JPY100' if code == 'FX_JPYKRW' else code[3:-3]
+        values = {field: cell.get_text(strip=True) for field, cell in zip(NAVER_SPREAD_COLUMNS, cells[2:])}
+        spreads[currency] = spread_fields(values)
+    return spreads
+
+def get_naver_spreads(headers):
+    """네이버 환율 표 한 페이지로 전체 통화 송금/현찰 환율 조회 (실패하면 빈 dict)"""
+    try:
+        response = requests.get(NAVER_EXCHANGE_LIST_URL, headers=headers, timeout=budget_timeout(10))
+        if response.status_code != 200:
+            print(f"  ⚠️ 네이버 송금/현찰 환율 요청 실패: {response.status_code}")
+            return {}
+        # 페이지가 EUC-KR이므로 바이트 그대로 넘겨 meta charset으로 해석
+        return parse_naver_spreads(response.content)
+    except Exception as e:
+        print(f"  ⚠️ 네이버 송금/현찰 환율 조회 실패: {e}")
+        return {}
+
+def get_exchange_rates_naver():
+    """네이버 금융 환율 API (실시간 정확)"""
+    try:
+        # 네이버 금융 실시간 환율 API
+        base_url = "https://polling.finance.naver.com/api/realtime/marketindex/exchange"
+        
+        currencies = ['FRX.KRWUSD', 'FRX.KRWJPY', 'FRX.KRWEUR', 'FRX.KRWCNY', 'FRX.KRWGBP']
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Referer': 'https://finance.naver.com/'
+        }
+        
+        rates = []
+        
+        for cur_code in currencies:
+            if not has_time(0.5):
+                print("⏱️ 응답 예산 부족 - 네이버 나머지 통화 조회 생략")
+                break
+            
+            try:
+                url = f"{base_url}/{cur_code}"
+                
+                print(f"🌐 네이버 API 요청: {cur_code}")
+                response = requests.get(url, headers=headers, timeout=budget_timeout(10))
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    # 통화 코드
+                    if 'USD' in cur_code:
+                        currency = 'USD'
+                    elif 'JPY' in cur_code:
+                        currency = 'JPY100'
+                    elif 'EUR' in cur_code:
+                        currency = 'EUR'
+                    elif 'CNY' in cur_code:
+                        currency = 'CNY'
+                    elif 'GBP' in cur_code:
+                        currency = 'GBP'
+                    else:
+                        continue
+                    
+                    # 환율
+                    trade_price = data.get('tradePrice', 0)
+                    
+                    # 변동폭
+                    change_val = data.get('change', 0)
+                    
+                    # JPY는 100엔 기준
+                    if currency == 'JPY100':
+                        trade_price = trade_price * 100
+                        change_val = change_val * 100
+                    
+                    # 변동폭 문자열
+                    if change_val > 0:
+                        change_str = f"+{change_val:.2f}"
+                    elif change_val < 0:
+                        change_str = f"{change_val:.2f}"
+                    else:
+                        change_str = "+0.00"
+                    
+                    rates.append({
+                        'currency': currency,
+                        'rate': f"{trade_price:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 {currency}: {trade_price:,.2f} ({change_str})")
+                    
+            except Exception as e:
+                print(f"  ⚠️ {cur_code} 조회 실패: {e}")
+                continue
+        
+        if rates:
+            # 송금/현찰 환율은 환율 표 한 페이지에서 (실패해도 매매기준율은 게시)
+            if has_time(0.5):
+                spreads = get_naver_spreads(headers)
+                for rate in rates:
+                    rate.update(spreads.get(rate['currency'], {}))
+            print(f"✅ 네이버 금융에서 실시간 환율 수집 성공: {len(rates)}개")
+            return rates
+        else:
+            print("❌ 네이버 금융 환율 수집 실패")
+            return None
+            
+    except Exception as e:
+        print(f"❌ 네이버 금융 에러: {e}")
+        return None
+
+DUNAMU_URL = "https://quotation-api-cdn.dunamu.com/v1/forex/recent"
+
+def dunamu_codes():
+    """레지스트리 통화 → 두나무 코드 {'FRX.KRWUSD': 'USD', 'FRX.KRWJPY': 'JPY100', ...}
+
+    같은 통화가 여러 단위로 등록되어 있으면(JPY, JPY100) 고시 단위 카드 코드를 사용합니다.
+    """
+    codes = {}
+    for code in CURRENCY_MAP:
+        key = f"FRX.KRW{currency_tag(code)}"
+        if key not in codes or currency_unit(code) > 1:
+            codes[key] = code
+    return codes
+
+def parse_dunamu_items(data, codes=None):
+    """두나무 응답 → 환율 목록 (레지스트리 순서, 송금/현찰 환율 포함)
+
+    두나무 가격은 currencyUnit(JPY는 100) 단위이므로 카드 단위에 맞춰 환산합니다.
+    송금/현찰 필드 이름은 고객 기준입니다 (ttBuyingPrice = 송금 보낼 때).
+    """
+    codes = codes or dunamu_codes()
+    order = list(codes.values())
+    
+    rates = []
+    for item in data if isinstance(data, list) else []:
+        currency = codes.get(item.get('code'))
+        base_price = item.get('basePrice')
+        if not currency or not base_price:
+            continue
+        
+        scale = currency_unit(currency) / (item.get('currencyUnit') or 1)
+        base_price *= scale
+        # changePrice는 부호 없는 값 (방향은 change: RISE/FALL/EVEN)
+        change_price = item.get('signedChangePrice')
+        if change_price is None:
+            change_price = -(item.get('changePrice') or 0) if item.get('change') == 'FALL' else item.get('changePrice') or 0
+        change_price *= scale
+        
+        if change_price > 0:
+            change_str = f"+{change_price:.2f}"
+        elif change_price < 0:
+            change_str = f"{change_price:.2f}"
+        else:
+            change_str = "+0.00"
+        
+        spreads = spread_fields({
+            'tts': item.get('ttBuyingPrice'),
+            'ttb': item.get('ttSellingPrice'),
+            'cash_buy': item.get('cashBuyingPrice'),
+            'cash_sell': item.get('cashSellingPrice')
+        }, scale=scale)
+        
+        rates.append({
+            'currency': currency,
+            'rate': f"{base_price:,.2f}",
+            'change': change_str,
+            **spreads
+        })
+    
+    rates.sort(key=lambda r: order.index(r['currency']))
+    return rates
+
+def get_exchange_rates_dunamu():
+    """두나무(업비트) 환율 API로 레지스트리 전체 통화를 한 번에 조회"""
+    try:
+        codes = dunamu_codes()
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        
+        print(f"🌐 두나무 API 요청: {len(codes)}개 통화")
+        response = requests.get(DUNAMU_URL, params={'codes': ','.join(codes)}, headers=headers,
+                                timeout=budget_timeout(10))
+        
+        if response.status_code != 200:
+            print(f"❌ 두나무 API 요청 실패: {response.status_code}")
+            return None
+        
+        rates = parse_dunamu_items(response.json(), codes)
+        for rate in rates:
+            print(f"  💱 {rate['currency']}: {rate['rate']} ({rate['change']})")
+        
+        if rates:
+            print(f"✅ 두나무에서 실시간 환율 수집 성공: {len(rates)}개")
+            return rates
+        
+        print("❌ 두나무 환율 수집 실패: 데이터 없음")
+        return None
+        
+    except Exception as e:
+        print(f"❌ 두나무 API 에러: {e}")
+        return None
+
+# 환율 저장 파일 경로
+RATES_FILE = '/tmp/last_rates.json'
+
+def save_rates(rates_data):
+    """환율을 파일에 저장"""
+    try:
+        with open(RATES_FILE, 'w') as f:
+            json.dump({
+                'timestamp': datetime.utcnow().isoformat(),
+                'rates': rates_data
+            }, f)
+    except:
+        pass
+
+def load_last_rates():
+    """저장된 환율 불러오기 (없으면 기준값 사용)"""
+    try:
+        if os.path.exists(RATES_FILE):
+            with open(RATES_FILE, 'r') as f:
+                data = json.load(f)
+                return data.get('rates', {})
+    except:
+        pass
+    
+    # 초기 기준 환율 (2026-01-22 오전 기준)
+    return {
+        'USD': 1473.50,
+        'JPY100': 925.27,
+        'EUR': 1514.30,
+        'CNY': 197.30,
+        'GBP': 1803.20
+    }
+
+def get_exchange_rates_with_change():
+    """ExchangeRate-API + 실제 변동폭 계산"""
+    try:
+        # 현재 환율 조회
+        url = "https://open.er-api.com/v6/latest/KRW"
+        
+        response = requests.get(url, timeout=budget_timeout(10))
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            if data.get('result') == 'success':
+                rates_data = data['rates']
+                
+                # 이전 환율 불러오기
+                last_rates = load_last_rates()
+                
+                rates = []
+                
+                # USD
+                if 'USD' in rates_data:
+                    usd_to_krw = 1 / rates_data['USD']
+                    
+                    # 변동폭 계산
+                    if 'USD' in last_rates:
+                        change = usd_to_krw - last_rates['USD']
+                    else:
+                        change = 0
+                    
+                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
+                    
+                    rates.append({
+                        'currency': 'USD',
+                        'rate': f"{usd_to_krw:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 USD: {usd_to_krw:,.2f} ({change_str})")
+                
+                # JPY (100엔 기준)
+                if 'JPY' in rates_data:
+                    jpy_to_krw = (1 / rates_data['JPY']) * 100
+                    
+                    if 'JPY100' in last_rates:
+                        change = jpy_to_krw - last_rates['JPY100']
+                    else:
+                        change = 0
+                    
+                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
+                    
+                    rates.append({
+                        'currency': 'JPY100',
+                        'rate': f"{jpy_to_krw:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 JPY100: {jpy_to_krw:,.2f} ({change_str})")
+                
+                # EUR
+                if 'EUR' in rates_data:
+                    eur_to_krw = 1 / rates_data['EUR']
+                    
+                    if 'EUR' in last_rates:
+                        change = eur_to_krw - last_rates['EUR']
+                    else:
+                        change = 0
+                    
+                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
+                    
+                    rates.append({
+                        'currency': 'EUR',
+                        'rate': f"{eur_to_krw:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 EUR: {eur_to_krw:,.2f} ({change_str})")
+                
+                # CNY
+                if 'CNY' in rates_data:
+                    cny_to_krw = 1 / rates_data['CNY']
+                    
+                    if 'CNY' in last_rates:
+                        change = cny_to_krw - last_rates['CNY']
+                    else:
+                        change = 0
+                    
+                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
+                    
+                    rates.append({
+                        'currency': 'CNY',
+                        'rate': f"{cny_to_krw:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 CNY: {cny_to_krw:,.2f} ({change_str})")
+                
+                # GBP
+                if 'GBP' in rates_data:
+                    gbp_to_krw = 1 / rates_data['GBP']
+                    
+                    if 'GBP' in last_rates:
+                        change = gbp_to_krw - last_rates['GBP']
+                    else:
+                        change = 0
+                    
+                    change_str = f"+{change:.2f}" if change > 0 else f"{change:.2f}"
+                    
+                    rates.append({
+                        'currency': 'GBP',
+                        'rate': f"{gbp_to_krw:,.2f}",
+                        'change': change_str
+                    })
+                    
+                    print(f"  💱 GBP: {gbp_to_krw:,.2f} ({change_str})")
+                
+                # 현재 환율 저장
+                if rates:
+                    current_rates = {}
+                    if 'USD' in rates_data:
+                        current_rates['USD'] = 1 / rates_data['USD']
+                    if 'JPY' in rates_data:
+                        current_rates['JPY100'] = (1 / rates_data['JPY']) * 100
+                    if 'EUR' in rates_data:
+                        current_rates['EUR'] = 1 / rates_data['EUR']
+                    if 'CNY' in rates_data:
+                        current_rates['CNY'] = 1 / rates_data['CNY']
+                    if 'GBP' in rates_data:
+                        current_rates['GBP'] = 1 / rates_data['GBP']
+                    
+                    save_rates(current_rates)
+                    
+                    print(f"✅ ExchangeRate-API에서 환율 수집 성공: {len(rates)}개 (실시간 변동폭)")
+                    return rates
+        
+        return None
+        
+    except Exception as e:
+        print(f"❌ ExchangeRate-API 에러: {e}")
+        return None
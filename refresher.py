@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+환율/뉴스 갱신 데몬
+모든 외부 호출(환율 제공처, 뉴스 크롤링, 썸네일, 시장지표, 암호화폐 시세)을 웹 서버와 분리된 프로세스에서 실행하고,
+결과를 스냅샷 저장소에 게시합니다. 웹 워커는 스냅샷 조회와 응답 렌더링만 합니다.
+
+사용법:
+    python refresher.py          # 계속 실행
+    python refresher.py --once   # 모든 작업을 한 번씩 실행 후 종료
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import alert_dispatcher
+import crypto_tickers
+import exim_client
+import market_index
+import news_crawler
+import rate_alerts
+import rate_history
+import rate_providers
+import snapshot_notify
+import snapshot_store
+import thumbnails
+
+# 작업별 갱신 주기 (초)
+RATES_INTERVAL = int(os.getenv('REFRESH_RATES_INTERVAL', '60'))
+NEWS_INTERVAL = int(os.getenv('REFRESH_NEWS_INTERVAL', '300'))
+MARKETS_INTERVAL = int(os.getenv('REFRESH_MARKETS_INTERVAL', '300'))
+CRYPTO_INTERVAL = int(os.getenv('REFRESH_CRYPTO_INTERVAL', '10'))
+
+# 제공처 서킷 브레이커: 연속 실패 시 일정 시간 호출 중단
+CIRCUIT_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 300
+
+# 환율 제공처 (같은 건강 점수면 앞쪽 우선)
+RATE_PROVIDERS = [
+    ('exim', rate_providers.get_exchange_rates_advanced),
+    ('dunamu', rate_providers.get_exchange_rates_dunamu),
+    ('mk', rate_providers.get_exchange_rates_mk),
+    ('hana', rate_providers.get_exchange_rates_hana),
+    ('naver', rate_providers.get_exchange_rates_naver),
+    ('er-api', rate_providers.get_exchange_rates_with_change),
+]
+
+# 환율 집계: 건강 점수 상위 제공처를 동시에 호출해 통화별로 가장 건강한 제공처 값을 사용
+RATES_AGGREGATE_SOURCES = int(os.getenv('RATES_AGGREGATE_SOURCES', '3'))
+RATES_FETCH_TIMEOUT = 20
+# 건강 점수: 성공률 지수 이동 평균 (최근 결과 가중치), 호출하지 않은 제공처도 같은 비율로 회복
+HEALTH_WEIGHT = 0.2
+
+_rates_executor = ThreadPoolExecutor(max_workers=len(RATE_PROVIDERS), thread_name_prefix='rates')
+
+# 환율 알림 색인과 직전 환율 (알림 발동 구간 계산용)
+_alert_matcher = rate_alerts.AlertMatcher()
+_last_rate_numbers = {}
+
+_stop = threading.Event()
+_status_lock = threading.Lock()
+_status = {
+    'pid': os.getpid(),
+    'started': time.time(),
+    'jobs': {},
+    'providers': {name: {'state': 'closed', 'failures': 0, 'open_until': 0, 'score': 1.0,
+                         'last_success': None, 'last_error': None, 'latency': None}
+                  for name, _ in RATE_PROVIDERS}
+}
+
+def publish(name, data):
+    """스냅샷 게시 후 웹 워커에 즉시 알림"""
+    version = snapshot_store.publish(name, data)
+    snapshot_notify.notify(name, version)
+    return version
+
+def publish_status():
+    """데몬 상태(작업 결과, 제공처 서킷 상태) 게시 - 웹 워커의 생존 확인에도 사용"""
+    with _status_lock:
+        _status['alerts'] = alert_dispatcher.stats()
+        _status['exim_quota'] = exim_client.quota_usage()
+        _status['mk_schema'] = rate_providers.mk_schema_stats()
+        _status['mk_proxies'] = rate_providers.mk_proxy_stats()
+        version = snapshot_store.publish('refresher', _status)
+    snapshot_notify.notify('refresher', version)
+
+def _provider_available(name):
+    """서킷이 열려 있으면 False (쿨다운이 지나면 한 번 시도 허용)"""
+    status = _status['providers'][name]
+    if status['state'] == 'open':
+        if time.time() < status['open_until']:
+            return False
+        status['state'] = 'half-open'
+    return True
+
+def _record_provider(name, ok, latency, error=None):
+    with _status_lock:
+        status = _status['providers'][name]
+        status['latency'] = round(latency, 3)
+        status['score'] = round((1 - HEALTH_WEIGHT) * status['score'] + HEALTH_WEIGHT * (1 if ok else 0), 3)
+        if ok:
+            status.update(state='closed', failures=0, last_success=time.time())
+        else:
+            status['failures'] += 1
+            status['last_error'] = error
+            if status['state'] == 'half-open' or status['failures'] >= CIRCUIT_THRESHOLD:
+                status['state'] = 'open'
+                status['open_until'] = time.time() + CIRCUIT_COOLDOWN
+                print(f"🔌 {name} 서킷 열림 ({CIRCUIT_COOLDOWN}초간 호출 중단)")
+
+def ranked_providers():
+    """서킷이 닫힌 제공처를 건강 점수 높은 순으로 (소수 첫째 자리까지 같으면 RATE_PROVIDERS 순서)"""
+    order = {name: i for i, (name, _) in enumerate(RATE_PROVIDERS)}
+    available = [(name, fetch) for name, fetch in RATE_PROVIDERS if _provider_available(name)]
+    return sorted(available, key=lambda p: (-round(_status['providers'][p[0]]['score'], 1), order[p[0]]))
+
+def _recover_idle(names):
+    """이번 집계에서 호출하지 않은 제공처 점수 회복 (한 번 실패한 우선 제공처가 계속 밀려나지 않도록)"""
+    with _status_lock:
+        for name in names:
+            status = _status['providers'][name]
+            status['score'] = round(status['score'] + HEALTH_WEIGHT * (1 - status['score']), 3)
+
+def _fetch_provider(name, fetch):
+    started = time.monotonic()
+    try:
+        rates = fetch()
+        error = None if rates else '데이터 없음'
+    except Exception as e:
+        rates, error = None, str(e)
+    _record_provider(name, bool(rates), time.monotonic() - started, error)
+    return rates
+
+def merge_rates(results):
+    """[(제공처, 환율 목록)] (건강한 순) → 통화별로 앞쪽 제공처 값을 고른 환율 목록 (각 환율에 'source')"""
+    merged = {}
+    for name, rates in results:
+        for rate in rates:
+            code = rate.get('currency', '').split()[0]
+            if code and code not in merged:
+                merged[code] = dict(rate, source=name)
+    return list(merged.values())
+
+def fetch_aggregated_rates():
+    """건강 점수 상위 제공처를 동시에 호출해 병합 ([(제공처, 환율 목록)] 성공한 것만, 건강한 순)
+
+    상위 제공처가 모두 실패하면 남은 제공처를 같은 방식으로 이어서 시도합니다.
+    """
+    providers = ranked_providers()
+    while providers:
+        batch, providers = providers[:RATES_AGGREGATE_SOURCES], providers[RATES_AGGREGATE_SOURCES:]
+        futures = [(name, _rates_executor.submit(_fetch_provider, name, fetch)) for name, fetch in batch]
+        wait([future for _, future in futures], timeout=RATES_FETCH_TIMEOUT)
+
+        results = []
+        for name, future in futures:
+            if not future.done():
+                print(f"⏱️ {name} 환율 응답 지연 - 이번 집계에서 제외")
+                continue
+            rates = future.result()
+            if rates:
+                results.append((name, rates))
+        if results:
+            _recover_idle(name for name, _ in providers)
+            return results
+    return []
+
+def refresh_rates():
+    """건강한 제공처들의 환율을 동시에 받아 통화별로 병합해 게시"""
+    results = fetch_aggregated_rates()
+    if not results:
+        print("❌ 모든 환율 제공처 실패 - 이전 스냅샷 유지")
+        return False
+
+    rates = merge_rates(results)
+    sources = [name for name, _ in results]
+    if not _last_rate_numbers:
+        load_last_rate_numbers()
+    version = publish('rates', {'rates': rates, 'source': sources[0], 'sources': sources})
+    print(f"📦 환율 스냅샷 게시: {'+'.join(sources)} ({len(rates)}개, 버전 {version})")
+    check_alerts(rates)
+    record_history(rates)
+    return True
+
+def load_last_rate_numbers():
+    """데몬 재시작 직후에는 마지막으로 게시된 스냅샷을 알림 비교 기준으로 사용"""
+    global _last_rate_numbers
+    previous = snapshot_store.read('rates')
+    _last_rate_numbers = rate_alerts.rates_to_numbers(previous['data']['rates']) if previous else {}
+
+def check_alerts(rates):
+    """직전 환율 → 새 환율 사이에서 넘어선 알림을 찾아 발송 대기열에 넣기 (발송은 기다리지 않음)"""
+    global _last_rate_numbers
+
+    new_numbers = rate_alerts.rates_to_numbers(rates)
+
+    try:
+        triggered = _alert_matcher.process_update(_last_rate_numbers, new_numbers)
+        if triggered:
+            queued = alert_dispatcher.enqueue(triggered)
+            print(f"📮 알림 발송 대기: {queued}/{len(triggered)}개")
+    except Exception as e:
+        print(f"❌ 환율 알림 확인 에러: {e}")
+        triggered = []
+
+    _last_rate_numbers = new_numbers
+    return triggered
+
+def record_history(rates):
+    """오늘 환율을 이력 저장소에 반영 (하루 마지막 게시 값이 남음, 제공처는 통화별 'source')"""
+    by_source = {}
+    for rate in rates:
+        by_source.setdefault(rate['source'], []).append(rate)
+    try:
+        for source, source_rates in by_source.items():
+            rate_history.record_rates(source_rates, source)
+    except Exception as e:
+        print(f"❌ 환율 이력 저장 에러: {e}")
+
+def refresh_news():
+    """뉴스 증분 크롤링 후 최신 기사 썸네일 준비"""
+    added = news_crawler.crawl()
+    for news in news_crawler.latest(5):
+        thumbnails.fetch_thumbnail(news['image'])
+    snapshot_notify.notify('news', news_crawler.load_index().get('updated'))
+    print(f"📦 뉴스 색인 갱신: 새 기사 {added}개")
+    return True
+
+def refresh_markets():
+    """네이버 시장지표(환율, 유가, 금시세, 금리 등) 한 페이지로 전체 지표 게시"""
+    indices = market_index.fetch_market_indices()
+    if not indices:
+        return False
+    version = publish('markets', {'indices': [index._asdict() for index in indices], 'source': 'naver'})
+    print(f"📦 시장지표 스냅샷 게시: {len(indices)}개 (버전 {version})")
+    return True
+
+def refresh_crypto():
+    """업비트 원화 마켓 시세를 한 번에 조회해 게시"""
+    tickers = crypto_tickers.fetch_tickers()
+    if not tickers:
+        return False
+    publish('crypto', {'tickers': tickers, 'source': 'upbit'})
+    return True
+
+JOBS = [
+    ('rates', refresh_rates, RATES_INTERVAL),
+    ('news', refresh_news, NEWS_INTERVAL),
+    ('markets', refresh_markets, MARKETS_INTERVAL),
+    ('crypto', refresh_crypto, CRYPTO_INTERVAL),
+]
+
+def run_job(name, job):
+    """작업 한 번 실행하고 결과를 상태에 기록"""
+    started = time.time()
+    try:
+        ok = bool(job())
+        error = None if ok else '갱신 실패'
+    except Exception as e:
+        print(f"❌ {name} 갱신 에러: {e}")
+        ok, error = False, str(e)
+
+    with _status_lock:
+        _status['jobs'][name] = {
+            'last_run': started,
+            'duration': round(time.time() - started, 3),
+            'ok': ok,
+            'error': error,
+            'last_success': started if ok else (_status['jobs'].get(name) or {}).get('last_success')
+        }
+    publish_status()
+    return ok
+
+def _job_loop(name, job, interval):
+    while not _stop.is_set():
+        run_job(name, job)
+        _stop.wait(interval)
+
+def run_forever():
+    """작업마다 별도 스레드로 주기 실행 (느린 뉴스 크롤링이 환율 갱신을 막지 않도록)"""
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+
+    threads = []
+    for name, job, interval in JOBS:
+        thread = threading.Thread(target=_job_loop, args=(name, job, interval), name=f"refresh-{name}", daemon=True)
+        thread.start()
+        threads.append(thread)
+        print(f"🔄 {name} 갱신 시작 (주기 {interval}초)")
+
+    # 작업이 길어져도 웹 워커가 데몬을 죽었다고 보지 않도록 상태를 주기적으로 게시
+    while not _stop.wait(30):
+        publish_status()
+
+    print("🛑 갱신 데몬 종료")
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🚀 환율/뉴스 갱신 데몬 시작")
+    print(f"📁 스냅샷 위치: {snapshot_store.SNAPSHOT_DIR}")
+    print("=" * 60)
+
+    # 지난 실행에서 발송하지 못하고 남은 알림부터 다시 보냄
+    alert_dispatcher.replay_pending()
+
+    if '--once' in sys.argv:
+        results = [run_job(name, job) for name, job, _ in JOBS]
+        sys.exit(0 if all(results) else 1)
+
+    run_forever()
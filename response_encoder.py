@@ -0,0 +1,59 @@
+"""
+스킬 응답 JSON 인코더
+Flask 기본 인코더는 한글과 국기 이모지를 \\uXXXX로 이스케이프하고 키를 정렬합니다.
+이 모듈은 orjson(설치되어 있으면) 또는 json.dumps(ensure_ascii=False)로 UTF-8을 그대로 내보내는
+Flask JSON provider를 제공하므로, app.json에 지정하면 모든 jsonify 응답에 적용됩니다.
+JSON_BACKEND 환경변수로 'orjson' / 'json'을 강제할 수 있습니다.
+"""
+
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_MIMETYPE = 'application/json; charset=utf-8'
+
+def _encode_default(obj):
+    """orjson이 모르는 타입 (set 등)은 Flask 기본 규칙으로 변환"""
+    return DefaultJSONProvider.default(obj)
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                      default=_encode_default).encode('utf-8')
+
+def select_backend(name=None):
+    """(백엔드 이름, obj → UTF-8 bytes 함수) 선택"""
+    name = name or os.getenv('JSON_BACKEND', 'orjson')
+    if name == 'orjson' and orjson is not None:
+        return 'orjson', _orjson_dumps
+    return 'json', _stdlib_dumps
+
+BACKEND, encode = select_backend()
+
+class KakaoJSONProvider(DefaultJSONProvider):
+    """UTF-8 그대로, 공백 없이 인코딩하는 JSON provider"""
+
+    mimetype = JSON_MIMETYPE
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # json.dumps 옵션을 직접 넘긴 호출은 기본 동작 유지
+            return super().dumps(obj, **kwargs)
+        return encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode(obj), mimetype=self.mimetype)
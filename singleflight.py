@@ -0,0 +1,105 @@
+"""
+요청 병합 (single-flight)
+캐시가 만료된 순간 동시에 들어온 요청들이 같은 외부 호출을 각자 실행하지 않도록,
+key별로 하나의 호출만 실행하고 나머지는 그 결과를 함께 사용합니다.
+"""
+
+import fcntl
+import os
+import re
+import threading
+import time
+
+from deadline import remaining, DeadlineExceeded, RENDER_RESERVE
+
+# 워커(프로세스) 간 병합에 사용할 잠금 파일 위치
+LOCK_DIR = os.getenv('SINGLEFLIGHT_LOCK_DIR', '/tmp')
+
+# 예산이 없는 호출자가 다른 호출을 기다리는 최대 시간 (초)
+MAX_WAIT = 60
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+class _Call:
+    """진행 중인 호출 (완료되면 event가 설정됨)"""
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+def do(key, fn, lock_file=False, recheck=None):
+    """key별로 fn을 한 번만 실행하고 동시에 기다리던 호출자와 결과 공유
+
+    lock_file=True 이면 다른 워커 프로세스와도 잠금 파일로 병합합니다.
+    잠금을 얻은 뒤에는 recheck()로 다른 워커가 이미 갱신한 결과가 있는지
+    먼저 확인하고, None이 아니면 fn을 실행하지 않고 그 값을 사용합니다.
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _calls[key] = call
+
+    if not leader:
+        return _wait(key, call)
+
+    try:
+        if lock_file:
+            call.result = _run_with_file_lock(key, fn, recheck)
+        else:
+            call.result = fn()
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.event.set()
+
+def _wait_timeout():
+    """대기 가능한 시간 (응답 구성에 쓸 RENDER_RESERVE는 남김, 예산이 없으면 MAX_WAIT)"""
+    left = remaining()
+    return MAX_WAIT if left is None else max(0.0, left - RENDER_RESERVE)
+
+def _wait(key, call):
+    """다른 스레드의 호출 완료를 응답 예산 안에서 대기"""
+    if not call.event.wait(_wait_timeout()):
+        raise DeadlineExceeded(f"'{key}' 갱신 대기 중 응답 예산 초과")
+
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+def _lock_path(key):
+    safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+    return os.path.join(LOCK_DIR, f"kakao_singleflight_{safe_key}.lock")
+
+def _run_with_file_lock(key, fn, recheck):
+    """잠금 파일로 워커 간 병합 (잠금 대기도 응답 예산 안에서만)"""
+    with open(_lock_path(key), 'a') as lock_fp:
+        give_up_at = time.monotonic() + _wait_timeout()
+
+        while True:
+            try:
+                fcntl.flock(lock_fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= give_up_at:
+                    raise DeadlineExceeded(f"'{key}' 잠금 대기 중 응답 예산 초과")
+                time.sleep(0.05)
+
+        try:
+            # 다른 워커가 방금 갱신했다면 그 결과를 먼저 확인
+            if recheck is not None:
+                result = recheck()
+                if result is not None:
+                    print(f"🔁 '{key}' 다른 워커의 갱신 결과 사용")
+                    return result
+            return fn()
+        finally:
+            fcntl.flock(lock_fp, fcntl.LOCK_UN)
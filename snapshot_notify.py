@@ -0,0 +1,103 @@
+"""
+스냅샷 갱신 알림 (로컬 pub/sub)
+갱신 데몬이 스냅샷을 게시하면 유닉스 도메인 소켓(datagram)으로 모든 웹 워커에 즉시 알리고,
+웹 워커는 알림을 받았을 때만 스냅샷을 다시 읽어 메모리에 올립니다.
+요청 처리 중에는 파일을 읽지 않습니다.
+"""
+
+import atexit
+import glob
+import json
+import os
+import socket
+import threading
+
+NOTIFY_DIR = os.getenv('SNAPSHOT_NOTIFY_DIR', '/tmp/kakao_notify')
+
+_subscribers = {}
+_listener = {'pid': None, 'path': None}
+_listener_lock = threading.Lock()
+
+def subscribe(name, callback):
+    """스냅샷 갱신 콜백 등록: callback(name, version)"""
+    _subscribers.setdefault(name, []).append(callback)
+
+def listening():
+    """현재 프로세스에서 알림을 받고 있는지 (fork 이후에는 새로 시작해야 함)"""
+    return _listener['pid'] == os.getpid()
+
+def start_listener():
+    """현재 프로세스용 알림 소켓을 열고 수신 스레드 시작 (실패하면 False)"""
+    with _listener_lock:
+        if listening():
+            return True
+
+        path = os.path.join(NOTIFY_DIR, f"{os.getpid()}.sock")
+        try:
+            os.makedirs(NOTIFY_DIR, exist_ok=True)
+            if os.path.exists(path):
+                os.unlink(path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ 스냅샷 알림 소켓 열기 실패 (파일 확인 방식 사용): {e}")
+            return False
+
+        thread = threading.Thread(target=_receive_loop, args=(sock,), name='snapshot-notify', daemon=True)
+        thread.start()
+
+        _listener['pid'] = os.getpid()
+        _listener['path'] = path
+        atexit.register(_cleanup, path)
+
+        print(f"📡 스냅샷 알림 수신 시작: {path}")
+        return True
+
+def _cleanup(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _receive_loop(sock):
+    while True:
+        try:
+            message = json.loads(sock.recv(4096))
+            name = message['name']
+            version = message.get('version')
+        except Exception as e:
+            print(f"⚠️ 잘못된 스냅샷 알림: {e}")
+            continue
+
+        for callback in _subscribers.get(name, []):
+            try:
+                callback(name, version)
+            except Exception as e:
+                print(f"❌ 스냅샷 알림 처리 에러 ({name}): {e}")
+
+def notify(name, version=None):
+    """모든 웹 워커에 스냅샷 갱신 알림 (응답 없는 소켓은 정리)
+
+    수신 대기열이 가득 찬 워커(멈춘 워커 등)는 기다리지 않고 이번 알림을 건너뜁니다.
+    """
+    message = json.dumps({'name': name, 'version': version}).encode('utf-8')
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    sent = 0
+    try:
+        for path in glob.glob(os.path.join(NOTIFY_DIR, '*.sock')):
+            try:
+                sock.sendto(message, path)
+                sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 종료된 워커의 소켓
+                _cleanup(path)
+            except BlockingIOError:
+                print(f"⚠️ 스냅샷 알림 건너뜀 - 수신 대기열 가득 참 ({path}, {name})")
+            except OSError as e:
+                print(f"⚠️ 스냅샷 알림 전송 실패 ({path}): {e}")
+    finally:
+        sock.close()
+
+    return sent
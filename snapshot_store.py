@@ -0,0 +1,69 @@
+"""
+스냅샷 저장소
+갱신 데몬(refresher.py)이 만든 데이터(환율, 뉴스, 상태)를 로컬 디렉터리에 원자적으로
+교체 저장하고, 웹 워커는 이를 읽기만 합니다.
+"""
+
+import json
+import os
+import threading
+import time
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', '/tmp/kakao_snapshots')
+
+# name → (mtime, 스냅샷) 캐시 (파일이 바뀌었을 때만 다시 읽음)
+_cache = {}
+_cache_lock = threading.Lock()
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.json")
+
+def publish(name, data):
+    """스냅샷 저장 (임시 파일에 쓰고 교체하여 읽는 쪽이 깨진 파일을 보지 않도록)
+
+    반환값은 스냅샷 버전(나노초 타임스탬프)입니다.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    version = time.time_ns()
+    snapshot = {
+        'version': version,
+        'timestamp': time.time(),
+        'data': data
+    }
+
+    path = snapshot_path(name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    return version
+
+def read(name):
+    """스냅샷 읽기 ({'version', 'timestamp', 'data'}, 없으면 None)"""
+    path = snapshot_path(name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except Exception as e:
+        print(f"⚠️ 스냅샷 읽기 실패 ({name}): {e}")
+        return None
+
+    with _cache_lock:
+        _cache[name] = (mtime, snapshot)
+    return snapshot
+
+def age(snapshot):
+    """스냅샷 경과 시간 (초)"""
+    return time.time() - snapshot['timestamp']
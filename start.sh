@@ -1 +1,3 @@
-python kakao_exchange_skill_advanced_final.py
\ No newline at end of file
+# 갱신 데몬(외부 호출 전담)을 백그라운드로 실행하고 웹 서버 시작
+python refresher.py &
+python kakao_exchange_skill_advanced_final.py
@@ -0,0 +1,32 @@
+import pytest
+
+import kakao_callback
+import mock_callback_server
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    server = mock_callback_server.start_server(port=0)
+    port = server.server_address[1]
+    monkeypatch.setattr(kakao_callback, '_origins', {('http', '127.0.0.1', port)})
+    monkeypatch.setattr(kakao_callback.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(mock_callback_server, 'received', [])
+    yield f"http://127.0.0.1:{port}/callback"
+    monkeypatch.setattr(mock_callback_server, 'fail_first', 0)
+    server.shutdown()
+    server.server_close()
+
+def test_post_callback_retries_until_success(mock_server, monkeypatch):
+    monkeypatch.setattr(mock_callback_server, 'fail_first', kakao_callback.CALLBACK_RETRIES - 1)
+    payload = {'version': '2.0', 'template': {'outputs': []}}
+
+    assert kakao_callback.post_callback(mock_server, payload)
+    assert mock_callback_server.received == [{'path': '/callback', 'payload': payload}]
+
+def test_post_callback_gives_up_after_retries(mock_server, monkeypatch):
+    monkeypatch.setattr(mock_callback_server, 'fail_first', kakao_callback.CALLBACK_RETRIES)
+
+    assert not kakao_callback.post_callback(mock_server, {'version': '2.0'})
+    assert mock_callback_server.received == []
+
+def test_post_callback_rejects_unlisted_host(mock_server):
+    assert not kakao_callback.post_callback('http://169.254.169.254/callback', {'version': '2.0'})
@@ -0,0 +1,23 @@
+import pytest
+
+from news_tagging import tag_currencies
+
+@pytest.mark.parametrize('title', [
+    "삼성전자 파운드리 투자 확대",
+    "위안부 합의 논란",
+    "위안을 삼아 버텼다",
+    "작은 위안이 되길",
+    "토트넘 유로파리그 결승 진출",
+])
+def test_excluded_words_are_not_currencies(title):
+    assert tag_currencies(title) == []
+
+@pytest.mark.parametrize('title, tags', [
+    ("파운드 약세에 원·달러 상승", ['GBP', 'USD']),
+    ("위안화 절하, 유로 강세", ['CNY', 'EUR']),
+    ("역외 환율 7.3위안을 돌파", ['CNY']),
+    ("캐나다 달러 반등", ['CAD']),
+    ("엔화 약세 지속", ['JPY']),
+])
+def test_currency_aliases(title, tags):
+    assert tag_currencies(title) == tags
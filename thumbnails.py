@@ -0,0 +1,245 @@
+"""
+뉴스 썸네일 프록시/캐시
+기사 이미지를 한 번만 받아 리스트카드 크기로 줄인 뒤, 내용 해시를 이름으로 하는
+디스크 캐시에 저장하고 /thumb/<hash> 엔드포인트로 직접 제공합니다.
+"""
+
+import hashlib
+import io
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from deadline import budget_timeout
+
+# 캐시 위치와 최대 용량 (초과하면 가장 오래 사용하지 않은 썸네일부터 삭제)
+THUMB_DIR = os.getenv('THUMB_DIR', '/tmp/kakao_thumbs')
+THUMB_CACHE_MAX_BYTES = int(os.getenv('THUMB_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# 리스트카드 썸네일 크기 (정사각형)
+THUMB_SIZE = (160, 160)
+THUMB_QUALITY = 80
+
+# 원본 이미지 최대 다운로드 크기
+MAX_SOURCE_BYTES = 5 * 1024 * 1024
+
+_CONTENT_DIR = os.path.join(THUMB_DIR, 'content')
+_URL_DIR = os.path.join(THUMB_DIR, 'urls')
+_HASH_RE = re.compile(r'^[0-9a-f]{40}$')
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumb')
+_pending = set()
+_pending_lock = threading.Lock()
+
+# 이미지 URL → 썸네일 해시 (요청 처리 중에는 메모리만 조회, 뉴스 갱신 알림 때 reload_known으로 다시 채움)
+_known = {}
+
+def normalize_image_url(img_url):
+    """이미지 URL 정리 (프로토콜 생략 URL은 https로 보정)"""
+    if not img_url:
+        return ''
+    img_url = img_url.strip()
+    if img_url.startswith('//'):
+        return 'https:' + img_url
+    if img_url.startswith('http://') or img_url.startswith('https://'):
+        return img_url
+    return ''
+
+def _url_key(img_url):
+    return hashlib.sha1(img_url.encode('utf-8')).hexdigest()
+
+def _content_path(thumb_hash):
+    return os.path.join(_CONTENT_DIR, thumb_hash + '.jpg')
+
+def lookup(img_url):
+    """이미 캐시된 썸네일의 해시 (없으면 None)"""
+    try:
+        with open(os.path.join(_URL_DIR, _url_key(img_url)), 'r') as f:
+            thumb_hash = f.read().strip()
+        if _HASH_RE.match(thumb_hash) and os.path.exists(_content_path(thumb_hash)):
+            return thumb_hash
+    except OSError:
+        pass
+    return None
+
+def reload_known(img_urls):
+    """주어진 이미지들의 썸네일 해시를 디스크에서 읽어 메모리 조회표 교체"""
+    global _known
+    known = {}
+    for img_url in img_urls:
+        img_url = normalize_image_url(img_url)
+        thumb_hash = lookup(img_url) if img_url else None
+        if thumb_hash:
+            known[img_url] = thumb_hash
+    _known = known
+    return len(known)
+
+def get_thumbnail_path(thumb_hash):
+    """/thumb/<hash> 요청에 사용할 파일 경로 (사용 시각 갱신, 없으면 None)"""
+    if not _HASH_RE.match(thumb_hash or ''):
+        return None
+    path = _content_path(thumb_hash)
+    try:
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+def _resize(data):
+    """리스트카드 크기의 JPEG로 변환 (Pillow가 없으면 원본 사용)"""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return data
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        thumb = ImageOps.fit(image.convert('RGB'), THUMB_SIZE, Image.LANCZOS)
+        out = io.BytesIO()
+        thumb.save(out, 'JPEG', quality=THUMB_QUALITY, optimize=True)
+        return out.getvalue()
+
+def _download(img_url):
+    """원본 이미지 다운로드 (크기 제한)"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    import requests
+
+    with requests.get(img_url, headers=headers, timeout=budget_timeout(10), stream=True) as response:
+        response.raise_for_status()
+        if not response.headers.get('Content-Type', '').startswith('image/'):
+            raise ValueError(f"이미지가 아님: {response.headers.get('Content-Type')}")
+
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            data.extend(chunk)
+            if len(data) > MAX_SOURCE_BYTES:
+                raise ValueError("이미지가 너무 큼")
+        return bytes(data)
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def fetch_thumbnail(img_url):
+    """이미지를 받아 썸네일로 저장하고 해시 반환 (이미 있으면 바로 반환)"""
+    img_url = normalize_image_url(img_url)
+    if not img_url:
+        return None
+
+    thumb_hash = lookup(img_url)
+    if thumb_hash:
+        _known[img_url] = thumb_hash
+        return thumb_hash
+
+    try:
+        thumb = _resize(_download(img_url))
+        thumb_hash = hashlib.sha1(thumb).hexdigest()
+
+        os.makedirs(_CONTENT_DIR, exist_ok=True)
+        os.makedirs(_URL_DIR, exist_ok=True)
+
+        if not os.path.exists(_content_path(thumb_hash)):
+            _write_atomic(_content_path(thumb_hash), thumb)
+        _write_atomic(os.path.join(_URL_DIR, _url_key(img_url)), thumb_hash.encode('ascii'))
+
+        print(f"🖼️ 썸네일 저장: {img_url[:60]} → {thumb_hash[:10]} ({len(thumb):,}B)")
+        _known[img_url] = thumb_hash
+        evict()
+        return thumb_hash
+
+    except Exception as e:
+        print(f"⚠️ 썸네일 생성 실패 ({img_url[:60]}): {e}")
+        return None
+
+def prefetch(img_url):
+    """썸네일을 백그라운드에서 준비 (같은 URL은 한 번만 요청)"""
+    img_url = normalize_image_url(img_url)
+    if not img_url or img_url in _known:
+        return
+
+    with _pending_lock:
+        if img_url in _pending:
+            return
+        _pending.add(img_url)
+
+    def task():
+        try:
+            fetch_thumbnail(img_url)
+        finally:
+            with _pending_lock:
+                _pending.discard(img_url)
+
+    _executor.submit(task)
+
+def forget(thumb_hashes):
+    """삭제된 썸네일을 메모리 조회표에서 제거 (카드가 없는 /thumb 주소를 가리키지 않도록)"""
+    global _known
+    thumb_hashes = set(thumb_hashes)
+    if thumb_hashes:
+        _known = {img_url: h for img_url, h in _known.items() if h not in thumb_hashes}
+
+def _prune_url_entries(thumb_hashes):
+    """삭제된 썸네일을 가리키는 urls/ 항목 삭제"""
+    for entry in os.scandir(_URL_DIR):
+        try:
+            with open(entry.path, 'r') as f:
+                if f.read().strip() in thumb_hashes:
+                    os.remove(entry.path)
+        except OSError:
+            pass
+
+def evict():
+    """캐시 용량 초과 시 가장 오래 사용하지 않은 썸네일부터 삭제 (LRU, urls/ 항목과 메모리 조회표도 함께 정리)"""
+    try:
+        entries = []
+        total = 0
+        for entry in os.scandir(_CONTENT_DIR):
+            if entry.is_file() and entry.name.endswith('.jpg'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= THUMB_CACHE_MAX_BYTES:
+            return
+
+        entries.sort()
+        removed = set()
+        for _, size, path in entries:
+            if total <= THUMB_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed.add(os.path.basename(path)[:-len('.jpg')])
+            except OSError:
+                pass
+
+        forget(removed)
+        _prune_url_entries(removed)
+        print(f"🧹 썸네일 캐시 정리: {len(removed)}개 삭제 (현재 {total:,}B)")
+    except OSError:
+        pass
+
+def thumbnail_url(img_url, base_url, fetch_missing=True):
+    """리스트카드에 넣을 이미지 URL
+
+    캐시된 썸네일이 있으면 우리 서버 주소(/thumb/<hash>)를, 아직 없으면
+    (fetch_missing=True일 때) 백그라운드 준비를 시작하고 보정된 원본 URL을 반환합니다.
+    파일은 읽지 않고 메모리 조회표만 사용합니다.
+    """
+    img_url = normalize_image_url(img_url)
+    if not img_url:
+        return ''
+
+    thumb_hash = _known.get(img_url)
+    if thumb_hash and base_url:
+        return f"{base_url.rstrip('/')}/thumb/{thumb_hash}"
+
+    if fetch_missing:
+        prefetch(img_url)
+    return img_url
@@ -0,0 +1,165 @@
+"""
+사용자별 응답 설정
+관심 통화, 기준 금액, 응답 언어를 카카오 userRequest.user.id 기준으로 SQLite에 저장하고,
+자주 오는 사용자는 크기 제한이 있는 LRU 캐시에서 바로 꺼내 씁니다.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from currencies import CURRENCY_MAP, RATE_CODES
+from news_tagging import tag_currencies
+
+PREFS_DB = os.getenv('PREFS_DB', '/tmp/kakao_prefs.db')
+
+# 메모리에 보관할 사용자 수
+PREFS_CACHE_SIZE = int(os.getenv('PREFS_CACHE_SIZE', '10000'))
+
+LANGUAGES = ('ko', 'en')
+MAX_FAVORITES = 5
+MAX_BASE_AMOUNT = 1_000_000_000
+
+# 설정하지 않은 사용자 (캐시에도 이 객체를 그대로 넣어 DB를 다시 조회하지 않음)
+DEFAULT_PREFS = {'currencies': None, 'amount': 1, 'language': 'ko'}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_local = threading.local()
+
+def _connect():
+    """스레드별 연결 재사용 (요청마다 DB를 여는 비용 제거)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'pid', None) != os.getpid():
+        conn = sqlite3.connect(PREFS_DB, timeout=10)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS prefs (
+                user_id TEXT PRIMARY KEY,
+                currencies TEXT,
+                amount REAL NOT NULL DEFAULT 1,
+                language TEXT NOT NULL DEFAULT 'ko',
+                updated REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def _cache_put(user_id, prefs):
+    with _cache_lock:
+        _cache[user_id] = prefs
+        _cache.move_to_end(user_id)
+        while len(_cache) > PREFS_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def get_prefs(user_id):
+    """사용자 설정 조회 (캐시 → DB, 설정이 없으면 DEFAULT_PREFS)"""
+    if not user_id:
+        return DEFAULT_PREFS
+
+    with _cache_lock:
+        prefs = _cache.get(user_id)
+        if prefs is not None:
+            _cache.move_to_end(user_id)
+            return prefs
+
+    try:
+        row = _connect().execute(
+            "SELECT currencies, amount, language FROM prefs WHERE user_id = ?", (user_id,)
+        ).fetchone()
+    except Exception as e:
+        print(f"⚠️ 사용자 설정 조회 실패: {e}")
+        return DEFAULT_PREFS
+
+    if row:
+        prefs = {
+            'currencies': json.loads(row[0]) if row[0] else None,
+            'amount': int(row[1]) if float(row[1]).is_integer() else row[1],
+            'language': row[2]
+        }
+    else:
+        prefs = DEFAULT_PREFS
+
+    _cache_put(user_id, prefs)
+    return prefs
+
+def set_prefs(user_id, **changes):
+    """사용자 설정 변경 (바뀐 항목만 전달), 변경 후 설정 반환"""
+    prefs = dict(get_prefs(user_id), **changes)
+    currencies = prefs['currencies']
+
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO prefs (user_id, currencies, amount, language, updated) VALUES (?, ?, ?, ?, ?)",
+            (user_id, json.dumps(currencies) if currencies else None, prefs['amount'], prefs['language'], time.time())
+        )
+
+    _cache_put(user_id, prefs)
+    return prefs
+
+def reset_prefs(user_id):
+    """사용자 설정 초기화"""
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM prefs WHERE user_id = ?", (user_id,))
+    _cache_put(user_id, DEFAULT_PREFS)
+    return DEFAULT_PREFS
+
+def is_default(prefs):
+    return prefs is DEFAULT_PREFS or prefs == DEFAULT_PREFS
+
+def parse_currencies(text):
+    """발화에 언급된 통화 코드 목록 (환율 카드 코드 기준, 최대 MAX_FAVORITES개)"""
+    codes = []
+    for tag in tag_currencies(text or ''):
+        code = RATE_CODES.get(tag, tag)
+        if code in CURRENCY_MAP and code not in codes:
+            codes.append(code)
+    return codes[:MAX_FAVORITES]
+
+def parse_amount(text):
+    """발화의 첫 숫자를 기준 금액으로 사용 (예: "기준 금액 100", "1,000달러씩")"""
+    match = re.search(r'\d[\d,]*(?:\.\d+)?', text or '')
+    if not match:
+        return None
+    try:
+        amount = float(match.group().replace(',', ''))
+    except ValueError:
+        return None
+    if not 0 < amount <= MAX_BASE_AMOUNT:
+        return None
+    return int(amount) if amount.is_integer() else amount
+
+def parse_language(text):
+    text = (text or '').lower()
+    if '영어' in text or 'english' in text or text.strip() == 'en':
+        return 'en'
+    if '한국어' in text or '한글' in text or 'korean' in text or text.strip() == 'ko':
+        return 'ko'
+    return None
+
+def parse_preference_request(text, params=None):
+    """설정 변경 요청 해석 (스킬 파라미터 우선, 없으면 발화에서 추출), 변경할 항목 dict 반환"""
+    params = params or {}
+    text = text or ''
+    changes = {}
+
+    currencies = parse_currencies(params.get('currencies') or (text if '통화' in text else ''))
+    if currencies:
+        changes['currencies'] = currencies
+
+    amount = parse_amount(str(params.get('amount') or (text if '금액' in text else '')))
+    if amount:
+        changes['amount'] = amount
+
+    language = parse_language(params.get('language') or text)
+    if language:
+        changes['language'] = language
+
+    return changes